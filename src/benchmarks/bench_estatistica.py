@@ -0,0 +1,108 @@
+"""
+Mede o filtro de outliers e o resumo por produto sobre 1 milhão de linhas de detalhe
+sintéticas (20 mil produtos com 50 preços cada, alguns fora da curva):
+- antigo: o laço de product4, produto a produto (array NumPy, média ± 1σ e um
+  segundo laço Python marcando "Rejeitado (Outlier)"), com min/max por produto;
+- vetorizado: estatistica.filtrar_outliers sobre o DataFrame inteiro, para cada
+  método de estatistica.METODOS, seguido de estatistica.resumir.
+
+Também confere que o método "sigma" marca exatamente as mesmas linhas que o laço antigo.
+Uso: python bench_estatistica.py [linhas]
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from search.estatistica import METODOS, STATUS_INCLUIDO, STATUS_OUTLIER, filtrar_outliers, resumir  # noqa: E402
+
+ITENS_POR_PRODUTO = 50
+
+
+def gerar_detalhes(linhas, semente=0):
+    aleatorio = np.random.default_rng(semente)
+    produtos = np.repeat(np.arange(linhas // ITENS_POR_PRODUTO), ITENS_POR_PRODUTO)[:linhas]
+    base = aleatorio.uniform(10, 500, produtos.max() + 1)[produtos]
+    precos = np.round(base * aleatorio.lognormal(0, 0.15, linhas), 2)
+    # ~5% de kits e acessórios muito mais caros ou baratos que o produto
+    estranhos = aleatorio.random(linhas) < 0.05
+    precos[estranhos] *= aleatorio.choice([0.1, 4.0], estranhos.sum())
+    status = np.where(aleatorio.random(linhas) < 0.2, "Rejeitado (Relevância)", STATUS_INCLUIDO)
+    return pd.DataFrame({
+        "Produto_Pesquisado": pd.Series(produtos).map("Produto {}".format),
+        "Preco": precos,
+        "Status_Calculo": status,
+        "Motivo_Rejeicao": "",
+    })
+
+
+def antigo(itens):
+    por_produto = {}
+    for item in itens:
+        por_produto.setdefault(item["Produto_Pesquisado"], []).append(item)
+
+    resumo = {}
+    for produto, itens_produto in por_produto.items():
+        produtos_para_calculo = [p for p in itens_produto if p["Status_Calculo"] == STATUS_INCLUIDO]
+        if not produtos_para_calculo:
+            continue
+        precos = [p["Preco"] for p in produtos_para_calculo]
+        if len(precos) < 3:
+            resumo[produto] = (min(precos), max(precos))
+            continue
+        precos_array = np.array(precos)
+        media, desvio_padrao = np.mean(precos_array), np.std(precos_array)
+        limite_inferior, limite_superior = media - desvio_padrao, media + desvio_padrao
+        filtrados = []
+        for item in produtos_para_calculo:
+            if limite_inferior <= item["Preco"] <= limite_superior:
+                filtrados.append(item["Preco"])
+            else:
+                item["Status_Calculo"] = STATUS_OUTLIER
+                item["Motivo_Rejeicao"] = (
+                    f"Preço (R${item['Preco']:.2f}) fora do desvio padrão "
+                    f"(Faixa aceitável: R${limite_inferior:.2f} - R${limite_superior:.2f})"
+                )
+        resumo[produto] = (min(filtrados or precos), max(filtrados or precos))
+    return itens, resumo
+
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    detalhes = gerar_detalhes(linhas)
+    print(f"{linhas} linhas, {detalhes['Produto_Pesquisado'].nunique()} produtos")
+
+    # Os itens chegam como a lista de dicionários que product4 monta
+    itens = detalhes.to_dict("records")
+    (itens_antigos, resumo_antigo), tempo_antigo = cronometrar(lambda: antigo(itens))
+    print(f"{'antigo (laço por produto)':<28}{tempo_antigo * 1000:>10.0f} ms")
+
+    print(f"{'método':<12}{'filtro (ms)':>13}{'resumo (ms)':>13}{'outliers':>10}")
+    for metodo in METODOS:
+        copia = detalhes.copy()
+        outliers, tempo_filtro = cronometrar(lambda: filtrar_outliers(copia, metodo))
+        estatisticas, tempo_resumo = cronometrar(lambda: resumir(copia))
+        print(f"{metodo:<12}{tempo_filtro * 1000:>13.0f}{tempo_resumo * 1000:>13.0f}{int(outliers.sum()):>10}")
+
+        if metodo == "sigma":
+            status_antigos = [item["Status_Calculo"] for item in itens_antigos]
+            if copia["Status_Calculo"].tolist() != status_antigos:
+                raise SystemExit("O método sigma marcou linhas diferentes do laço antigo")
+            minimos = estatisticas["Preco_Minimo"].to_dict()
+            maximos = estatisticas["Preco_Maximo"].to_dict()
+            if any((minimos[p], maximos[p]) != faixa for p, faixa in resumo_antigo.items()):
+                raise SystemExit("O resumo do método sigma difere do laço antigo")
+
+
+if __name__ == "__main__":
+    main()
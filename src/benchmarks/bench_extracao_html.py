@@ -0,0 +1,59 @@
+"""
+Compara os extratores de registros {title, price_label, href} do HTML do Google Shopping:
+- soup: BeautifulSoup(lxml) + select/find_parent/find, como product4 fazia;
+- lxml: XPath pré-compilados sobre a página inteira;
+- lxml (grade): XPath só na subárvore de div#rso, parando o parser no fim dela.
+
+Usa as páginas sintéticas de paginas_shopping.py e mede tempo de CPU (mediana).
+Uso: python bench_extracao_html.py [repeticoes]
+"""
+import statistics
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from paginas_shopping import PRODUTOS_PADRAO, gerar_pagina  # noqa: E402
+from search.extracao_lxml import extrair_registros_lxml  # noqa: E402
+from search.product4 import extrair_registros_soup  # noqa: E402
+
+EXTRATORES = {
+    "soup": extrair_registros_soup,
+    "lxml": partial(extrair_registros_lxml, somente_resultados=False),
+    "lxml (grade)": extrair_registros_lxml,
+}
+
+
+def medir(funcao, pagina, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.process_time()
+        registros = funcao(pagina)
+        tempos.append(time.process_time() - inicio)
+    return registros, statistics.median(tempos)
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'página':<44}{'KB':>6}" + "".join(f"{nome + ' (ms)':>18}" for nome in EXTRATORES) + f"{'ganho':>8}")
+    for produto in PRODUTOS_PADRAO:
+        pagina = gerar_pagina(produto)
+        resultados = {nome: medir(funcao, pagina, repeticoes) for nome, funcao in EXTRATORES.items()}
+
+        referencia = resultados["soup"][0]
+        for nome, (registros, _) in resultados.items():
+            if registros != referencia:
+                raise SystemExit(f"'{nome}' devolveu registros diferentes para '{produto}'")
+
+        tempos = {nome: tempo for nome, (_, tempo) in resultados.items()}
+        print(
+            f"{produto[:43]:<44}{len(pagina) / 1024:>6.0f}"
+            + "".join(f"{tempo * 1000:>18.1f}" for tempo in tempos.values())
+            + f"{tempos['soup'] / tempos['lxml (grade)']:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compara as duas formas de tirar os resultados da página já carregada no Chrome:
+- soup: driver.page_source (DOM inteiro serializado pelo WebDriver) + BeautifulSoup;
+- js: um único execute_script que devolve só os registros {title, price_label, href}.
+
+Usa as páginas sintéticas de paginas_shopping.py, abertas via file:// num Chrome headless.
+Mede o tempo mediano, o pico de memória Python (tracemalloc) e o tamanho do que atravessa
+o WebDriver, e confere que os dois modos devolvem os mesmos registros.
+
+Precisa do Chrome. Uso: python bench_extracao_js.py [repeticoes]
+"""
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from paginas_shopping import PRODUTOS_PADRAO, gerar_pagina  # noqa: E402
+from search.navegador import criar_driver  # noqa: E402
+from search.product4 import EXTRACAO_JS, SELETOR_PRECO_ARIA, extrair_registros_soup  # noqa: E402
+
+
+def via_soup(driver):
+    html_content = driver.page_source
+    return extrair_registros_soup(html_content), len(html_content.encode("utf-8"))
+
+
+def via_js(driver):
+    registros = driver.execute_script(EXTRACAO_JS, SELETOR_PRECO_ARIA)
+    return registros, len(json.dumps(registros).encode("utf-8"))
+
+
+def medir(funcao, driver, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(driver)
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    registros, bytes_transferidos = funcao(driver)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return registros, bytes_transferidos, statistics.median(tempos), pico
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    driver = criar_driver(visivel=False)
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            print(
+                f"{'página':<44}{'soup (ms)':>10}{'js (ms)':>9}{'ganho':>8}"
+                f"{'KB soup':>9}{'KB js':>7}{'mem soup':>10}{'mem js':>8}"
+            )
+            for produto in PRODUTOS_PADRAO:
+                caminho = Path(pasta) / "pagina.html"
+                caminho.write_text(gerar_pagina(produto), encoding="utf-8")
+                driver.get(caminho.as_uri())
+
+                registros_soup, bytes_soup, tempo_soup, mem_soup = medir(via_soup, driver, repeticoes)
+                registros_js, bytes_js, tempo_js, mem_js = medir(via_js, driver, repeticoes)
+                if registros_soup != registros_js:
+                    raise SystemExit(f"Registros diferentes para '{produto}'")
+
+                print(
+                    f"{produto[:43]:<44}{tempo_soup * 1000:>10.1f}{tempo_js * 1000:>9.1f}"
+                    f"{tempo_soup / tempo_js:>7.1f}x{bytes_soup / 1024:>9.0f}{bytes_js / 1024:>7.1f}"
+                    f"{mem_soup / 2**20:>8.1f}MB{mem_js / 2**20:>6.1f}MB"
+                )
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Mede o tempo de partida a frio dos comandos que não precisam de navegador nem de rede,
+e confere que selenium e matplotlib não são carregados por eles.
+
+Como referência, mede também só as importações que os scripts product*.py faziam no
+topo do arquivo antes de virarem pacote (sem contar a abertura do Chrome, que vinha logo
+depois).
+
+Uso: python bench_inicializacao.py [repeticoes]
+"""
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PASTA_SRC = Path(__file__).resolve().parents[1]
+PAGINA_EXEMPLO = Path(__file__).resolve().parent / "fixtures" / "farmaindex" / "omeprazol__33410.html"
+
+IMPORTS_ANTIGOS = (
+    "import pandas, re, time, jellyfish, numpy; from bs4 import BeautifulSoup; "
+    "from selenium import webdriver; from selenium.webdriver.chrome.service import Service; "
+    "from selenium.webdriver.support.ui import WebDriverWait; "
+    "from webdriver_manager.chrome import ChromeDriverManager; "
+    "import matplotlib.pyplot, matplotlib.ticker"
+)
+
+VERIFICACAO_MODULOS = (
+    "import sys, runpy; sys.argv = ['search'] + sys.argv[1:]; "
+    "\ntry:\n    runpy.run_module('search', run_name='__main__')\nexcept SystemExit:\n    pass\n"
+    "pesados = [m for m in ('selenium', 'matplotlib', 'webdriver_manager') if m in sys.modules]; "
+    "print('PESADOS=' + ','.join(pesados), file=sys.stderr)"
+)
+
+COMANDOS = {
+    "--help": ["--help"],
+    "unidade": ["unidade", "Abbott Ensure Lt 400G Banana"],
+    "analisar (página sem resultados)": ["analisar", str(PAGINA_EXEMPLO), "--produto", "Omeprazol 20mg"],
+}
+
+
+def cronometrar(argumentos, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run(argumentos, cwd=PASTA_SRC, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def modulos_pesados(argumentos):
+    resultado = subprocess.run(
+        [sys.executable, "-c", VERIFICACAO_MODULOS, *argumentos],
+        cwd=PASTA_SRC,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    for linha in resultado.stderr.splitlines():
+        if linha.startswith("PESADOS="):
+            return linha.removeprefix("PESADOS=") or "nenhum"
+    return "?"
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    referencia = cronometrar([sys.executable, "-c", IMPORTS_ANTIGOS], repeticoes)
+    print(f"{'imports do topo dos antigos product*.py':<52}{referencia * 1000:>9.0f} ms")
+
+    for nome, argumentos in COMANDOS.items():
+        tempo = cronometrar([sys.executable, "-m", "search", *argumentos], repeticoes)
+        print(f"{'python -m search ' + nome:<52}{tempo * 1000:>9.0f} ms   selenium/matplotlib: {modulos_pesados(argumentos)}")
+
+
+if __name__ == "__main__":
+    main()
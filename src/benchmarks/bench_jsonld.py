@@ -0,0 +1,63 @@
+"""
+Compara a extração do JSON-LD das páginas do farmaindex:
+- soup: página inteira + BeautifulSoup(html.parser), como extrair_dados_medicamento fazia;
+- fluxo: leitura em blocos, parando no fim do primeiro <script type="application/ld+json">.
+
+As páginas ficam em fixtures/farmaindex, com nome `<nome-na-url>__<medicamentoid>.html`.
+Uso: python bench_jsonld.py [repeticoes]
+"""
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from search.jsonld import TAMANHO_BLOCO, encontrar_no_medicamento, extrair_jsonld_soup, ler_jsonld_em_fluxo  # noqa: E402
+
+PASTA_FIXTURES = Path(__file__).resolve().parent / "fixtures" / "farmaindex"
+
+
+def via_soup(pagina, url):
+    dados_json = extrair_jsonld_soup(pagina.decode("utf-8"))
+    return encontrar_no_medicamento(dados_json, url), len(pagina)
+
+
+def via_fluxo(pagina, url):
+    blocos = (pagina[i:i + TAMANHO_BLOCO] for i in range(0, len(pagina), TAMANHO_BLOCO))
+    conteudo, buffer = ler_jsonld_em_fluxo(blocos)
+    dados_json = json.loads(conteudo.decode("utf-8"))
+    return encontrar_no_medicamento(dados_json, url), len(buffer)
+
+
+def medir(funcao, pagina, url, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado, bytes_lidos = funcao(pagina, url)
+        tempos.append(time.perf_counter() - inicio)
+    return resultado, bytes_lidos, statistics.median(tempos)
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    print(f"{'página':<38}{'soup (ms)':>11}{'fluxo (ms)':>12}{'ganho':>8}{'bytes soup':>12}{'bytes fluxo':>13}")
+    for arquivo in sorted(PASTA_FIXTURES.glob("*.html")):
+        nome, medicamentoid = arquivo.stem.split("__")
+        url = f"https://farmaindex.com/{nome}/{medicamentoid}"
+        pagina = arquivo.read_bytes()
+
+        no_soup, bytes_soup, tempo_soup = medir(via_soup, pagina, url, repeticoes)
+        no_fluxo, bytes_fluxo, tempo_fluxo = medir(via_fluxo, pagina, url, repeticoes)
+        if no_soup != no_fluxo:
+            raise SystemExit(f"Resultados diferentes para {arquivo.name}")
+
+        print(
+            f"{arquivo.stem:<38}{tempo_soup * 1000:>11.2f}{tempo_fluxo * 1000:>12.2f}"
+            f"{tempo_soup / tempo_fluxo:>7.1f}x{bytes_soup:>12}{bytes_fluxo:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compara o carregamento da página de resultados do Google Shopping em dois perfis do Chrome:
+- atual: com janela, carregando imagens, fontes, CSS e scripts de rastreamento;
+- enxuto: headless, sem imagens e com as URLs de navegador.URLS_BLOQUEADAS recusadas.
+
+Mede pela Performance API do próprio navegador o tempo até o evento load, o tempo até
+o seletor de preço aparecer, o número de requisições e os bytes transferidos. Recursos
+de outros domínios sem Timing-Allow-Origin aparecem com 0 bytes nos dois perfis, então
+os bytes são um limite inferior. Também confere que a extração acha os mesmos itens.
+
+Precisa do Chrome e de acesso à internet.
+Uso: python bench_navegador.py [repeticoes] [produto ...]
+"""
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from search.navegador import criar_driver  # noqa: E402
+from search.product4 import SELETOR_PRECO_ARIA, analisar_html  # noqa: E402
+
+PRODUTOS_PADRAO = ["whey protein 900g", "dipirona 500mg 10 comprimidos", "fralda pampers m"]
+
+METRICAS_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const recursos = performance.getEntriesByType('resource');
+return {
+    carga_ms: nav.loadEventEnd - nav.startTime,
+    requisicoes: recursos.length + 1,
+    bytes: nav.transferSize + recursos.reduce((total, r) => total + r.transferSize, 0),
+};
+"""
+
+
+def medir_pagina(driver, produto):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    query = produto.replace(" ", "+")
+    inicio = time.perf_counter()
+    driver.get(f"https://www.google.com/search?tbm=shop&q={query}")
+    WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, SELETOR_PRECO_ARIA)))
+    seletor_ms = (time.perf_counter() - inicio) * 1000
+    metricas = driver.execute_script(METRICAS_JS)
+    _, _, itens = analisar_html(driver.page_source, produto)
+    return {**metricas, "seletor_ms": seletor_ms, "itens": len(itens)}
+
+
+def medir_perfil(produtos, repeticoes, **opcoes):
+    driver = criar_driver(**opcoes)
+    try:
+        medidas = {produto: [medir_pagina(driver, produto) for _ in range(repeticoes)] for produto in produtos}
+    finally:
+        driver.quit()
+    return medidas
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    produtos = sys.argv[2:] or PRODUTOS_PADRAO
+
+    perfis = {
+        "atual": medir_perfil(produtos, repeticoes, visivel=True, enxuto=False),
+        "enxuto": medir_perfil(produtos, repeticoes, visivel=False, enxuto=True),
+    }
+
+    print(f"{'produto':<32}{'perfil':<8}{'load (ms)':>11}{'seletor (ms)':>14}{'requisições':>13}{'KB':>9}{'itens':>7}")
+    for produto in produtos:
+        for perfil, medidas in perfis.items():
+            amostras = medidas[produto]
+
+            def mediana(chave):
+                return statistics.median(amostra[chave] for amostra in amostras)
+
+            print(
+                f"{produto[:31]:<32}{perfil:<8}{mediana('carga_ms'):>11.0f}{mediana('seletor_ms'):>14.0f}"
+                f"{mediana('requisicoes'):>13.0f}{mediana('bytes') / 1024:>9.0f}{mediana('itens'):>7.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
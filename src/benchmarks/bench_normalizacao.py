@@ -0,0 +1,115 @@
+"""
+Mede a normalização de quantidades/unidades e de preços em 100 mil títulos sintéticos:
+- antigo: a cópia de extrair_unidade_e_quantidade de product4 (match/case) e o
+  parse de preço com /100, chamados item a item;
+- escalar: normalizacao.extrair_unidade_e_quantidade / preco_em_centavos item a item
+  (cache limpo antes de medir; os títulos se repetem pouco);
+- vetorizado: normalizacao.normalizar_quantidades / normalizar_precos sobre a Series.
+
+Também confere que o escalar e o vetorizado concordam em todos os itens e conta em
+quantos títulos o resultado mudou em relação ao antigo (multipacks, "litros", milhar).
+Uso: python bench_normalizacao.py [quantidade]
+"""
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from search.normalizacao import (  # noqa: E402
+    analisar_quantidade,
+    extrair_unidade_e_quantidade,
+    normalizar_precos,
+    normalizar_quantidades,
+    preco_em_centavos,
+)
+
+NOMES = ["Whey Protein", "Creatina", "Dipirona", "Shampoo", "Leite em Pó", "Fralda", "Óleo de Coco", "Colágeno"]
+TAMANHOS = ["900g", "1kg", "1,5 kg", "2x400g", "6 x 200ml", "1 litro", "2 litros", "500 ml", "60 caps",
+            "30 cápsulas", "20 comprimidos", "80 unidades", "1.000g", "400g x 2", "", "Sem Sabor"]
+
+
+def extrair_antigo(texto_produto):
+    if not isinstance(texto_produto, str):
+        return None, None
+    texto_produto = texto_produto.lower()
+    match = re.search(r"(\d[\d.,]*)\s?(kg|kilos|kilo|g|gr|grama|gramas|ml|l|litros|litro|caps|cápsulas|cápsula|capsula|capsulas|comprimidos|comprimido)\b", texto_produto)
+    if not match:
+        return None, None
+    quantidade = float(match.group(1).replace(",", "."))
+    unidade = match.group(2)
+    if unidade in ("kg", "kilo"):
+        quantidade *= 1000
+        unidade = "g"
+    elif unidade in ("gramas", "grama", "gr", "g"):
+        unidade = "g"
+    elif unidade in ("l", "litro"):
+        quantidade *= 1000
+        unidade = "ml"
+    elif unidade == "ml":
+        unidade = "ml"
+    elif unidade in ("caps", "cápsulas", "cápsula", "capsulas", "capsula", "comprimidos", "comprimido"):
+        unidade = "caps"
+    else:
+        unidade = "u"
+    return str(int(quantidade)), unidade
+
+
+def preco_antigo(texto):
+    preco_limpo = re.search(r"[\d.,]+", texto)
+    return float(preco_limpo.group().replace(".", "").replace(",", "")) / 100 if preco_limpo else None
+
+
+def gerar_dados(quantidade):
+    aleatorio = random.Random(0)
+    titulos, precos = [], []
+    for i in range(quantidade):
+        titulos.append(f"{aleatorio.choice(NOMES)} Marca{aleatorio.randint(1, 5000)} {aleatorio.choice(TAMANHOS)}")
+        valor = aleatorio.uniform(1, 3000)
+        reais = f"{int(valor):,}".replace(",", ".")
+        precos.append(f"Current price: R$ {reais},{int(valor * 100) % 100:02d}")
+    return pd.Series(titulos, name="titulo"), pd.Series(precos, name="preco")
+
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    titulos, precos = gerar_dados(quantidade)
+    lista_titulos, lista_precos = titulos.tolist(), precos.tolist()
+
+    antigos, tempo_antigo = cronometrar(lambda: [extrair_antigo(t) for t in lista_titulos])
+    analisar_quantidade.cache_clear()
+    escalares, tempo_escalar = cronometrar(lambda: [extrair_unidade_e_quantidade(t) for t in lista_titulos])
+    vetorizado, tempo_vetorizado = cronometrar(lambda: normalizar_quantidades(titulos))
+
+    analisar_quantidade.cache_clear()
+    for titulo, (quantidade_v, unidade_v) in zip(lista_titulos, vetorizado[["quantidade", "unidade"]].itertuples(index=False)):
+        quantidade_e, unidade_e, _ = analisar_quantidade(titulo)
+        if (quantidade_e, unidade_e) != ((None, None) if pd.isna(quantidade_v) else (quantidade_v, unidade_v)):
+            raise SystemExit(f"Escalar e vetorizado divergem em '{titulo}'")
+    mudaram = sum(antigo != novo for antigo, novo in zip(antigos, escalares))
+
+    _, tempo_preco_antigo = cronometrar(lambda: [preco_antigo(p) for p in lista_precos])
+    centavos, tempo_preco_escalar = cronometrar(lambda: [preco_em_centavos(p) for p in lista_precos])
+    centavos_vetorizado, tempo_preco_vetorizado = cronometrar(lambda: normalizar_precos(precos))
+    if centavos != centavos_vetorizado.tolist():
+        raise SystemExit("Preços escalares e vetorizados divergem")
+
+    print(f"{quantidade} títulos e preços")
+    print(f"{'':<14}{'antigo (ms)':>13}{'escalar (ms)':>14}{'vetorizado (ms)':>17}")
+    print(f"{'quantidades':<14}{tempo_antigo * 1000:>13.0f}{tempo_escalar * 1000:>14.0f}{tempo_vetorizado * 1000:>17.0f}")
+    print(f"{'preços':<14}{tempo_preco_antigo * 1000:>13.0f}{tempo_preco_escalar * 1000:>14.0f}{tempo_preco_vetorizado * 1000:>17.0f}")
+    print(f"Títulos com resultado diferente do antigo: {mudaram} ({mudaram / quantidade:.1%})")
+
+
+if __name__ == "__main__":
+    main()
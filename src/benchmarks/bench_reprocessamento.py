@@ -0,0 +1,57 @@
+"""
+Mede o arquivo de páginas capturadas e o reprocessamento sem navegador:
+- captura: ArquivoPaginas.guardar de N páginas sintéticas de ~2 MB (paginas_shopping);
+- tamanho: bytes originais x comprimidos no arquivo;
+- reprocessar: product4.reprocessar (leitura, extração lxml, relevância, outliers e as
+  duas planilhas) sobre todas as páginas, uma vez por limiar de similaridade.
+
+Roda numa pasta temporária, para não mexer nas planilhas e no catálogo da pasta atual.
+Uso: python bench_reprocessamento.py [paginas]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from paginas_shopping import PRODUTOS_PADRAO, gerar_pagina  # noqa: E402
+from search.arquivo_paginas import ArquivoPaginas  # noqa: E402
+from search.product4 import reprocessar  # noqa: E402
+
+LIMIARES = [0.1, 0.5, 0.8]
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    os.chdir(tempfile.mkdtemp(prefix="bench_reprocessamento_"))
+
+    # Nomes distintos para cada página, para que cada uma seja um produto capturado
+    produtos = [f"{PRODUTOS_PADRAO[i % len(PRODUTOS_PADRAO)]} Lote{i}" for i in range(quantidade)]
+    paginas = (gerar_pagina(produto, semente=i) for i, produto in enumerate(produtos))
+
+    arquivo = ArquivoPaginas("paginas")
+    tempo_captura = 0.0
+    for produto, html in zip(produtos, paginas):
+        inicio = time.perf_counter()
+        arquivo.guardar(produto, html)
+        tempo_captura += time.perf_counter() - inicio
+    original, comprimido = arquivo.tamanhos()
+    arquivo.fechar()
+
+    print(f"{quantidade} páginas capturadas em {tempo_captura:.1f} s ({tempo_captura / quantidade * 1000:.1f} ms por página)")
+    print(f"Arquivo: {original / 2**20:.0f} MB de HTML em {comprimido / 2**20:.1f} MB ({original / comprimido:.0f}x)")
+
+    for limiar in LIMIARES:
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            reprocessar("paginas", limiar=limiar)
+        tempo = time.perf_counter() - inicio
+        print(f"reprocessar (limiar={limiar}): {tempo:.1f} s ({quantidade / tempo:.0f} páginas/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compara a pontuação de similaridade de centenas de candidatos por produto:
+- antigo: jaro_winkler_similarity(produto.lower(), nome.lower()) + extração da unidade,
+  par a par, como o laço de product4 fazia;
+- lote: similaridade.pontuar, com a consulta preparada uma vez e a poda por unidade,
+  para cada métrica de similaridade.METRICAS.
+
+Uso: python bench_similaridade.py [candidatos_por_produto]
+"""
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import jellyfish
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from paginas_shopping import PRODUTOS_PADRAO, _titulo  # noqa: E402
+from search.normalizacao import analisar_quantidade, extrair_unidade_e_quantidade  # noqa: E402
+from search.similaridade import METRICAS, Consulta, pontuar  # noqa: E402
+
+
+def antigo(produto, titulos):
+    qtd_original, unidade_original = extrair_unidade_e_quantidade(produto)
+    notas = []
+    for nome in titulos:
+        similaridade = jellyfish.jaro_winkler_similarity(produto.lower(), nome.lower())
+        qtd_encontrada, unidade_encontrada = extrair_unidade_e_quantidade(nome)
+        notas.append((similaridade, qtd_original is None or (qtd_original, unidade_original) == (qtd_encontrada, unidade_encontrada)))
+    return notas
+
+
+def medir(funcao, repeticoes=20):
+    tempos = []
+    for _ in range(repeticoes):
+        analisar_quantidade.cache_clear()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    aleatorio = random.Random(0)
+    print(f"{'produto':<44}{'podados':>8}{'antigo (ms)':>13}" + "".join(f"{m + ' (ms)':>21}" for m in METRICAS))
+    for produto in PRODUTOS_PADRAO:
+        titulos = [_titulo(aleatorio, produto) for _ in range(quantidade)]
+
+        notas = pontuar(Consulta(produto), titulos)
+        referencia = antigo(produto, titulos)
+        for nota, (similaridade, compativel) in zip(notas, referencia):
+            if compativel != (nota == nota) or (compativel and abs(nota - similaridade) > 1e-12):
+                raise SystemExit(f"Notas diferentes do laço antigo para '{produto}'")
+
+        tempo_antigo = medir(lambda: antigo(produto, titulos))
+        tempos = [medir(lambda: pontuar(Consulta(produto), titulos, metrica=m)) for m in METRICAS]
+        podados = int(sum(nota != nota for nota in notas))
+        print(
+            f"{produto[:43]:<44}{podados:>8}{tempo_antigo * 1000:>13.2f}"
+            + "".join(f"{tempo * 1000:>21.2f}" for tempo in tempos)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Compara os extratores das quatro variantes do buscador do Google Shopping sobre um
+corpus de páginas salvas:
+- product:  span[aria-label^="Current price:"], só o texto do preço;
+- product2: div[title]:has(img) e o primeiro span/div com "R$" dentro dele;
+- product3: div[aria-label] e três find_parent até o container com o div[title];
+- product4: a extração lxml da grade (a mesma do fallback de page_source) e a relevância
+  de analisar_registros (catálogo desligado, outliers fora).
+
+Para cada variante e página mede o tempo de CPU de extração + seleção (mediana), o pico
+de memória Python (tracemalloc; a memória interna do libxml2 não entra), os registros
+extraídos e os que passaram pela relevância. O resultado vai para um JSON com o commit
+atual; com --comparar, mostra a razão de tempo contra um JSON anterior.
+
+O corpus são os .html de fixtures/google_shopping (subpastas = layout), gerados por
+paginas_shopping.py se a pasta estiver vazia. Páginas reais podem ser acrescentadas
+numa subpasta própria: o produto pesquisado sai do <title> ("<produto> - Pesquisa Google").
+
+Uso: python bench_variantes.py [--repeticoes N] [--saida arquivo.json] [--comparar anterior.json]
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from paginas_shopping import PASTA_FIXTURES, gravar_fixtures  # noqa: E402
+from search import product, product2, product3, product4  # noqa: E402
+from search.estatistica import STATUS_INCLUIDO  # noqa: E402
+from search.extracao_lxml import extrair_registros_lxml  # noqa: E402
+
+TITULO_PAGINA = re.compile(r"<title>(.*?) - Pesquisa Google</title>", re.S)
+
+
+def _selecionar_product4(registros, produto):
+    itens = product4.analisar_registros(registros, produto, metodo_outliers=None)[2]
+    return [item["Preco"] for item in itens if item["Status_Calculo"] == STATUS_INCLUIDO]
+
+
+# variante -> (extração do HTML, seleção dos preços relevantes)
+VARIANTES = {
+    "product": (product.extrair_registros, product.selecionar_precos),
+    "product2": (product2.extrair_registros, product2.selecionar_precos),
+    "product3": (product3.extrair_registros, product3.selecionar_precos),
+    "product4": (extrair_registros_lxml, _selecionar_product4),
+}
+
+
+def carregar_corpus(pasta=PASTA_FIXTURES):
+    caminhos = sorted(pasta.rglob("*.html")) or gravar_fixtures(pasta)
+    corpus = []
+    for caminho in caminhos:
+        html = caminho.read_text(encoding="utf-8")
+        titulo = TITULO_PAGINA.search(html)
+        if not titulo:
+            print(f"Ignorando '{caminho}': sem '<produto> - Pesquisa Google' no <title>")
+            continue
+        corpus.append({
+            "pagina": str(caminho.relative_to(pasta)),
+            "layout": caminho.parent.name if caminho.parent != pasta else "",
+            "produto": titulo.group(1).replace("&amp;", "&"),
+            "kb": round(len(html.encode("utf-8")) / 1024),
+            "html": html,
+        })
+    return corpus
+
+
+def medir(extrair, selecionar, html, produto, repeticoes):
+    """(registros extraídos, preços relevantes, mediana de CPU em ms, pico tracemalloc em KB)."""
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.process_time()
+            registros = extrair(html)
+            precos = selecionar(registros, produto)
+            tempos.append(time.process_time() - inicio)
+
+        tracemalloc.start()
+        selecionar(extrair(html), produto)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return len(registros), len(precos), statistics.median(tempos) * 1000, pico / 1024
+
+
+def commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos extratores das variantes do buscador")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--saida", default="bench_variantes.json")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    args = parser.parse_args()
+
+    corpus = carregar_corpus()
+    medidas = []
+    for pagina in corpus:
+        for variante, (extrair, selecionar) in VARIANTES.items():
+            extraidos, relevantes, tempo_ms, pico_kb = medir(
+                extrair, selecionar, pagina["html"], pagina["produto"], args.repeticoes
+            )
+            medidas.append({
+                "variante": variante,
+                "pagina": pagina["pagina"],
+                "layout": pagina["layout"],
+                "produto": pagina["produto"],
+                "kb": pagina["kb"],
+                "tempo_ms": round(tempo_ms, 3),
+                "pico_memoria_kb": round(pico_kb, 1),
+                "registros_extraidos": extraidos,
+                "registros_relevantes": relevantes,
+            })
+
+    # Resumo por variante e layout: tempo e memória médios por página, registros somados
+    resumo = {}
+    for medida in medidas:
+        chave = (medida["variante"], medida["layout"])
+        resumo.setdefault(chave, []).append(medida)
+    linhas_resumo = [
+        {
+            "variante": variante,
+            "layout": layout,
+            "paginas": len(grupo),
+            "tempo_ms_por_pagina": round(statistics.mean(m["tempo_ms"] for m in grupo), 3),
+            "pico_memoria_kb": round(max(m["pico_memoria_kb"] for m in grupo), 1),
+            "registros_extraidos": sum(m["registros_extraidos"] for m in grupo),
+            "registros_relevantes": sum(m["registros_relevantes"] for m in grupo),
+        }
+        for (variante, layout), grupo in resumo.items()
+    ]
+
+    anteriores = {}
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            anteriores = {(l["variante"], l["layout"]): l for l in json.load(arquivo)["resumo"]}
+
+    print(f"{len(corpus)} páginas, {args.repeticoes} repetições")
+    print(f"{'variante':<10}{'layout':<12}{'ms/página':>11}{'pico KB':>10}{'extraídos':>11}{'relevantes':>12}"
+          + (f"{'vs anterior':>13}" if anteriores else ""))
+    for linha in linhas_resumo:
+        texto = (
+            f"{linha['variante']:<10}{linha['layout']:<12}{linha['tempo_ms_por_pagina']:>11.1f}"
+            f"{linha['pico_memoria_kb']:>10.0f}{linha['registros_extraidos']:>11}{linha['registros_relevantes']:>12}"
+        )
+        anterior = anteriores.get((linha["variante"], linha["layout"]))
+        if anterior and anterior["tempo_ms_por_pagina"]:
+            texto += f"{linha['tempo_ms_por_pagina'] / anterior['tempo_ms_por_pagina']:>12.2f}x"
+        print(texto)
+
+    resultado = {
+        "commit": commit_atual(),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "repeticoes": args.repeticoes,
+        "resumo": linhas_resumo,
+        "medidas": medidas,
+    }
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    print(f"Resultados em '{args.saida}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Gera páginas sintéticas de resultados do Google Shopping para os benchmarks, com a mesma
+estrutura que product4 lê (div[aria-label^="Current price"] ao lado do div[title], dentro
+de um <a href="/url?q=...">) e o peso de uma página real: CSS e scripts embutidos e
+milhares de nós fora da grade de resultados. São determinísticas para a mesma semente.
+
+`layout` escolhe a marcação de cada resultado (LAYOUTS): a atual e as versões
+anteriores da grade para as quais product.py e product2.py foram escritos.
+
+Uso: python paginas_shopping.py  (grava fixtures/google_shopping/<layout>/*.html)
+"""
+import html
+import random
+from pathlib import Path
+
+PASTA_FIXTURES = Path(__file__).resolve().parent / "fixtures" / "google_shopping"
+
+PRODUTOS_PADRAO = [
+    "Whey Protein Concentrado 900g Baunilha",
+    "Dipirona Monoidratada 500mg 10 Comprimidos",
+    "Creatina Monohidratada 300g",
+    "Fralda Pampers Confort Sec M 80 Unidades",
+    "Shampoo Anticaspa 400ml",
+]
+
+MARCAS = ["Growth", "Max Titanium", "Integralmedica", "Probiotica", "Medley", "EMS", "Neo Química", "Genérico"]
+SABORES = ["Baunilha", "Chocolate", "Morango", "Natural", "Cookies", "Sem Sabor"]
+# Marcação do preço e do título em cada versão da grade de resultados
+LAYOUTS = {
+    "aria_div": "preço num div[aria-label] ao lado do div[title] (product3, product4)",
+    "aria_span": "preço num span[aria-label] (product.py)",
+    "titulo_img": "preço em texto dentro do div[title] com a imagem, sem aria-label (product2)",
+}
+
+LOJAS = ["drogasil", "drogaraia", "paguemenos", "netshoes", "amazon", "mercadolivre", "magazineluiza", "panvel"]
+
+
+def _preco_brl(valor):
+    inteiro, centavos = f"{valor:.2f}".split(".")
+    inteiro = f"{int(inteiro):,}".replace(",", ".")
+    return f"{inteiro},{centavos}"
+
+
+def _titulo(aleatorio, produto):
+    palavras = produto.split()
+    escolha = aleatorio.random()
+    if escolha < 0.5:
+        # Mesmo produto, com marca e sabor
+        return f"{aleatorio.choice(MARCAS)} {produto} {aleatorio.choice(SABORES)}"
+    if escolha < 0.7:
+        # Mesmo produto em outra embalagem
+        tamanho = aleatorio.choice(["250g", "1kg", "2kg", "60 caps", "20 comprimidos", "1l", "200ml"])
+        return f"{aleatorio.choice(MARCAS)} {' '.join(palavras[:2])} {tamanho}"
+    if escolha < 0.85:
+        # Kit com várias unidades
+        return f"Kit {aleatorio.randint(2, 6)}x {produto}"
+    # Algo pouco relacionado
+    return f"{aleatorio.choice(MARCAS)} {aleatorio.choice(['Coqueteleira', 'Toalha', 'Garrafa', 'Vitamina C'])} {aleatorio.randint(1, 999)}"
+
+
+def _oferta(layout, titulo_attr, titulo, preco):
+    if layout == "aria_span":
+        return (
+            f'<div class="ArOc1c" title="{titulo_attr}"><img src="data:image/gif;base64,R0lGODlhAQABAAAAACw=" alt=""></div>'
+            f'<h3 class="tAxDx">{html.escape(titulo)}</h3>'
+            f'<div class="XrAfOe"><span class="a8Pemb" aria-label="Current price: R$ {preco}">R$ {preco}</span></div>'
+        )
+    if layout == "titulo_img":
+        return (
+            f'<div class="ArOc1c" title="{titulo_attr}"><img src="data:image/gif;base64,R0lGODlhAQABAAAAACw=" alt="">'
+            f'<span class="a8Pemb">R$ {preco}</span></div>'
+            f'<h3 class="tAxDx">{html.escape(titulo)}</h3>'
+        )
+    return (
+        f'<div class="ArOc1c" title="{titulo_attr}"><img src="data:image/gif;base64,R0lGODlhAQABAAAAACw=" alt=""></div>'
+        f'<h3 class="tAxDx">{html.escape(titulo)}</h3>'
+        f'<div class="XrAfOe" aria-label="Current price: R$ {preco}"><span class="a8Pemb">R$ {preco}</span></div>'
+    )
+
+
+def _resultado(aleatorio, produto, indice, base, layout="aria_div"):
+    titulo = _titulo(aleatorio, produto)
+    valor = base * aleatorio.lognormvariate(0, 0.25)
+    if aleatorio.random() < 0.08:
+        valor *= aleatorio.choice([0.2, 5.0])  # outlier
+    preco = _preco_brl(valor)
+    loja = aleatorio.choice(LOJAS)
+    slug = "-".join(titulo.lower().split())
+    href = f"/url?q=https://www.{loja}.com.br/{html.escape(slug, quote=True)}&amp;sa=U&amp;ved=0ahUKEw{indice:04d}"
+    titulo_attr = html.escape(titulo, quote=True)
+    return (
+        f'<div class="sh-dgr__grid-result" data-docid="{aleatorio.getrandbits(48)}">'
+        f'<div class="sh-dgr__content">'
+        f'<a class="shntl" href="{href}">'
+        f'<div class="sh-dgr__offer-content">'
+        f"{_oferta(layout, titulo_attr, titulo, preco)}"
+        f'<div class="aULzUe IuHnof">{loja.capitalize()}</div>'
+        f"</div></a></div></div>"
+    )
+
+
+def _ruido_dom(aleatorio, nos):
+    # Menus, rodapé e painéis que não fazem parte da grade de resultados
+    partes = []
+    for i in range(nos):
+        partes.append(f'<div class="n{i % 97}" jsname="x{i}"><span>{aleatorio.getrandbits(32):x}</span></div>')
+    return "".join(partes)
+
+
+def _script_embutido(aleatorio, tamanho):
+    caracteres = "abcdefghijklmnopqrstuvwxyz0123456789"
+    linha = "".join(aleatorio.choice(caracteres) for _ in range(120))
+    return f"<script nonce=\"x\">var _g={{'d':'{linha * (tamanho // 120)}'}};</script>"
+
+
+def gerar_pagina(produto, itens=60, preenchimento_kb=1500, semente=0, layout="aria_div"):
+    aleatorio = random.Random(f"{produto}:{semente}")
+    base = aleatorio.uniform(20, 250)
+    scripts = "".join(_script_embutido(aleatorio, 50 * 1024) for _ in range(max(1, preenchimento_kb // 2 // 50)))
+    resultados = "".join(_resultado(aleatorio, produto, i, base, layout) for i in range(itens))
+    return (
+        "<!DOCTYPE html><html lang=\"pt-BR\"><head><meta charset=\"utf-8\">"
+        f"<title>{html.escape(produto)} - Pesquisa Google</title>"
+        f"<style>{'.c{margin:0;padding:0}' * 2000}</style>{scripts}</head><body>"
+        f"<div id=\"searchform\">{_ruido_dom(aleatorio, 1500)}</div>"
+        f"<div id=\"rso\">{resultados}</div>"
+        f"<div id=\"footcnt\">{_ruido_dom(aleatorio, 6000)}</div>"
+        f"{scripts}</body></html>"
+    )
+
+
+def gravar_fixtures(pasta=PASTA_FIXTURES):
+    """Grava uma página por produto de PRODUTOS_PADRAO em cada layout; retorna os caminhos."""
+    caminhos = []
+    for layout in LAYOUTS:
+        (pasta / layout).mkdir(parents=True, exist_ok=True)
+        for produto in PRODUTOS_PADRAO:
+            caminho = pasta / layout / f"{'-'.join(produto.lower().split())}.html"
+            caminho.write_text(gerar_pagina(produto, layout=layout), encoding="utf-8")
+            caminhos.append(caminho)
+    return caminhos
+
+
+def main():
+    for caminho in gravar_fixtures():
+        print(f"{caminho.parent.name}/{caminho.name}: {caminho.stat().st_size / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
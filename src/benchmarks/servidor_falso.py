@@ -0,0 +1,286 @@
+"""
+Servidor local que imita as origens externas do VigiaFarma, para testes de carga:
+- GET  /search?tbm=shop&q=...   página de resultados do Google Shopping (gravada com
+  produtos --capturar, se houver, ou sintética de paginas_shopping), com redirecionamento
+  para /sorry/index (CAPTCHA) numa fração das buscas;
+- POST /graphql                 a API searchPrefix do farmaindex, inclusive a consulta
+  em lote com apelidos r0, r1, ... (ou recusada com 400, com --sem-lote);
+- GET  /<nome>/<medicamentoid>  a página de detalhe com o bloco JSON-LD do medicamento;
+- GET  /__estatisticas          requisições atendidas por rota e status (JSON).
+
+Latência, variação, taxa de erros (503), respostas lentas e limite de requisições por
+segundo (429 com Retry-After) são configuráveis. Os dados são determinísticos: o mesmo
+nome sempre devolve os mesmos medicamentos e preços.
+
+Uso: python servidor_falso.py [--porta 8765] [--latencia 0.05] [--taxa-erro 0.02] ...
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from paginas_shopping import gerar_pagina  # noqa: E402
+
+LABORATORIOS = ["EMS", "Medley", "Neo Química", "Eurofarma", "Germed", "Prati-Donaduzzi"]
+APRESENTACOES = ["10 comprimidos", "20 comprimidos", "30 cápsulas", "gotas 20ml", "xarope 100ml"]
+# Tamanho do HTML depois do JSON-LD nas páginas de detalhe (as reais têm ~100 KB)
+PREENCHIMENTO_DETALHE = 100 * 1024
+
+
+def adicionar_argumentos(parser):
+    parser.add_argument("--latencia", type=float, default=0.05, help="segundos de atraso de cada resposta")
+    parser.add_argument("--variacao", type=float, default=0.02, help="segundos sorteados a mais ou a menos na latência")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="fração das requisições que recebem 503")
+    parser.add_argument("--taxa-lenta", type=float, default=0.0, help="fração das respostas que demoram --atraso-lento a mais")
+    parser.add_argument("--atraso-lento", type=float, default=3.0, help="segundos a mais das respostas lentas")
+    parser.add_argument("--taxa-captcha", type=float, default=0.0, help="fração das buscas do Shopping mandadas para /sorry/index")
+    parser.add_argument("--limite-rps", type=float, default=0.0, help="requisições por segundo antes de responder 429 (0 = sem limite)")
+    parser.add_argument("--sem-lote", action="store_true", help="recusa as consultas GraphQL em lote com 400")
+    parser.add_argument("--paginas", help="pasta de páginas capturadas (produtos --capturar) servidas no lugar das sintéticas")
+    parser.add_argument("--semente", type=int, default=0)
+
+
+def _numero(texto, maximo):
+    return int.from_bytes(hashlib.sha256(texto.encode("utf-8")).digest()[:6], "big") % maximo
+
+
+def medicamentos_de(nome):
+    """Resultados determinísticos do searchPrefix para `nome` (alguns sem preço, como na API real)."""
+    resultados = []
+    for i in range(1 + _numero(nome, 4)):
+        chave = f"{nome}:{i}"
+        medicamento = f"{nome.strip().title()} {LABORATORIOS[_numero(chave, len(LABORATORIOS))]}"
+        resultados.append({
+            "medicamentoid": 10000 + _numero(chave, 90000),
+            "medicamento": medicamento,
+            "apresentacao": APRESENTACOES[_numero(chave + "a", len(APRESENTACOES))],
+            "farmaco": nome.lower(),
+            "laboratorio": LABORATORIOS[_numero(chave, len(LABORATORIOS))],
+            "tipoid": 1,
+            "tipo": "Genérico",
+            "imagem": None,
+            "imagemUrl": None,
+            "tarja": "Sem tarja",
+            "oferta": False,
+            "url": None,
+            "preco": None if _numero(chave + "p", 5) == 0 else round(5 + _numero(chave + "v", 20000) / 100, 2),
+            "__typename": "Medicamento",
+        })
+    return resultados
+
+
+def pagina_detalhe(url):
+    """Página de detalhe com o JSON-LD cujo @id é `<url>#drug`, seguida de HTML de enchimento."""
+    id_medicamento = url.rstrip("/").rsplit("/", 1)[-1]
+    menor = 5 + _numero(url, 5000) / 100
+    grafo = {
+        "@context": "https://schema.org",
+        "@graph": [
+            {"@type": "WebPage", "@id": url},
+            {
+                "@type": "Drug",
+                "@id": quote(f"{url}#drug", safe="/:#?="),
+                "identifier": {"@type": "PropertyValue", "value": f"1{int(id_medicamento) % 10**8:08d}"},
+                "offers": {"@type": "AggregateOffer", "lowPrice": round(menor, 2), "highPrice": round(menor * 1.8, 2)},
+            },
+        ],
+    }
+    enchimento = "<div class=\"n\"><span>farmaindex</span></div>" * (PREENCHIMENTO_DETALHE // 42)
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>farmaindex</title>"
+        f"<script type=\"application/ld+json\">{json.dumps(grafo, ensure_ascii=False)}</script>"
+        f"</head><body>{enchimento}</body></html>"
+    )
+
+
+class Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, endereco, configuracao):
+        super().__init__(endereco, Manipulador)
+        self.configuracao = configuracao
+        self.estatisticas = Counter()
+        self.aleatorio = random.Random(configuracao.semente)
+        self.trava = threading.Lock()
+        self._fichas = configuracao.limite_rps
+        self._atualizado_em = time.monotonic()
+        self._capturas = None
+        if configuracao.paginas:
+            from search.arquivo_paginas import ArquivoPaginas
+
+            self._arquivo = ArquivoPaginas(configuracao.paginas)
+            self._capturas = self._arquivo.capturas()
+
+    def handle_error(self, requisicao, endereco):
+        # Clientes que fecham a conexão no meio da resposta (o medicine para de ler a
+        # página de detalhe no fim do JSON-LD) não são erro do servidor
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(requisicao, endereco)
+
+    def sortear(self, taxa):
+        with self.trava:
+            return self.aleatorio.random() < taxa
+
+    def atraso(self):
+        configuracao = self.configuracao
+        with self.trava:
+            atraso = configuracao.latencia + self.aleatorio.uniform(-configuracao.variacao, configuracao.variacao)
+            if self.aleatorio.random() < configuracao.taxa_lenta:
+                atraso += configuracao.atraso_lento
+        return max(atraso, 0.0)
+
+    def liberar(self):
+        """Balde de fichas do --limite-rps: False se a requisição deve receber 429."""
+        limite = self.configuracao.limite_rps
+        if not limite:
+            return True
+        with self.trava:
+            agora = time.monotonic()
+            self._fichas = min(limite, self._fichas + (agora - self._atualizado_em) * limite)
+            self._atualizado_em = agora
+            if self._fichas < 1:
+                return False
+            self._fichas -= 1
+            return True
+
+    def pagina_shopping(self, produto):
+        if self._capturas and produto in self._capturas:
+            # O mapa de paginas.dat é de uma instância só, compartilhada pelas threads
+            with self.trava:
+                return self._arquivo.ler(self._capturas[produto])
+        return _pagina_sintetica(produto)
+
+
+@lru_cache(maxsize=256)
+def _pagina_sintetica(produto):
+    return gerar_pagina(produto)
+
+
+class Manipulador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, rota, status, corpo=b"", tipo="text/html; charset=utf-8", cabecalhos=None):
+        self.server.estatisticas[f"{rota} {status}"] += 1
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(corpo)
+
+    def _falha_simulada(self, rota):
+        """Aplica latência, limite de taxa e erros; True se a resposta já foi enviada."""
+        time.sleep(self.server.atraso())
+        if not self.server.liberar():
+            self._responder(rota, 429, b"Too Many Requests", "text/plain", {"Retry-After": "1"})
+            return True
+        if self.server.sortear(self.server.configuracao.taxa_erro):
+            self._responder(rota, 503, b"Service Unavailable", "text/plain")
+            return True
+        return False
+
+    def do_GET(self):
+        endereco = urlparse(self.path)
+        if endereco.path == "/__estatisticas":
+            corpo = json.dumps(dict(self.server.estatisticas)).encode("utf-8")
+            self._responder("estatisticas", 200, corpo, "application/json")
+        elif endereco.path == "/search":
+            self._shopping(endereco)
+        elif endereco.path == "/sorry/index":
+            self._responder("sorry", 429, b"<html><body>Our systems have detected unusual traffic</body></html>")
+        elif endereco.path.count("/") == 2 and endereco.path.rsplit("/", 1)[-1].isdigit():
+            self._detalhe(endereco)
+        else:
+            self._responder("outros", 404, b"Not Found", "text/plain")
+
+    def do_POST(self):
+        tamanho = int(self.headers.get("Content-Length", 0))
+        corpo = self.rfile.read(tamanho)
+        if urlparse(self.path).path != "/graphql":
+            self._responder("outros", 404, b"Not Found", "text/plain")
+            return
+        self._graphql(corpo)
+
+    def _shopping(self, endereco):
+        if self._falha_simulada("search"):
+            return
+        produto = parse_qs(endereco.query).get("q", [""])[0]
+        if self.server.sortear(self.server.configuracao.taxa_captcha):
+            destino = f"/sorry/index?continue={quote(self.path, safe='')}"
+            self._responder("search", 302, b"", cabecalhos={"Location": destino})
+            return
+        self._responder("search", 200, self.server.pagina_shopping(produto).encode("utf-8"))
+
+    def _graphql(self, corpo):
+        if self._falha_simulada("graphql"):
+            return
+        try:
+            payload = json.loads(corpo)
+        except ValueError:
+            self._responder("graphql", 400, json.dumps({"errors": [{"message": "JSON inválido"}]}).encode("utf-8"), "application/json")
+            return
+        variaveis = payload.get("variables") or {}
+        if payload.get("operationName") == "searchPrefix":
+            dados = {"searchPrefix": medicamentos_de(variaveis.get("q", ""))}
+        elif self.server.configuracao.sem_lote:
+            corpo = json.dumps({"errors": [{"message": "Query complexity limit exceeded"}]}).encode("utf-8")
+            self._responder("graphql", 400, corpo, "application/json")
+            return
+        else:
+            # Consulta em lote: $q0, $q1, ... respondidas nos apelidos r0, r1, ...
+            dados = {f"r{chave[1:]}": medicamentos_de(nome) for chave, nome in variaveis.items()}
+        self._responder("graphql", 200, json.dumps({"data": dados}).encode("utf-8"), "application/json")
+
+    def _detalhe(self, endereco):
+        if self._falha_simulada("detalhe"):
+            return
+        # O @id do JSON-LD é montado sobre a URL sem percent-encoding, como em encontrar_no_medicamento
+        url = f"http://{self.headers.get('Host')}{unquote(endereco.path)}"
+        corpo = pagina_detalhe(url).encode("utf-8")
+        etag = '"' + hashlib.sha1(corpo).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self._responder("detalhe", 304)
+            return
+        self._responder("detalhe", 200, corpo, cabecalhos={"ETag": etag})
+
+
+def iniciar(configuracao, porta=0, pronto=None):
+    """Sobe o servidor em 127.0.0.1:`porta` e atende até ser encerrado; avisa a porta em `pronto`."""
+    servidor = Servidor(("127.0.0.1", porta), configuracao)
+    if pronto is not None:
+        pronto.put(servidor.server_address[1])
+    else:
+        print(f"Servidor falso em http://127.0.0.1:{servidor.server_address[1]}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--porta", type=int, default=8765)
+    adicionar_argumentos(parser)
+    args = parser.parse_args()
+    iniciar(args, args.porta)
+
+
+if __name__ == "__main__":
+    main()
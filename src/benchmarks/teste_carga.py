@@ -0,0 +1,214 @@
+"""
+Teste de carga das funções de busca contra o servidor_falso.py (nunca contra os sites reais):
+- shopping:     product4.buscar_precos (não interativo, outliers fora), com um driver que
+                imita o WebDriver sobre HTTP: sem JavaScript, a extração cai no lxml;
+- searchprefix: medicine.buscar_medicamento, uma busca por chamada;
+- lote:         medicine.buscar_medicamentos_em_lote, TAMANHO_LOTE_GRAPHQL nomes por chamada;
+- jsonld:       medicine.extrair_dados_medicamento nas páginas de detalhe.
+
+As funções são apontadas para o servidor trocando product4.URL_GOOGLE, medicine.API_URL
+e medicine.SITE_URL. Cada cenário faz --requisicoes chamadas com --concorrencia threads e
+mostra chamadas/s, falhas e a latência p50/p95/p99 de cada chamada (com as retentativas
+da Resiliencia, no caso do medicine). No fim, as respostas do servidor por rota e status
+e o reaproveitamento de conexões; o cenário jsonld falha (código de saída 1) se nenhuma
+conexão das páginas de detalhe tiver sido reaproveitada.
+
+O servidor sobe num processo separado com as opções de servidor_falso.py, ou use --url
+para um servidor já rodando.
+Uso: python teste_carga.py [--cenarios shopping lote] [--concorrencia 8] [--requisicoes 200] [--taxa-erro 0.05] ...
+"""
+import argparse
+import contextlib
+import itertools
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import requests
+from lxml import html as lxml_html
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from paginas_shopping import PRODUTOS_PADRAO  # noqa: E402
+from search import medicine, product4  # noqa: E402
+from search.cliente_http import mostra_estatisticas_conexoes  # noqa: E402
+from servidor_falso import adicionar_argumentos, iniciar, medicamentos_de  # noqa: E402
+
+MEDICAMENTOS = [
+    "dipirona", "paracetamol", "ibuprofeno", "amoxicilina", "losartana", "omeprazol",
+    "sinvastatina", "metformina", "azitromicina", "loratadina", "nimesulida", "captopril",
+]
+SELETOR_ARIA = re.compile(r'(\w+)\[aria-label\^="([^"]*)"\]')
+
+
+class DriverHTTP:
+    """
+    O bastante da API do WebDriver para buscar_precos: get segue os redirecionamentos
+    (o /sorry/index aparece em current_url), find_element procura o seletor de preço no
+    HTML e execute_script não roda nada, para a extração usar page_source.
+    """
+
+    def __init__(self):
+        self.sessao = requests.Session()
+        self.current_url = ""
+        self.page_source = ""
+
+    def get(self, url):
+        resposta = self.sessao.get(url, timeout=30)
+        self.current_url = resposta.url
+        self.page_source = resposta.text
+
+    def find_element(self, por, seletor):
+        from selenium.common.exceptions import NoSuchElementException
+
+        # Só o formato de SELETOR_PRECO_ARIA: tag[aria-label^="prefixo"]
+        tag, prefixo = SELETOR_ARIA.fullmatch(seletor).groups()
+        encontrados = lxml_html.fromstring(self.page_source or "<html/>").xpath(
+            f"//{tag}[starts-with(@aria-label, $prefixo)]", prefixo=prefixo
+        )
+        if not encontrados:
+            raise NoSuchElementException(seletor)
+        return True
+
+    def execute_script(self, script, *argumentos):
+        return None
+
+    def quit(self):
+        self.sessao.close()
+
+
+_drivers = threading.local()
+
+
+def _driver():
+    if not hasattr(_drivers, "atual"):
+        _drivers.atual = DriverHTTP()
+    return _drivers.atual
+
+
+def chamar_shopping(produto):
+    minimo, _, _ = product4.buscar_precos(_driver(), produto, interativo=False, metodo_outliers=None)
+    return not isinstance(minimo, str)
+
+
+def chamar_searchprefix(nome):
+    return medicine.buscar_medicamento(nome, usar_cache=False) is not None
+
+
+def chamar_lote(nomes):
+    return all(resultado is not None for resultado in medicine.buscar_medicamentos_em_lote(nomes).values())
+
+
+def chamar_jsonld(url):
+    return medicine.extrair_dados_medicamento(url) is not None
+
+
+def argumentos_dos_cenarios():
+    """Cenário -> (função de uma chamada, gerador infinito dos argumentos de cada chamada)."""
+    # Nomes distintos a cada volta, para o lote não repetir nomes dentro da mesma consulta
+    nomes = (f"{nome} {volta}" for volta in itertools.count() for nome in MEDICAMENTOS)
+    urls = [
+        medicine.montar_url_medicamento(med)
+        for nome in MEDICAMENTOS
+        for med in medicamentos_de(nome)
+    ]
+    return {
+        "shopping": (chamar_shopping, itertools.cycle(PRODUTOS_PADRAO)),
+        "searchprefix": (chamar_searchprefix, itertools.cycle(MEDICAMENTOS)),
+        "lote": (chamar_lote, (list(itertools.islice(nomes, medicine.TAMANHO_LOTE_GRAPHQL)) for _ in itertools.count())),
+        "jsonld": (chamar_jsonld, itertools.cycle(urls)),
+    }
+
+
+def executar_cenario(chamar, argumentos, requisicoes, concorrencia):
+    """(duração total em s, latências em s, quantidade de chamadas que falharam)."""
+    def cronometrada(argumento):
+        inicio = time.perf_counter()
+        try:
+            sucesso = chamar(argumento)
+        except Exception:
+            sucesso = False
+        return time.perf_counter() - inicio, sucesso
+
+    lote_argumentos = list(itertools.islice(argumentos, requisicoes))
+    inicio = time.perf_counter()
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+            resultados = list(executor.map(cronometrada, lote_argumentos))
+    duracao = time.perf_counter() - inicio
+    latencias = np.array([latencia for latencia, _ in resultados])
+    falhas = sum(1 for _, sucesso in resultados if not sucesso)
+    return duracao, latencias, falhas
+
+
+def conexoes_reaproveitadas(cliente):
+    return sum(dados["reutilizadas"] for dados in cliente.estatisticas_conexoes().values())
+
+
+def subir_servidor(configuracao):
+    contexto = multiprocessing.get_context("spawn")
+    pronto = contexto.Queue()
+    processo = contexto.Process(target=iniciar, args=(configuracao, 0, pronto), daemon=True)
+    processo.start()
+    return processo, f"http://127.0.0.1:{pronto.get(timeout=30)}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga contra o servidor falso")
+    parser.add_argument("--cenarios", nargs="+", default=["shopping", "searchprefix", "lote", "jsonld"],
+                        choices=["shopping", "searchprefix", "lote", "jsonld"])
+    parser.add_argument("--concorrencia", type=int, default=8)
+    parser.add_argument("--requisicoes", type=int, default=200, help="chamadas por cenário")
+    parser.add_argument("--url", help="servidor falso já rodando (ignora as opções de servidor abaixo)")
+    adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    processo = None
+    sucesso = True
+    url = args.url
+    if url is None:
+        processo, url = subir_servidor(args)
+    url = url.rstrip("/")
+
+    product4.URL_GOOGLE = url
+    # O servidor responde de uma vez: sem grade de preços na página, é "Timeout" na hora
+    product4.ESPERA_RESULTADOS = 0
+    medicine.API_URL = f"{url}/graphql"
+    medicine.SITE_URL = url
+
+    cenarios = argumentos_dos_cenarios()
+    print(f"Servidor: {url} | concorrência {args.concorrencia} | {args.requisicoes} chamadas por cenário")
+    print(f"{'cenário':<14}{'chamadas/s':>12}{'falhas':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}")
+    try:
+        for nome in args.cenarios:
+            chamar, argumentos = cenarios[nome]
+            duracao, latencias, falhas = executar_cenario(chamar, argumentos, args.requisicoes, args.concorrencia)
+            p50, p95, p99 = np.percentile(latencias, [50, 95, 99]) * 1000
+            print(f"{nome:<14}{len(latencias) / duracao:>12.1f}{falhas:>8}{p50:>10.0f}{p95:>10.0f}{p99:>10.0f}")
+
+        print("\nRespostas do servidor:")
+        for chave, quantidade in sorted(requests.get(f"{url}/__estatisticas", timeout=10).json().items()):
+            if not chave.startswith("estatisticas"):
+                print(f"  {chave}: {quantidade}")
+        medicine.mostra_estatisticas_resiliencia(medicine.resiliencia)
+        mostra_estatisticas_conexoes(medicine.cliente_api, medicine.cliente_paginas)
+        # Páginas de detalhe lidas só até o JSON-LD ainda devem devolver a conexão ao pool
+        if "jsonld" in args.cenarios and not conexoes_reaproveitadas(medicine.cliente_paginas):
+            print("\n❌ Nenhuma conexão das páginas de detalhe foi reaproveitada.")
+            sucesso = False
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.join()
+    if not sucesso:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
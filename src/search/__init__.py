@@ -0,0 +1,7 @@
+"""
+VigiaFarma: pesquisa de preços de medicamentos (farmaindex) e de produtos de
+nutrição (Google Shopping).
+
+Os módulos podem ser importados sem efeitos colaterais; a execução é feita pela
+linha de comando: `python -m search --help` (a partir da pasta src).
+"""
@@ -0,0 +1,233 @@
+"""Linha de comando do VigiaFarma. Uso: python -m search <comando> [opções]"""
+import argparse
+import importlib
+import os
+from pathlib import Path
+
+from .entrada import ARQUIVO_PRODUTOS
+from .saida_detalhes import FORMATOS_DETALHES
+
+# Variantes do buscador do Google Shopping (product.py, product2.py, ...)
+VARIANTES_PRODUTOS = {"1": "product", "2": "product2", "3": "product3", "4": "product4"}
+# Métodos de estatistica.METODOS (listados aqui para não importar numpy só para o --help)
+METODOS_OUTLIERS = ["sigma", "mad", "iqr", "percentil"]
+
+
+def comando_medicamentos(args):
+    from .medicine import main
+
+    main(args.arquivo, args.coluna, args.resume)
+
+
+def comando_produtos(args):
+    if args.visivel:
+        from .navegador import VARIAVEL_VISIVEL
+
+        os.environ[VARIAVEL_VISIVEL] = "1"
+    # Só a variante escolhida é importada
+    modulo = importlib.import_module(f".{VARIANTES_PRODUTOS[args.variante]}", __package__)
+    # Opções que só a variante 4 entende vão só quando pedidas
+    opcoes = {}
+    if args.trabalhadores > 1:
+        opcoes["trabalhadores"] = args.trabalhadores
+    if args.outliers:
+        opcoes["metodo_outliers"] = args.outliers
+    if args.capturar:
+        opcoes["capturar"] = True
+    if args.detalhes:
+        opcoes["formato_detalhes"] = args.detalhes
+    if args.excel_detalhes:
+        opcoes["excel_detalhes"] = True
+    modulo.main(args.arquivo, args.coluna, **opcoes)
+
+
+def comando_analisar(args):
+    from .product4 import analisar_html
+
+    html_content = Path(args.pagina).read_text(encoding="utf-8")
+    preco_min, preco_max, itens = analisar_html(
+        html_content, args.produto, motor=args.motor, metrica=args.metrica, metodo_outliers=args.outliers
+    )
+    for item in itens:
+        print(f"  {item['Status_Calculo']:<24} R$ {item['Preco']:>9.2f}  {item['Nome_Encontrado']}")
+    print(f"Mínimo: {preco_min} | Máximo: {preco_max}")
+
+
+def comando_reprocessar(args):
+    from .product4 import reprocessar
+
+    reprocessar(
+        args.paginas,
+        args.arquivo,
+        args.coluna,
+        motor=args.motor,
+        metrica=args.metrica,
+        metodo_outliers=args.outliers,
+        limiar=args.limiar,
+        formato_detalhes=args.detalhes,
+        excel_detalhes=args.excel_detalhes,
+    )
+
+
+def comando_unidade(args):
+    from .normalizacao import analisar_quantidade, extrair_unidade_e_quantidade
+
+    for texto in args.textos:
+        quantidade, unidade = extrair_unidade_e_quantidade(texto)
+        embalagens = analisar_quantidade(texto)[2]
+        print(f"{texto}: quantidade={quantidade}, unidade={unidade}, embalagens={embalagens}")
+
+
+def comando_catalogo(args):
+    from .catalogo import CatalogoProdutos
+
+    catalogo = CatalogoProdutos()
+    try:
+        if args.arquivo:
+            from .entrada import ler_nomes
+
+            novos = catalogo.sincronizar_produtos(ler_nomes(args.arquivo, args.coluna))
+            print(f"{novos} produto(s) novo(s); {len(catalogo.produtos)} no catálogo.")
+        for titulo in args.titulos:
+            print(f"{titulo} -> {catalogo.resolver(titulo)}")
+    finally:
+        catalogo.fechar()
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog="python -m search", description=__doc__)
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    medicamentos = subparsers.add_parser("medicamentos", help="busca os preços de referência no farmaindex")
+    medicamentos.add_argument("arquivo", nargs="?", help="lista de medicamentos (.xlsx, .csv ou .parquet)")
+    medicamentos.add_argument(
+        "--coluna",
+        default="Rótulos de Linha",
+        help="coluna com os nomes dos medicamentos (padrão: '%(default)s')",
+    )
+    medicamentos.add_argument(
+        "--resume",
+        action="store_true",
+        help="retoma a execução interrompida a partir do diário, pulando o que já foi concluído",
+    )
+    medicamentos.set_defaults(funcao=comando_medicamentos)
+
+    produtos = subparsers.add_parser("produtos", help="busca os preços mínimo e máximo no Google Shopping")
+    produtos.add_argument("--variante", choices=sorted(VARIANTES_PRODUTOS), default="4", help="buscador usado (padrão: %(default)s)")
+    produtos.add_argument("--arquivo", default=ARQUIVO_PRODUTOS, help="lista de produtos (padrão: %(default)s)")
+    produtos.add_argument("--coluna", default="Produto", help="coluna com os nomes dos produtos (padrão: '%(default)s')")
+    produtos.add_argument(
+        "--trabalhadores",
+        type=int,
+        default=1,
+        help="navegadores em paralelo, cada um em seu processo (só na variante 4; padrão: %(default)s)",
+    )
+    produtos.add_argument(
+        "--visivel",
+        action="store_true",
+        help="abre o Chrome com janela, em vez de headless (necessário para resolver CAPTCHA à mão)",
+    )
+    produtos.add_argument(
+        "--outliers",
+        choices=METODOS_OUTLIERS,
+        help="filtro de outliers aplicado a todos os produtos depois da coleta (só na variante 4; padrão: sigma)",
+    )
+    produtos.add_argument(
+        "--capturar",
+        action="store_true",
+        help="guarda as páginas de resultados para o comando reprocessar (só na variante 4)",
+    )
+    produtos.add_argument(
+        "--detalhes",
+        choices=FORMATOS_DETALHES,
+        help="formato do arquivo com todos os itens analisados, gravado em lotes (só na variante 4; padrão: csv)",
+    )
+    produtos.add_argument(
+        "--excel-detalhes",
+        action="store_true",
+        help="converte também os itens analisados para itens_procurados.xlsx no fim (só na variante 4)",
+    )
+    produtos.set_defaults(funcao=comando_produtos)
+
+    analisar = subparsers.add_parser("analisar", help="analisa uma página de resultados salva, sem abrir o navegador")
+    analisar.add_argument("pagina", help="arquivo .html com a página do Google Shopping")
+    analisar.add_argument("--produto", required=True, help="nome do produto pesquisado")
+    analisar.add_argument("--motor", choices=["lxml", "soup"], default="lxml", help="extrator do HTML (padrão: %(default)s)")
+    analisar.add_argument(
+        "--metrica",
+        choices=["jaro_winkler", "token_set", "marcas_sabores"],
+        default="jaro_winkler",
+        help="similaridade entre o produto e os títulos (padrão: %(default)s)",
+    )
+    analisar.add_argument(
+        "--outliers",
+        choices=METODOS_OUTLIERS,
+        default="sigma",
+        help="filtro de outliers dos preços relevantes (padrão: %(default)s)",
+    )
+    analisar.set_defaults(funcao=comando_analisar)
+
+    reprocessar = subparsers.add_parser(
+        "reprocessar", help="refaz as planilhas a partir das páginas capturadas com produtos --capturar, sem navegador"
+    )
+    reprocessar.add_argument("--paginas", default="paginas_capturadas", help="pasta das páginas capturadas (padrão: %(default)s)")
+    reprocessar.add_argument("--arquivo", help="lista de produtos a reprocessar (padrão: todos os capturados)")
+    reprocessar.add_argument("--coluna", default="Produto", help="coluna com os nomes dos produtos (padrão: '%(default)s')")
+    reprocessar.add_argument("--motor", choices=["lxml", "soup"], default="lxml", help="extrator do HTML (padrão: %(default)s)")
+    reprocessar.add_argument(
+        "--metrica",
+        choices=["jaro_winkler", "token_set", "marcas_sabores"],
+        default="jaro_winkler",
+        help="similaridade entre o produto e os títulos (padrão: %(default)s)",
+    )
+    reprocessar.add_argument("--limiar", type=float, default=0.1, help="nota mínima de similaridade (padrão: %(default)s)")
+    reprocessar.add_argument(
+        "--outliers",
+        choices=METODOS_OUTLIERS,
+        default="sigma",
+        help="filtro de outliers aplicado a todos os produtos (padrão: %(default)s)",
+    )
+    reprocessar.add_argument(
+        "--detalhes",
+        choices=FORMATOS_DETALHES,
+        default="csv",
+        help="formato do arquivo com todos os itens analisados (padrão: %(default)s)",
+    )
+    reprocessar.add_argument(
+        "--excel-detalhes",
+        action="store_true",
+        help="converte também os itens analisados para itens_procurados.xlsx no fim",
+    )
+    reprocessar.set_defaults(funcao=comando_reprocessar)
+
+    catalogo = subparsers.add_parser("catalogo", help="mostra a qual produto da lista cada título de anúncio é ligado")
+    catalogo.add_argument("titulos", nargs="*")
+    catalogo.add_argument("--arquivo", help="lista de produtos a acrescentar ao catálogo antes de consultar")
+    catalogo.add_argument("--coluna", default="Produto", help="coluna com os nomes dos produtos (padrão: '%(default)s')")
+    catalogo.set_defaults(funcao=comando_catalogo)
+
+    unidade = subparsers.add_parser("unidade", help="mostra a quantidade e a unidade extraídas de nomes de produtos")
+    unidade.add_argument("textos", nargs="+")
+    unidade.set_defaults(funcao=comando_unidade)
+
+    return parser
+
+
+def main(argv=None):
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "trabalhadores", 1) < 1:
+        parser.error("--trabalhadores deve ser pelo menos 1")
+    if getattr(args, "trabalhadores", 1) > 1 and args.variante != "4":
+        parser.error("--trabalhadores só é suportado pela variante 4")
+    if (
+        getattr(args, "comando", None) == "produtos"
+        and (args.outliers or args.capturar or args.detalhes or args.excel_detalhes)
+        and args.variante != "4"
+    ):
+        parser.error("--outliers, --capturar, --detalhes e --excel-detalhes só são suportados pela variante 4")
+    args.funcao(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+
+from .limitador import _trava_exclusiva
+
+# Páginas de resultados capturadas pelo product4 (fica ao lado das planilhas)
+PASTA_PAGINAS = "paginas_capturadas"
+
+NIVEL_COMPRESSAO = 6
+
+# Registro do índice: sha256 do HTML, posição e tamanho comprimido em paginas.dat, tamanho original
+REGISTRO_INDICE = struct.Struct("<32sQII")
+
+
+class ArquivoPaginas:
+    """
+    Arquivo de páginas endereçado por conteúdo: cada HTML é guardado uma vez,
+    comprimido com zlib, em `paginas.dat`, e localizado pelo seu sha256 no índice
+    `paginas.idx` (registros de tamanho fixo, lido por mmap). `capturas.jsonl` diz
+    qual página foi capturada para cada produto; a captura mais recente vale.
+
+    Vários processos podem guardar páginas ao mesmo tempo (cada um com o seu
+    ArquivoPaginas na mesma pasta): as escritas são serializadas por uma trava de arquivo.
+    """
+
+    def __init__(self, pasta=PASTA_PAGINAS):
+        self.pasta = pasta
+        os.makedirs(pasta, exist_ok=True)
+        self._trava = open(os.path.join(pasta, ".trava"), "a+b")
+        self._dados = open(os.path.join(pasta, "paginas.dat"), "a+b")
+        self._indice = open(os.path.join(pasta, "paginas.idx"), "a+b")
+        self._capturas = open(os.path.join(pasta, "capturas.jsonl"), "a+", encoding="utf-8")
+        self._mapa_dados = None
+        self._posicoes = {}
+        self._lidos = 0
+        self._atualizar_posicoes()
+
+    def _mapear(self, arquivo):
+        tamanho = os.fstat(arquivo.fileno()).st_size
+        return mmap.mmap(arquivo.fileno(), tamanho, access=mmap.ACCESS_READ) if tamanho else None
+
+    def _atualizar_posicoes(self):
+        """Lê do índice os registros acrescentados desde a última leitura (deste ou de outro processo)."""
+        mapa = self._mapear(self._indice)
+        if mapa is None:
+            return
+        with mapa:
+            completos = len(mapa) - len(mapa) % REGISTRO_INDICE.size
+            for digest, inicio, comprimido, original in REGISTRO_INDICE.iter_unpack(mapa[self._lidos:completos]):
+                self._posicoes[digest] = (inicio, comprimido, original)
+            self._lidos = completos
+
+    def __len__(self):
+        return len(self._posicoes)
+
+    def __contains__(self, digest):
+        return bytes.fromhex(digest) in self._posicoes
+
+    def guardar(self, produto, html, url=None):
+        """Guarda o HTML (se ainda não estiver no arquivo) e a captura do produto; retorna o sha256."""
+        bruto = html.encode("utf-8")
+        digest = hashlib.sha256(bruto).digest()
+        comprimido = None if digest in self._posicoes else zlib.compress(bruto, NIVEL_COMPRESSAO)
+
+        with _trava_exclusiva(self._trava):
+            self._atualizar_posicoes()
+            if digest not in self._posicoes:
+                comprimido = comprimido or zlib.compress(bruto, NIVEL_COMPRESSAO)
+                self._dados.seek(0, os.SEEK_END)
+                inicio = self._dados.tell()
+                self._dados.write(comprimido)
+                self._dados.flush()
+                # O índice só aponta para dados já gravados
+                self._indice.write(REGISTRO_INDICE.pack(digest, inicio, len(comprimido), len(bruto)))
+                self._indice.flush()
+                self._posicoes[digest] = (inicio, len(comprimido), len(bruto))
+                self._lidos += REGISTRO_INDICE.size
+            captura = {"produto": produto, "sha256": digest.hex(), "url": url, "capturado_em": time.time()}
+            self._capturas.write(json.dumps(captura, ensure_ascii=False) + "\n")
+            self._capturas.flush()
+        return digest.hex()
+
+    def ler(self, digest):
+        """HTML da página com o sha256 `digest` (hex)."""
+        chave = bytes.fromhex(digest)
+        if chave not in self._posicoes:
+            self._atualizar_posicoes()
+        inicio, comprimido, _ = self._posicoes[chave]
+
+        # paginas.dat fica mapeado; é remapeado se cresceu depois do último mapeamento
+        if self._mapa_dados is None or inicio + comprimido > len(self._mapa_dados):
+            if self._mapa_dados is not None:
+                self._mapa_dados.close()
+            self._mapa_dados = self._mapear(self._dados)
+        return zlib.decompress(self._mapa_dados[inicio:inicio + comprimido]).decode("utf-8")
+
+    def capturas(self):
+        """Produto -> sha256 da captura mais recente, na ordem da primeira captura de cada produto."""
+        ultimas = {}
+        self._capturas.seek(0)
+        for texto in self._capturas:
+            try:
+                captura = json.loads(texto)
+            except ValueError:
+                # Última linha cortada por uma queda no meio da escrita
+                continue
+            ultimas[captura["produto"]] = captura["sha256"]
+        return ultimas
+
+    def tamanhos(self):
+        """(bytes originais, bytes comprimidos) de todas as páginas guardadas."""
+        return (
+            sum(original for _, _, original in self._posicoes.values()),
+            sum(comprimido for _, comprimido, _ in self._posicoes.values()),
+        )
+
+    def fechar(self):
+        if self._mapa_dados is not None:
+            self._mapa_dados.close()
+        for arquivo in (self._dados, self._indice, self._capturas, self._trava):
+            arquivo.close()
@@ -0,0 +1,132 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter, namedtuple
+
+Entrada = namedtuple("Entrada", ["valor", "etag", "ultima_modificacao", "fresca"])
+
+
+class CacheDisco:
+    """
+    Cache persistente (SQLite) de respostas já processadas, com validade (TTL), dados
+    de revalidação (ETag/Last-Modified), limite de tamanho com descarte do item usado
+    há mais tempo (LRU) e contadores de acertos e falhas. Seguro entre threads.
+    """
+
+    def __init__(self, caminho="cache_farmaindex.sqlite", ttl=24 * 3600, tamanho_maximo=200 * 1024 * 1024):
+        self.ttl = ttl
+        self.tamanho_maximo = tamanho_maximo
+        self.estatisticas = Counter()
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entradas (
+                chave TEXT PRIMARY KEY,
+                valor TEXT NOT NULL,
+                etag TEXT,
+                ultima_modificacao TEXT,
+                gravado_em REAL NOT NULL,
+                acessado_em REAL NOT NULL,
+                tamanho INTEGER NOT NULL
+            )
+            """
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_acessado_em ON entradas (acessado_em)")
+        self._tamanho_total = self._conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM entradas").fetchone()[0]
+
+    def obter(self, chave):
+        """
+        Retorna a Entrada guardada para `chave` (fresca ou vencida) ou None. Entradas
+        vencidas continuam úteis para revalidar com If-None-Match/If-Modified-Since.
+        """
+        agora = time.time()
+        with self._trava:
+            linha = self._conexao.execute(
+                "SELECT valor, etag, ultima_modificacao, gravado_em FROM entradas WHERE chave = ?", (chave,)
+            ).fetchone()
+            if linha is None:
+                self.estatisticas["falhas"] += 1
+                return None
+            self._conexao.execute("UPDATE entradas SET acessado_em = ? WHERE chave = ?", (agora, chave))
+
+            valor, etag, ultima_modificacao, gravado_em = linha
+            fresca = agora - gravado_em < self.ttl
+            self.estatisticas["acertos" if fresca else "vencidas"] += 1
+        return Entrada(json.loads(valor), etag, ultima_modificacao, fresca)
+
+    def gravar(self, chave, valor, etag=None, ultima_modificacao=None):
+        texto = json.dumps(valor, ensure_ascii=False)
+        agora = time.time()
+        with self._trava:
+            anterior = self._conexao.execute("SELECT tamanho FROM entradas WHERE chave = ?", (chave,)).fetchone()
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (chave, texto, etag, ultima_modificacao, agora, agora, len(texto)),
+            )
+            self._tamanho_total += len(texto) - (anterior[0] if anterior else 0)
+            self._descartar_excedente()
+
+    def renovar(self, chave):
+        """Marca como fresca uma entrada confirmada pelo servidor (resposta 304)."""
+        with self._trava:
+            self._conexao.execute("UPDATE entradas SET gravado_em = ? WHERE chave = ?", (time.time(), chave))
+            self.estatisticas["revalidadas"] += 1
+
+    def fechar(self):
+        with self._trava:
+            self._conexao.close()
+
+    def _descartar_excedente(self):
+        while self._tamanho_total > self.tamanho_maximo:
+            # Remove em lotes as entradas acessadas há mais tempo
+            antigas = self._conexao.execute(
+                "SELECT chave, tamanho FROM entradas ORDER BY acessado_em LIMIT 20"
+            ).fetchall()
+            if not antigas:
+                break
+            self._conexao.executemany("DELETE FROM entradas WHERE chave = ?", [(chave,) for chave, _ in antigas])
+            self._tamanho_total -= sum(tamanho for _, tamanho in antigas)
+            self.estatisticas["descartadas"] += len(antigas)
+
+
+class SemCache:
+    """Substituto do CacheDisco que não guarda nada, usado quando o cache está desligado."""
+
+    def __init__(self):
+        self.estatisticas = Counter()
+
+    def obter(self, chave):
+        return None
+
+    def gravar(self, chave, valor, etag=None, ultima_modificacao=None):
+        pass
+
+    def renovar(self, chave):
+        pass
+
+    def fechar(self):
+        pass
+
+
+def cabecalhos_revalidacao(entrada):
+    """Cabeçalhos condicionais para revalidar uma entrada vencida do cache."""
+    headers = {}
+    if entrada is not None and entrada.etag:
+        headers["If-None-Match"] = entrada.etag
+    if entrada is not None and entrada.ultima_modificacao:
+        headers["If-Modified-Since"] = entrada.ultima_modificacao
+    return headers
+
+
+def mostra_estatisticas_cache(cache):
+    e = cache.estatisticas
+    print("\n--- Cache em disco ---")
+    print(
+        f"  {e['acertos']} acerto(s), {e['falhas']} falha(s), {e['vencidas']} vencida(s), "
+        f"{e['revalidadas']} revalidada(s) pelo servidor, {e['descartadas']} descartada(s) por tamanho"
+    )
+    print("-" * 35)
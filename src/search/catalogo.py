@@ -0,0 +1,221 @@
+import sqlite3
+from collections import Counter, defaultdict
+
+from .normalizacao import analisar_quantidade
+from .similaridade import Consulta, pontuar, tokens
+
+ARQUIVO_CATALOGO = "catalogo_produtos.sqlite"
+
+# Nota mínima (métrica marcas_sabores) para um anúncio ser ligado a um produto da lista
+LIMIAR_CATALOGO = 0.6
+
+# Palavras que não ajudam a separar produtos e ficam fora do índice invertido
+PALAVRAS_VAZIAS = {"de", "da", "do", "das", "dos", "com", "e", "em", "para", "sem", "x", "kit", "-", "+", "|"}
+
+
+def normalizar_titulo(titulo):
+    return " ".join(tokens(titulo))
+
+
+def tokens_indexaveis(texto):
+    """Tokens de marca, linha e sabor, mais o tamanho normalizado ("400g", "60caps")."""
+    indexaveis = {token for token in tokens(texto) if token not in PALAVRAS_VAZIAS and not token[0].isdigit()}
+    quantidade, unidade, _ = analisar_quantidade(texto)
+    if quantidade is not None:
+        indexaveis.add(f"{int(quantidade)}{unidade}")
+    return indexaveis
+
+
+class CatalogoProdutos:
+    """
+    Índice persistente (SQLite) que liga títulos de anúncios aos produtos canônicos
+    da lista de produtos. Cada produto entra num índice invertido pelos seus tokens
+    (marca, linha, sabor e tamanho); um título novo só é comparado com os produtos que
+    compartilham algum token com ele e têm a mesma quantidade/unidade (blocagem), e a
+    decisão fica gravada, então um título já visto é resolvido com uma consulta a um
+    dicionário.
+
+    As decisões gravadas valem para todos os produtos já cadastrados, mas resolver só
+    devolve produtos da lista da execução atual (sincronizar_produtos): um título
+    decidido para um produto de outra lista é comparado de novo só com os da lista.
+    Produtos novos invalidam apenas os títulos que compartilham tokens com eles,
+    achados pelo índice de tokens dos títulos (indice_titulos).
+    """
+
+    def __init__(self, caminho=ARQUIVO_CATALOGO, limiar=LIMIAR_CATALOGO):
+        self.limiar = limiar
+        self.estatisticas = Counter()
+        self._conexao = sqlite3.connect(caminho, timeout=30)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        sem_indice_titulos = not self._conexao.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'indice_titulos'"
+        ).fetchone()
+        self._conexao.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS produtos (
+                id INTEGER PRIMARY KEY,
+                nome TEXT UNIQUE NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS indice (
+                token TEXT NOT NULL,
+                produto_id INTEGER NOT NULL,
+                PRIMARY KEY (token, produto_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS titulos (
+                titulo TEXT PRIMARY KEY,
+                produto_id INTEGER,
+                nota REAL
+            );
+            -- Tokens indexáveis de cada título decidido, para invalidar só os afetados
+            -- por um produto novo
+            CREATE TABLE IF NOT EXISTS indice_titulos (
+                token TEXT NOT NULL,
+                titulo TEXT NOT NULL,
+                PRIMARY KEY (token, titulo)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS indice_titulos_por_titulo ON indice_titulos (titulo);
+            """
+        )
+        if sem_indice_titulos:
+            # Catálogo de antes do indice_titulos: indexa uma vez os títulos já decididos
+            with self._conexao:
+                self._conexao.executemany(
+                    "INSERT OR IGNORE INTO indice_titulos VALUES (?, ?)",
+                    (
+                        (token, titulo)
+                        for (titulo,) in self._conexao.execute("SELECT titulo FROM titulos").fetchall()
+                        for token in tokens_indexaveis(titulo)
+                    ),
+                )
+
+        self.produtos = dict(self._conexao.execute("SELECT id, nome FROM produtos"))
+        self._consultas = {id_: Consulta(nome) for id_, nome in self.produtos.items()}
+        self._indice = defaultdict(set)
+        for token, produto_id in self._conexao.execute("SELECT token, produto_id FROM indice"):
+            self._indice[token].add(produto_id)
+        self._titulos = {titulo: produto_id for titulo, produto_id in self._conexao.execute("SELECT titulo, produto_id FROM titulos")}
+        self._pendentes = []
+        self._pendentes_tokens = []
+        # Produtos da lista atual; até sincronizar_produtos, todos os cadastrados
+        self.ativos = set(self.produtos)
+        # Título -> produto da lista atual, para títulos decididos para produtos fora dela
+        self._na_lista = {}
+
+    def sincronizar_produtos(self, nomes):
+        """
+        Torna `nomes` a lista de produtos da execução: só eles são devolvidos por
+        resolver. Os que ainda não estavam no catálogo entram no índice; retorna quantos.
+        """
+        nomes = list(dict.fromkeys(nomes))
+        ids_por_nome = {nome: produto_id for produto_id, nome in self.produtos.items()}
+        novos = [nome for nome in nomes if nome not in ids_por_nome]
+
+        if novos:
+            tokens_novos = set()
+            with self._conexao:
+                for nome in novos:
+                    produto_id = self._conexao.execute("INSERT INTO produtos (nome) VALUES (?)", (nome,)).lastrowid
+                    self.produtos[produto_id] = nome
+                    self._consultas[produto_id] = Consulta(nome)
+                    ids_por_nome[nome] = produto_id
+                    for token in tokens_indexaveis(nome):
+                        tokens_novos.add(token)
+                        self._indice[token].add(produto_id)
+                        self._conexao.execute("INSERT OR IGNORE INTO indice VALUES (?, ?)", (token, produto_id))
+            self._invalidar_titulos(tokens_novos)
+
+        self.ativos = {ids_por_nome[nome] for nome in nomes}
+        self._na_lista.clear()
+        return len(novos)
+
+    def _invalidar_titulos(self, tokens_novos):
+        """Descarta as decisões dos títulos que podem ter um produto novo como candidato."""
+        if not tokens_novos:
+            return
+        self.salvar()
+        marcadores = ", ".join("?" * len(tokens_novos))
+        afetados = [
+            chave
+            for (chave,) in self._conexao.execute(
+                f"SELECT DISTINCT titulo FROM indice_titulos WHERE token IN ({marcadores})", list(tokens_novos)
+            )
+        ]
+        if not afetados:
+            return
+        with self._conexao:
+            self._conexao.executemany("DELETE FROM titulos WHERE titulo = ?", ((chave,) for chave in afetados))
+            self._conexao.executemany("DELETE FROM indice_titulos WHERE titulo = ?", ((chave,) for chave in afetados))
+        for chave in afetados:
+            self._titulos.pop(chave, None)
+
+    def candidatos(self, titulo, ids_permitidos=None, indexaveis=None):
+        """
+        Produtos que compartilham algum token com o título e aceitam o tamanho dele,
+        entre `ids_permitidos` (por padrão, todos os cadastrados). `indexaveis` são os
+        tokens_indexaveis do título, se já calculados.
+        """
+        if indexaveis is None:
+            indexaveis = tokens_indexaveis(titulo)
+        ids = set()
+        for token in indexaveis:
+            ids |= self._indice.get(token, set())
+        if ids_permitidos is not None:
+            ids &= ids_permitidos
+        return [produto_id for produto_id in ids if self._consultas[produto_id].compativel(titulo)]
+
+    def _melhor(self, titulo, ids_permitidos=None, indexaveis=None):
+        """(produto_id, nota) do candidato com a maior nota, ou (None, nota) abaixo do limiar."""
+        melhor, nota_melhor = None, 0.0
+        for produto_id in self.candidatos(titulo, ids_permitidos, indexaveis):
+            nota = pontuar(self._consultas[produto_id], [titulo], metrica="marcas_sabores", podar_unidades=False)[0]
+            if nota > nota_melhor:
+                melhor, nota_melhor = produto_id, nota
+        if nota_melhor < self.limiar:
+            melhor = None
+        return melhor, nota_melhor
+
+    def resolver(self, titulo):
+        """Nome do produto canônico do título, ou None se nenhum produto da lista serve."""
+        chave = normalizar_titulo(titulo)
+        if chave in self._titulos:
+            self.estatisticas["conhecidos"] += 1
+            produto_id = self._titulos[chave]
+        else:
+            # A decisão gravada considera todos os produtos do catálogo, para valer em
+            # qualquer lista futura
+            indexaveis = tokens_indexaveis(titulo)
+            produto_id, nota = self._melhor(titulo, indexaveis=indexaveis)
+            self.estatisticas["novos" if produto_id is not None else "sem_produto"] += 1
+            self._titulos[chave] = produto_id
+            self._pendentes.append((chave, produto_id, nota))
+            self._pendentes_tokens.extend((token, chave) for token in indexaveis)
+
+        if produto_id is None or produto_id in self.ativos:
+            return self.produtos.get(produto_id)
+        # O melhor produto não está na lista desta execução: vale o melhor entre os que estão
+        if chave not in self._na_lista:
+            self._na_lista[chave] = self._melhor(titulo, self.ativos)[0]
+        return self.produtos.get(self._na_lista[chave])
+
+    def salvar(self):
+        """Grava as decisões novas desde o último salvar()."""
+        if not self._pendentes:
+            return
+        with self._conexao:
+            self._conexao.executemany("INSERT OR REPLACE INTO titulos VALUES (?, ?, ?)", self._pendentes)
+            self._conexao.executemany("INSERT OR IGNORE INTO indice_titulos VALUES (?, ?)", self._pendentes_tokens)
+        self._pendentes.clear()
+        self._pendentes_tokens.clear()
+
+    def fechar(self):
+        self.salvar()
+        self._conexao.close()
+
+
+def mostra_estatisticas_catalogo(catalogo):
+    print("\n--- Catálogo de produtos ---")
+    print(f"  Produtos no catálogo: {len(catalogo.produtos)}")
+    print(f"  Títulos já conhecidos: {catalogo.estatisticas['conhecidos']}")
+    print(f"  Títulos novos ligados a um produto: {catalogo.estatisticas['novos']}")
+    print(f"  Títulos novos sem produto na lista: {catalogo.estatisticas['sem_produto']}")
+    print("-" * 28)
@@ -0,0 +1,134 @@
+import threading
+from collections import Counter
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.request import ACCEPT_ENCODING
+
+# Quantos hosts diferentes mantêm um pool de conexões aberto ao mesmo tempo
+POOLS_POR_CLIENTE = 4
+
+
+class _ContagemConexoes:
+    """Conexões TCP (e handshakes TLS) efetivamente abertas por um cliente, por host:porta."""
+
+    def __init__(self):
+        self._abertas = Counter()
+        self._trava = threading.Lock()
+
+    def registrar(self, conexao):
+        with self._trava:
+            self._abertas[f"{conexao.host}:{conexao.port}"] += 1
+
+    def abertas(self, host):
+        with self._trava:
+            return self._abertas[host]
+
+
+class _ConexaoHTTPContada(HTTPConnection):
+    def connect(self):
+        super().connect()
+        self.contagem.registrar(self)
+
+
+class _ConexaoHTTPSContada(HTTPSConnection):
+    def connect(self):
+        super().connect()
+        self.contagem.registrar(self)
+
+
+class _PoolContado:
+    # Definida nas subclasses criadas por _pools_contados, uma por cliente
+    contagem = None
+
+    def _new_conn(self):
+        conexao = super()._new_conn()
+        conexao.contagem = self.contagem
+        return conexao
+
+
+class _PoolHTTPContado(_PoolContado, HTTPConnectionPool):
+    ConnectionCls = _ConexaoHTTPContada
+
+
+class _PoolHTTPSContado(_PoolContado, HTTPSConnectionPool):
+    ConnectionCls = _ConexaoHTTPSContada
+
+
+def _pools_contados(contagem):
+    """Classes de pool por esquema que registram as conexões abertas em `contagem`."""
+    return {
+        "http": type("_PoolHTTPContado", (_PoolHTTPContado,), {"contagem": contagem}),
+        "https": type("_PoolHTTPSContado", (_PoolHTTPSContado,), {"contagem": contagem}),
+    }
+
+
+class ClienteHTTP:
+    """
+    Sessão HTTP compartilhada com pool de conexões keep-alive por host e cabeçalhos
+    fixos definidos uma única vez. Pode ser usada por várias threads ao mesmo tempo.
+    Com `resiliencia`, as requisições passam pelas retentativas e pelo disjuntor dela.
+    """
+
+    def __init__(self, headers=None, tamanho_pool=10, resiliencia=None):
+        self.resiliencia = resiliencia
+        self.sessao = requests.Session()
+        self._contagem = _ContagemConexoes()
+        # pool_block faz as threads excedentes esperarem uma conexão livre em vez
+        # de abrir conexões extras que seriam descartadas logo depois
+        adaptador = HTTPAdapter(pool_connections=POOLS_POR_CLIENTE, pool_maxsize=tamanho_pool, pool_block=True)
+        # Conta cada conexão aberta de verdade, inclusive as reabertas pelo urllib3
+        # quando o servidor encerra o keep-alive
+        adaptador.poolmanager.pool_classes_by_scheme = _pools_contados(self._contagem)
+        self.sessao.mount("https://", adaptador)
+        self.sessao.mount("http://", adaptador)
+        # O urllib3 só anuncia br/zstd quando o pacote de descompressão está instalado
+        self.sessao.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        if headers:
+            self.sessao.headers.update(headers)
+
+    def get(self, url, **kwargs):
+        return self._requisitar("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._requisitar("POST", url, **kwargs)
+
+    def _requisitar(self, metodo, url, **kwargs):
+        if self.resiliencia is None:
+            return self.sessao.request(metodo, url, **kwargs)
+        return self.resiliencia.executar(lambda: self.sessao.request(metodo, url, **kwargs), url)
+
+    def estatisticas_conexoes(self):
+        """
+        Retorna, por host, quantas requisições foram feitas, quantas conexões foram
+        abertas e quantas requisições reaproveitaram uma conexão já aberta.
+        """
+        estatisticas = {}
+        for adaptador in set(self.sessao.adapters.values()):
+            pools = adaptador.poolmanager.pools
+            for chave in pools.keys():
+                pool = pools[chave]
+                host = f"{pool.host}:{pool.port}"
+                atual = estatisticas.setdefault(host, {"requisicoes": 0, "conexoes": 0, "reutilizadas": 0})
+                atual["requisicoes"] += pool.num_requests
+
+        for host, atual in estatisticas.items():
+            atual["conexoes"] = self._contagem.abertas(host)
+            atual["reutilizadas"] = max(atual["requisicoes"] - atual["conexoes"], 0)
+        return estatisticas
+
+    def fechar(self):
+        self.sessao.close()
+
+
+def mostra_estatisticas_conexoes(*clientes):
+    print("\n--- Reaproveitamento de conexões HTTP ---")
+    for cliente in clientes:
+        for host, dados in cliente.estatisticas_conexoes().items():
+            print(
+                f"  {host}: {dados['requisicoes']} requisição(ões), {dados['conexoes']} conexão(ões) aberta(s), "
+                f"{dados['reutilizadas']} reaproveitada(s)"
+            )
+    print("-" * 35)
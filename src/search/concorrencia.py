@@ -0,0 +1,100 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlparse
+
+
+class BuscadorConcorrente:
+    """
+    Executa `funcao(url)` em um pool de threads com limite global de concorrência
+    e, por host, limite de requisições simultâneas e intervalo mínimo entre elas.
+    Com `consultar_cache(url)`, que devolve uma entrada de cache ainda válida (com
+    `.valor`) ou None, o que já está no cache é entregue na hora, sem ocupar o pool
+    nem esperar o intervalo do host.
+    """
+
+    def __init__(self, funcao, max_concorrencia=8, max_por_host=None, intervalo_por_host=0.0, consultar_cache=None):
+        self.funcao = funcao
+        self.consultar_cache = consultar_cache
+        self.max_por_host = max_por_host or max_concorrencia
+        self.intervalo_por_host = intervalo_por_host
+        self.executor = ThreadPoolExecutor(max_workers=max_concorrencia)
+        self._trava = threading.Lock()
+        self._semaforos = {}
+        self._proxima_saida = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Numa interrupção, descarta o que ainda não começou em vez de esperar a fila inteira
+        self.encerrar(cancelar_pendentes=exc_type is not None)
+
+    def submeter(self, url):
+        """Agenda a busca de `url` e devolve um Future com o resultado."""
+        if self.consultar_cache is not None:
+            entrada = self.consultar_cache(url)
+            if entrada is not None:
+                futuro = Future()
+                futuro.set_result(entrada.valor)
+                return futuro
+        return self.executor.submit(self._executar, url)
+
+    def mapear(self, urls):
+        """Busca todas as URLs em paralelo e devolve os resultados na ordem de entrada."""
+        futuros = [self.submeter(url) for url in urls]
+        for futuro in futuros:
+            yield futuro.result()
+
+    def encerrar(self, cancelar_pendentes=False):
+        self.executor.shutdown(wait=True, cancel_futures=cancelar_pendentes)
+
+    def _semaforo(self, host):
+        with self._trava:
+            if host not in self._semaforos:
+                self._semaforos[host] = threading.BoundedSemaphore(self.max_por_host)
+            return self._semaforos[host]
+
+    def _aguardar_vez(self, host):
+        """Reserva o próximo horário livre do host e dorme até ele chegar."""
+        if not self.intervalo_por_host:
+            return
+        with self._trava:
+            agora = time.monotonic()
+            inicio = max(agora, self._proxima_saida.get(host, agora))
+            self._proxima_saida[host] = inicio + self.intervalo_por_host
+        if inicio > agora:
+            time.sleep(inicio - agora)
+
+    def _executar(self, url):
+        host = urlparse(url).netloc
+        with self._semaforo(host):
+            self._aguardar_vez(host)
+            return self.funcao(url)
+
+
+class RegistroBuscas:
+    """
+    Registro da execução inteira que garante uma única busca por chave: pedidos
+    repetidos recebem o mesmo Future da primeira busca.
+    """
+
+    def __init__(self, buscador):
+        self.buscador = buscador
+        self.buscas_evitadas = 0
+        self._futuros = {}
+
+    def obter(self, chave, url):
+        """Retorna (futuro, novo); `novo` é False quando a chave já tinha sido pedida."""
+        if chave in self._futuros:
+            self.buscas_evitadas += 1
+            return self._futuros[chave], False
+        futuro = self.buscador.submeter(url)
+        self._futuros[chave] = futuro
+        return futuro, True
+
+    def registrar_resultado(self, chave, valor):
+        """Marca `chave` como já buscada, com um resultado obtido por fora (ex.: de um diário)."""
+        futuro = Future()
+        futuro.set_result(valor)
+        self._futuros[chave] = futuro
@@ -0,0 +1,73 @@
+import json
+import os
+import threading
+
+# Quantos registros entre cada fsync; flush é feito a cada registro
+FSYNC_A_CADA = 50
+
+
+class DiarioExecucao:
+    """
+    Diário de progresso append-only (uma linha JSON por registro) que permite retomar
+    uma execução interrompida. Registros gravados:
+      - inicio: quantas linhas a planilha de saída já tinha antes da execução;
+      - linha: cada linha entregue ao escritor, com o medicamentoid de origem;
+      - concluido: cada nome da lista cujas linhas já foram todas entregues.
+    """
+
+    def __init__(self, caminho, retomar=False):
+        self.caminho = caminho
+        self.linhas_existentes = None
+        self.linhas = []
+        self.medicamentoids = set()
+        self.concluidos = set()
+        self._trava = threading.Lock()
+        self._sem_fsync = 0
+
+        if retomar and os.path.exists(caminho):
+            self._carregar()
+            self._arquivo = open(caminho, "a", encoding="utf-8")
+        else:
+            self._arquivo = open(caminho, "w", encoding="utf-8")
+
+    def _carregar(self):
+        with open(self.caminho, encoding="utf-8") as arquivo:
+            for texto in arquivo:
+                try:
+                    registro = json.loads(texto)
+                except ValueError:
+                    # Última linha cortada por uma queda no meio da escrita
+                    continue
+                tipo = registro.get("tipo")
+                if tipo == "inicio":
+                    self.linhas_existentes = registro["linhas_existentes"]
+                elif tipo == "linha":
+                    self.linhas.append(registro["linha"])
+                    self.medicamentoids.add(registro["medicamentoid"])
+                elif tipo == "concluido":
+                    self.concluidos.add(registro["nome"])
+
+    def _gravar(self, registro):
+        with self._trava:
+            self._arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            self._arquivo.flush()
+            self._sem_fsync += 1
+            if self._sem_fsync >= FSYNC_A_CADA:
+                os.fsync(self._arquivo.fileno())
+                self._sem_fsync = 0
+
+    def registrar_inicio(self, linhas_existentes):
+        self.linhas_existentes = linhas_existentes
+        self._gravar({"tipo": "inicio", "linhas_existentes": linhas_existentes})
+
+    def registrar_linha(self, medicamentoid, linha):
+        self._gravar({"tipo": "linha", "medicamentoid": medicamentoid, "linha": linha})
+
+    def registrar_concluido(self, nome):
+        self._gravar({"tipo": "concluido", "nome": nome})
+
+    def fechar(self):
+        with self._trava:
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+            self._arquivo.close()
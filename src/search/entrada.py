@@ -0,0 +1,97 @@
+import csv
+import math
+from itertools import islice
+from pathlib import Path
+
+PARAMETROS_IGNORADOS = ('(vazio)', 'Total Geral')
+
+# Lista padrão de produtos: src/resources/produtos.xlsx
+ARQUIVO_PRODUTOS = Path(__file__).resolve().parent.parent / 'resources' / 'produtos.xlsx'
+
+
+def ler_nomes(caminho, coluna, ignorados=PARAMETROS_IGNORADOS):
+    """
+    Lê os valores da coluna `coluna` de uma planilha (.xlsx/.xlsm), CSV ou Parquet,
+    entregando um nome por vez, sem carregar o arquivo inteiro na memória. Células
+    vazias e os rótulos de `ignorados` (linhas de total das tabelas dinâmicas) são pulados.
+    """
+    extensao = Path(caminho).suffix.lower()
+    if extensao in ('.xlsx', '.xlsm'):
+        valores = _valores_xlsx(caminho, coluna)
+    elif extensao in ('.csv', '.txt'):
+        valores = _valores_csv(caminho, coluna)
+    elif extensao == '.parquet':
+        valores = _valores_parquet(caminho, coluna)
+    elif extensao == '.xls':
+        valores = _valores_xls(caminho, coluna)
+    else:
+        raise ValueError(f"Formato de arquivo não suportado: '{extensao}'")
+
+    for valor in valores:
+        if valor is None or (isinstance(valor, float) and math.isnan(valor)):
+            continue
+        nome = str(valor).strip()
+        if not nome or nome in ignorados:
+            continue
+        yield nome
+
+
+def em_lotes(iteravel, tamanho):
+    """Agrupa um iterável em listas de até `tamanho` itens, sem consumi-lo inteiro."""
+    iterador = iter(iteravel)
+    while lote := list(islice(iterador, tamanho)):
+        yield lote
+
+
+def _indice_coluna(cabecalho, coluna, caminho):
+    cabecalho = [str(c).strip() if c is not None else '' for c in cabecalho]
+    if coluna not in cabecalho:
+        raise KeyError(f"Coluna '{coluna}' não encontrada em '{caminho}'. Colunas disponíveis: {cabecalho}")
+    return cabecalho.index(coluna)
+
+
+def _valores_xlsx(caminho, coluna):
+    from openpyxl import load_workbook
+
+    # read_only lê as linhas sob demanda direto do XML, sem montar a planilha na memória
+    workbook = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        linhas = workbook.worksheets[0].iter_rows(values_only=True)
+        indice = _indice_coluna(next(linhas, ()), coluna, caminho)
+        for linha in linhas:
+            if indice < len(linha):
+                yield linha[indice]
+    finally:
+        workbook.close()
+
+
+def _valores_csv(caminho, coluna):
+    with open(caminho, newline='', encoding='utf-8-sig') as arquivo:
+        # Planilhas exportadas em português costumam usar ';' como separador
+        try:
+            dialeto = csv.Sniffer().sniff(arquivo.read(4096), delimiters=',;\t')
+        except csv.Error:
+            dialeto = csv.excel
+        arquivo.seek(0)
+
+        linhas = csv.reader(arquivo, dialeto)
+        indice = _indice_coluna(next(linhas, []), coluna, caminho)
+        for linha in linhas:
+            if indice < len(linha):
+                yield linha[indice]
+
+
+def _valores_parquet(caminho, coluna):
+    import pyarrow.parquet as pq
+
+    arquivo = pq.ParquetFile(caminho)
+    _indice_coluna(arquivo.schema_arrow.names, coluna, caminho)
+    for lote in arquivo.iter_batches(columns=[coluna]):
+        yield from lote.column(0).to_pylist()
+
+
+def _valores_xls(caminho, coluna):
+    # O formato antigo não tem leitura em streaming; lê só a coluna necessária
+    import pandas as pd
+
+    yield from pd.read_excel(caminho, usecols=[coluna])[coluna].tolist()
@@ -0,0 +1,147 @@
+"""
+Filtro de outliers de preço e resumo por produto.
+
+Os mesmos métodos servem para um produto só (limites_outlier, usado na análise de
+cada página) e para todas as linhas de detalhe de uma execução de uma vez
+(filtrar_outliers / resumir), com groupby vetorizado em vez de um laço por produto.
+"""
+import numpy as np
+
+STATUS_INCLUIDO = "Incluído"
+STATUS_OUTLIER = "Rejeitado (Outlier)"
+
+# Com menos preços que isso o produto não passa pelo filtro
+MINIMO_AMOSTRAS = 3
+
+# método -> fator padrão (desvios, MADs ou IQRs; no "percentil", os percentis cortados)
+METODOS = {
+    "sigma": 1.0,  # média ± 1 desvio padrão, o critério original
+    "mad": 3.0,  # mediana ± 3 MAD (escalado para equivaler ao desvio numa normal)
+    "iqr": 1.5,  # [Q1 - 1,5 IQR, Q3 + 1,5 IQR]
+    "percentil": (0.05, 0.95),  # descarta os 5% mais baratos e os 5% mais caros
+}
+ESCALA_MAD = 1.4826
+
+DESCRICOES = {
+    "sigma": "fora do desvio padrão",
+    "mad": "fora da faixa mediana ± MAD",
+    "iqr": "fora da faixa interquartil",
+    "percentil": "fora dos percentis aceitos",
+}
+
+
+def motivo_outlier(metodo, preco, limite_inferior, limite_superior):
+    return (
+        f"Preço (R${preco:.2f}) {DESCRICOES[metodo]} "
+        f"(Faixa aceitável: R${limite_inferior:.2f} - R${limite_superior:.2f})"
+    )
+
+
+def limites_outlier(precos, metodo="sigma", fator=None):
+    """Faixa aceitável (inferior, superior) para os preços de um produto."""
+    precos = np.asarray(precos, dtype=float)
+    fator = METODOS[metodo] if fator is None else fator
+    if len(precos) < MINIMO_AMOSTRAS:
+        return -np.inf, np.inf
+    if metodo == "sigma":
+        media, desvio = precos.mean(), precos.std()
+        return media - fator * desvio, media + fator * desvio
+    if metodo == "mad":
+        mediana = np.median(precos)
+        mad = np.median(np.abs(precos - mediana)) * ESCALA_MAD
+        return mediana - fator * mad, mediana + fator * mad
+    if metodo == "iqr":
+        q1, q3 = np.quantile(precos, [0.25, 0.75])
+        return q1 - fator * (q3 - q1), q3 + fator * (q3 - q1)
+    if metodo == "percentil":
+        inferior, superior = np.quantile(precos, fator)
+        return inferior, superior
+    raise ValueError(f"Método de outlier desconhecido: '{metodo}'")
+
+
+def _limites_agrupados(precos, grupos, metodo, fator):
+    """Faixa aceitável de cada linha, calculada por grupo e espalhada para as linhas."""
+    import pandas as pd
+
+    # Agrupar por códigos inteiros 0..k-1 é bem mais rápido que pelos nomes, e o
+    # resultado do grupo k volta para as linhas indexando por código
+    codigos = pd.factorize(grupos)[0]
+    precos = pd.Series(precos)
+    agrupado = precos.groupby(codigos)
+
+    def por_linha(estatistica):
+        return estatistica.to_numpy()[codigos]
+
+    if metodo == "sigma":
+        media, desvio = por_linha(agrupado.mean()), por_linha(agrupado.std(ddof=0))
+        inferior, superior = media - fator * desvio, media + fator * desvio
+    elif metodo == "mad":
+        mediana = por_linha(agrupado.median())
+        mad = por_linha((precos - mediana).abs().groupby(codigos).median()) * ESCALA_MAD
+        inferior, superior = mediana - fator * mad, mediana + fator * mad
+    elif metodo == "iqr":
+        q1, q3 = por_linha(agrupado.quantile(0.25)), por_linha(agrupado.quantile(0.75))
+        inferior, superior = q1 - fator * (q3 - q1), q3 + fator * (q3 - q1)
+    elif metodo == "percentil":
+        inferior, superior = por_linha(agrupado.quantile(fator[0])), por_linha(agrupado.quantile(fator[1]))
+    else:
+        raise ValueError(f"Método de outlier desconhecido: '{metodo}'")
+
+    poucos = por_linha(agrupado.size()) < MINIMO_AMOSTRAS
+    return np.where(poucos, -np.inf, inferior), np.where(poucos, np.inf, superior)
+
+
+def filtrar_outliers(
+    detalhes,
+    metodo="sigma",
+    fator=None,
+    grupo="Produto_Pesquisado",
+    coluna_preco="Preco",
+    coluna_status="Status_Calculo",
+    coluna_motivo="Motivo_Rejeicao",
+):
+    """
+    Marca como "Rejeitado (Outlier)", em todas as linhas de uma vez, os preços
+    "Incluído" fora da faixa do seu produto. Altera `detalhes` (DataFrame com as
+    linhas de detalhe de todos os produtos) e retorna a máscara dos outliers.
+    """
+    fator = METODOS[metodo] if fator is None else fator
+    incluidos = detalhes.index[detalhes[coluna_status] == STATUS_INCLUIDO]
+    valores = detalhes.loc[incluidos, coluna_preco].to_numpy(dtype=float)
+    grupos = detalhes.loc[incluidos, grupo]
+
+    inferior, superior = _limites_agrupados(valores, grupos, metodo, fator)
+    fora = (valores < inferior) | (valores > superior)
+
+    linhas_fora = incluidos[fora]
+    detalhes.loc[linhas_fora, coluna_status] = STATUS_OUTLIER
+    detalhes.loc[linhas_fora, coluna_motivo] = [
+        motivo_outlier(metodo, preco, baixo, alto)
+        for preco, baixo, alto in zip(valores[fora], inferior[fora], superior[fora])
+    ]
+    return detalhes.index.isin(linhas_fora)
+
+
+def resumir(detalhes, grupo="Produto_Pesquisado", coluna_preco="Preco", coluna_status="Status_Calculo"):
+    """
+    Resumo por produto num único groupby: mínimo, máximo, mediana, p10, p90 e
+    quantidade de preços considerados. Se o filtro de outliers tirou todos os preços
+    de um produto, usa os que passaram pela relevância, como a análise por página.
+    """
+    import pandas as pd
+
+    status = detalhes[coluna_status]
+    sobrou_incluido = (status == STATUS_INCLUIDO).groupby(detalhes[grupo], sort=False).transform("any")
+    considerados = detalhes[(status == STATUS_INCLUIDO) | ((status == STATUS_OUTLIER) & ~sobrou_incluido)]
+
+    agrupado = considerados[coluna_preco].astype(float).groupby(considerados[grupo], sort=False)
+    resumo = agrupado.agg(["min", "max", "median", "count"])
+    quantis = agrupado.quantile([0.1, 0.9]).unstack()
+    return pd.DataFrame({
+        "Preco_Minimo": resumo["min"],
+        "Preco_Maximo": resumo["max"],
+        "Preco_Mediano": resumo["median"],
+        "Preco_P10": quantis[0.1],
+        "Preco_P90": quantis[0.9],
+        "Itens_Considerados": resumo["count"],
+    })
@@ -0,0 +1,69 @@
+import re
+
+from lxml import etree
+
+# Mesma navegação de product4.extrair_registros_soup, com as expressões compiladas uma vez:
+# preço pelo aria-label, pai dele como container, primeiro div[title] dentro do container
+# e o <a> mais próximo acima do container
+XPATH_PRECOS = etree.XPath('//div[starts-with(@aria-label, "Current price")]')
+XPATH_TITULO = etree.XPath("(.//div[@title])[1]")
+XPATH_LINK = etree.XPath("ancestor::a[1]")
+
+# Início da grade de resultados; o resto da página (scripts, menus, rodapé) não é lido
+ABERTURA_RESULTADOS = re.compile(r'<div\b[^>]*\bid=["\']?rso\b')
+TAMANHO_BLOCO = 64 * 1024
+
+
+def extrair_registros_lxml(html_content, somente_resultados=True):
+    """
+    Extrai os registros {title, price_label, href} com lxml e XPath pré-compilados.
+    Com `somente_resultados`, monta só a subárvore de div#rso; se ela não existir ou
+    não tiver preços, analisa a página inteira.
+    """
+    if somente_resultados:
+        raiz = _subarvore_resultados(html_content)
+        if raiz is not None:
+            registros = _registros(raiz)
+            if registros:
+                return registros
+    return _registros(etree.HTML(html_content))
+
+
+def _registros(raiz):
+    registros = []
+    if raiz is None:
+        return registros
+
+    for el_preco in XPATH_PRECOS(raiz):
+        container_produto = el_preco.getparent()
+        if container_produto is None:
+            continue
+
+        titulos = XPATH_TITULO(container_produto)
+        if not titulos:
+            continue
+
+        links = XPATH_LINK(container_produto)
+        registros.append({
+            "title": titulos[0].get("title"),
+            "price_label": el_preco.get("aria-label"),
+            "href": links[0].get("href") if links else None,
+        })
+
+    return registros
+
+
+def _subarvore_resultados(html_content):
+    """Alimenta o parser a partir de div#rso e para assim que esse elemento fecha."""
+    abertura = ABERTURA_RESULTADOS.search(html_content)
+    if not abertura:
+        return None
+
+    parser = etree.HTMLPullParser(events=("end",))
+    for inicio in range(abertura.start(), len(html_content), TAMANHO_BLOCO):
+        parser.feed(html_content[inicio:inicio + TAMANHO_BLOCO])
+        for _, elemento in parser.read_events():
+            if elemento.get("id") == "rso":
+                # O documento montado até aqui contém só a grade de resultados
+                return elemento
+    return None
@@ -0,0 +1,104 @@
+import json
+import re
+from urllib.parse import quote
+
+from bs4 import BeautifulSoup
+
+TAMANHO_BLOCO = 16 * 1024
+
+# Se o que falta baixar depois do bloco JSON-LD for pequeno, vale mais a pena ler até
+# o fim e devolver a conexão ao pool keep-alive do que fechá-la no meio da resposta.
+# Conta os bytes da rede (comprimidos, com gzip/br): as páginas de detalhe têm ~100 KB
+# sem compressão e ~20 KB com, e baixar isso custa menos que um novo handshake TLS
+LIMITE_DRENAGEM = 256 * 1024
+
+ABERTURA_JSONLD = re.compile(rb"<script\b[^>]*\btype\s*=\s*[\"']?application/ld\+json[\"']?[^>]*>", re.IGNORECASE)
+FECHAMENTO_SCRIPT = re.compile(rb"</script\s*>", re.IGNORECASE)
+
+# Quantos bytes do fim do buffer precisam ser revistos a cada bloco novo, para achar
+# uma tag que tenha sido cortada na divisa entre dois blocos
+SOBREPOSICAO = 256
+
+
+def ler_jsonld_em_fluxo(blocos):
+    """
+    Consome os blocos (bytes) até o fechamento do primeiro <script type="application/ld+json">.
+    Retorna (conteudo, buffer): `conteudo` são os bytes de dentro do script, ou None se a
+    página acabou sem nenhum bloco JSON-LD, e `buffer` é tudo o que foi lido até ali.
+    """
+    buffer = bytearray()
+    inicio_conteudo = None
+    for bloco in blocos:
+        if not bloco:
+            continue
+        inicio_busca = max(len(buffer) - SOBREPOSICAO, 0)
+        buffer += bloco
+
+        if inicio_conteudo is None:
+            abertura = ABERTURA_JSONLD.search(buffer, inicio_busca)
+            if not abertura:
+                continue
+            inicio_conteudo = abertura.end()
+            inicio_busca = inicio_conteudo
+
+        fechamento = FECHAMENTO_SCRIPT.search(buffer, max(inicio_busca, inicio_conteudo))
+        if fechamento:
+            return bytes(buffer[inicio_conteudo:fechamento.start()]), buffer
+    return None, buffer
+
+
+def extrair_jsonld_soup(html):
+    """Caminho completo (e mais lento): monta a árvore inteira e pega o primeiro script JSON-LD."""
+    soup = BeautifulSoup(html, 'html.parser')
+    script_tag = soup.find('script', type='application/ld+json')
+    if not script_tag:
+        return None
+    return json.loads(script_tag.string)
+
+
+def encontrar_no_medicamento(dados_json, url):
+    """Procura no @graph o nó com @id igual a `<url>#drug`."""
+    id_alvo = quote(f"{url}#drug", safe='/:#?=')
+    for item in dados_json.get('@graph', []):
+        if isinstance(item, dict) and item.get('@id') == id_alvo:
+            return item
+    return None
+
+
+def extrair_jsonld_da_resposta(response, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Lê uma resposta aberta com `stream=True` só até o fim do primeiro bloco JSON-LD e
+    decodifica apenas esse JSON. Se o bloco não existir ou não for um JSON válido, baixa
+    o restante da página e recorre ao BeautifulSoup.
+    """
+    codificacao = response.encoding or 'utf-8'
+    blocos = response.iter_content(chunk_size=tamanho_bloco)
+    conteudo, buffer = ler_jsonld_em_fluxo(blocos)
+
+    if conteudo is not None:
+        try:
+            dados_json = json.loads(conteudo.decode(codificacao))
+            descartar_restante(response)
+            return dados_json
+        except (ValueError, LookupError):
+            pass
+
+    for bloco in blocos:
+        buffer += bloco
+    return extrair_jsonld_soup(bytes(buffer).decode(codificacao, errors='replace'))
+
+
+def descartar_restante(response, limite=LIMITE_DRENAGEM):
+    """
+    Encerra uma resposta lida pela metade: se faltar pouco, lê o resto para a conexão
+    voltar ao pool; senão fecha a conexão e deixa o resto da página sem baixar.
+    """
+    try:
+        restante = int(response.headers.get('Content-Length', '')) - response.raw.tell()
+    except ValueError:
+        restante = None
+
+    if restante is not None and 0 <= restante <= limite:
+        for _ in response.iter_content(chunk_size=limite):
+            pass
+    response.close()
@@ -0,0 +1,150 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Estado compartilhado pelos processos que buscam no Google Shopping (fica ao lado das planilhas)
+ARQUIVO_LIMITADOR = "limitador_google.json"
+
+# Retornos de buscar_precos que indicam que o site está recusando as buscas
+RESULTADOS_DE_BLOQUEIO = {"Timeout", "Erro inesperado", "CAPTCHA"}
+
+
+@contextmanager
+def _trava_exclusiva(arquivo):
+    if fcntl:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+    else:
+        arquivo.seek(0)
+        msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            arquivo.seek(0)
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class LimitadorAdaptativo:
+    """
+    Balde de fichas (token bucket) guardado em arquivo, para que todos os processos
+    de busca dividam o mesmo ritmo. A taxa (buscas por segundo) cresce um pouco a
+    cada busca bem-sucedida e cai pela metade a cada CAPTCHA, timeout ou erro (AIMD),
+    ficando entre `taxa_minima` e `taxa_maxima`.
+
+    O processo principal cria o limitador com `reiniciar=True`; os trabalhadores
+    abrem o mesmo `caminho` e continuam do estado que já está lá.
+    """
+
+    def __init__(
+        self,
+        caminho=ARQUIVO_LIMITADOR,
+        taxa_inicial=0.5,
+        taxa_minima=1 / 30,
+        taxa_maxima=2.0,
+        rajada=2.0,
+        aumento=0.05,
+        reducao=0.5,
+        reiniciar=False,
+    ):
+        self.caminho = caminho
+        self.taxa_inicial = taxa_inicial
+        self.taxa_minima = taxa_minima
+        self.taxa_maxima = taxa_maxima
+        self.rajada = rajada
+        self.aumento = aumento
+        self.reducao = reducao
+        self._arquivo_trava = open(f"{caminho}.lock", "a+b")
+
+        with _trava_exclusiva(self._arquivo_trava):
+            if reiniciar or not os.path.exists(caminho):
+                self._gravar(self._estado_inicial())
+
+    def aguardar(self):
+        """Bloqueia até haver uma ficha para a próxima busca."""
+        while True:
+            with self._estado() as estado:
+                if estado["fichas"] >= 1:
+                    estado["fichas"] -= 1
+                    return
+                espera = (1 - estado["fichas"]) / estado["taxa"]
+            time.sleep(espera)
+
+    def registrar_sucesso(self):
+        with self._estado() as estado:
+            estado["taxa"] = min(self.taxa_maxima, estado["taxa"] + self.aumento)
+            estado["sucessos"] += 1
+
+    def registrar_bloqueio(self):
+        with self._estado() as estado:
+            estado["taxa"] = max(self.taxa_minima, estado["taxa"] * self.reducao)
+            # Esvazia o balde: ninguém busca de novo antes de uma ficha inteira na nova taxa
+            estado["fichas"] = 0.0
+            estado["bloqueios"] += 1
+
+    def registrar(self, preco_min):
+        """Ajusta a taxa pelo primeiro valor retornado por buscar_precos."""
+        if isinstance(preco_min, str) and preco_min in RESULTADOS_DE_BLOQUEIO:
+            self.registrar_bloqueio()
+        else:
+            self.registrar_sucesso()
+
+    @property
+    def taxa_atual(self):
+        return self.estatisticas()["taxa"]
+
+    def estatisticas(self):
+        with _trava_exclusiva(self._arquivo_trava):
+            estado = self._ler()
+        return {chave: estado[chave] for chave in ("taxa", "sucessos", "bloqueios")}
+
+    def fechar(self):
+        self._arquivo_trava.close()
+
+    @contextmanager
+    def _estado(self):
+        # Lê, repõe as fichas pelo tempo passado e grava de volta, tudo sob a trava
+        with _trava_exclusiva(self._arquivo_trava):
+            estado = self._ler()
+            agora = time.time()
+            decorrido = max(0.0, agora - estado["atualizado_em"])
+            estado["fichas"] = min(self.rajada, estado["fichas"] + decorrido * estado["taxa"])
+            estado["atualizado_em"] = agora
+            try:
+                yield estado
+            finally:
+                self._gravar(estado)
+
+    def _estado_inicial(self):
+        return {"taxa": self.taxa_inicial, "fichas": 1.0, "atualizado_em": time.time(), "sucessos": 0, "bloqueios": 0}
+
+    def _ler(self):
+        try:
+            with open(self.caminho, encoding="utf-8") as arquivo:
+                return json.load(arquivo)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self._estado_inicial()
+
+    def _gravar(self, estado):
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(estado, arquivo)
+        os.replace(temporario, self.caminho)
+
+
+def mostra_estatisticas_limitador(limitador):
+    estatisticas = limitador.estatisticas()
+    print("\n--- Ritmo das buscas no Google Shopping ---")
+    print(f"  Taxa final: {estatisticas['taxa']:.2f} busca(s)/s ({1 / estatisticas['taxa']:.1f}s entre buscas)")
+    print(f"  Buscas bem-sucedidas: {estatisticas['sucessos']}")
+    print(f"  Bloqueios (CAPTCHA, timeout ou erro): {estatisticas['bloqueios']}")
+    print("-" * 43)
@@ -1,33 +1,50 @@
-import requests
 import json
-import pandas as pd
-import os
-from bs4 import BeautifulSoup
-from urllib.parse import quote
+import re
+from collections import deque
 from datetime import datetime
 
+import requests
+
+from .cache_http import CacheDisco, SemCache, cabecalhos_revalidacao, mostra_estatisticas_cache
+from .cliente_http import ClienteHTTP, mostra_estatisticas_conexoes
+from .concorrencia import BuscadorConcorrente, RegistroBuscas
+from .diario import DiarioExecucao
+from .entrada import em_lotes, ler_nomes
+from .jsonld import encontrar_no_medicamento, extrair_jsonld_da_resposta
+from .metricas import metricas, mostra_estatisticas_metricas
+from .planilha import EscritorPlanilha
+from .resiliencia import Resiliencia, mostra_estatisticas_resiliencia
+
 # filename = list(uploaded.keys())[0]
 # print(uploaded.keys())
 
-filename = input("Digite o nome do arquivo (com a extensão): ")
-
-df_uploaded = pd.read_excel(filename)
-print(f"Programa iniciado as {datetime.now()}")
+COLUNA_PADRAO = "Rótulos de Linha"
 
-#display(df_uploaded.head())
+# Quantidade de linhas novas entre cada gravação intermediária da base
+SALVAR_A_CADA = 500
 
-rotulos_de_linha = df_uploaded['Rótulos de Linha'].tolist()
+# Diário de progresso usado pelo --resume
+ARQUIVO_DIARIO = "base_farmaindex.diario.jsonl"
 
-parametros_ignorados = ['(vazio)', 'Total Geral']
+# Limites das buscas paralelas das páginas de detalhe do farmaindex
+MAX_CONCORRENCIA = 8
+MAX_POR_HOST = 8
+INTERVALO_POR_HOST = 0.05  # segundos entre o início de duas requisições ao mesmo host
 
-LISTA_MEDICAMENTOS = [item for item in rotulos_de_linha if item not in parametros_ignorados]
+# Cache em disco das buscas e das páginas de detalhe, para reexecuções no mesmo dia
+CACHE_ARQUIVO = "cache_farmaindex.sqlite"
+CACHE_TTL_HORAS = 24
+CACHE_TAMANHO_MAXIMO_MB = 200
 
-print("\nProcessed list of medications:")
-print(LISTA_MEDICAMENTOS)
+# Quantos nomes vão em cada consulta GraphQL em lote
+TAMANHO_LOTE_GRAPHQL = 25
 
 # URL da API em Graphql
 API_URL = "https://qp1crcg3c6.execute-api.us-east-1.amazonaws.com/production/b2c/graphql"
 
+# Origem das páginas de detalhe (com o JSON-LD) dos medicamentos
+SITE_URL = "https://farmaindex.com"
+
 # Headers da API
 HEADERS = {
     "Accept": "*/*",
@@ -44,58 +61,134 @@ HEADERS = {
     "user-agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36"
 }
 
-# Query GraphQL
-GRAPHQL_QUERY = """
-query searchPrefix($q: String!) {
-  searchPrefix(q: $q) {
+# Headers das páginas de detalhe do farmaindex
+HEADERS_PAGINAS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Clientes HTTP compartilhados, com conexões keep-alive reaproveitadas entre as requisições
+# Retentativas, espera exponencial e disjuntor por host para as duas origens
+resiliencia = Resiliencia()
+cliente_api = ClienteHTTP(HEADERS, resiliencia=resiliencia)
+cliente_paginas = ClienteHTTP(HEADERS_PAGINAS, tamanho_pool=MAX_POR_HOST, resiliencia=resiliencia)
+
+# O cache em disco só é aberto por main(); quem importa as funções usa a rede direto
+cache = SemCache()
+
+# Campos do searchPrefix que o script realmente usa, pedidos na busca simples e nas em lote
+CAMPOS_SEARCHPREFIX = """
     medicamentoid
     medicamento
     apresentacao
-    farmaco
     laboratorio
-    tipoid
-    tipo
-    imagem
-    imagemUrl
-    tarja
-    oferta
-    url
     preco
-    __typename
-  }
-}
 """
 
+# Query GraphQL
+GRAPHQL_QUERY = f"""
+query searchPrefix($q: String!) {{
+  searchPrefix(q: $q) {{{CAMPOS_SEARCHPREFIX}  }}
+}}
+"""
+
+# Passa a ser False se a API recusar consultas com várias buscas apelidadas
+lote_suportado = True
+
+# Menção a uma variável da consulta em lote ($q0, $q1, ...) numa mensagem de erro
+VARIAVEL_DO_LOTE = re.compile(r"\$q\d+\b")
+
+
+class LoteRejeitado(Exception):
+    """A API recusou a consulta em lote; `estrutural` se foi a consulta em si, e não algum nome dela."""
+
+    def __init__(self, mensagem, estrutural=False):
+        super().__init__(mensagem)
+        self.estrutural = estrutural
+
+
+def rejeicao_estrutural(erros):
+    """
+    True se os erros GraphQL recusam a consulta em lote em si (apelidos, complexidade).
+    Erros de um nome específico apontam o apelido (path ["r3"]) ou a variável ($q3).
+    """
+    if not erros:
+        return False
+    return not any(
+        erro.get("path") or VARIAVEL_DO_LOTE.search(str(erro.get("message", "")))
+        for erro in erros
+        if isinstance(erro, dict)
+    )
+
+
+def chave_medicamento(url):
+    return f"medicamento:{url.rstrip('/').rsplit('/', 1)[-1]}"
+
+
+def detalhe_em_cache(url):
+    """Entrada do cache ainda válida da página de detalhe `url`, ou None."""
+    entrada = cache.obter(chave_medicamento(url))
+    if entrada is not None and entrada.fresca:
+        metricas.contar("paginas_detalhe", resultado="cache")
+        return entrada
+    return None
+
+
 def extrair_dados_medicamento(url: str):
     """
     Busca o HTML de uma URL, encontra os dados estruturados (JSON-LD)
     e extrai as informações do medicamento.
+    O download é interrompido assim que o bloco JSON-LD termina, e o resultado fica
+    guardado no cache em disco pelo medicamentoid (último trecho da URL).
+    Retorna None se a página não existir ou não tiver os dados; falhas de rede que
+    persistirem depois das retentativas são lançadas para quem chamou.
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        script_tag = soup.find('script', type='application/ld+json')
-        if not script_tag:
-            return None
-        dados_json = json.loads(script_tag.string)
-        id_alvo = quote(f"{url}#drug", safe='/:#?=')
-        # print(f"\nDados puros: {dados_json}")
-        for item in dados_json.get('@graph', []):
-            # print(f"\nItem puro: {item}")
-            if isinstance(item, dict) and item.get('@id') == id_alvo:
-                return item
-        return None
-    except Exception:
-        return None
-
-def buscar_medicamento(nome_medicamento: str):
+    chave = chave_medicamento(url)
+    entrada = cache.obter(chave)
+    if entrada is not None and entrada.fresca:
+        metricas.contar("paginas_detalhe", resultado="cache")
+        return entrada.valor
+
+    with metricas.cronometrar("pagina_detalhe"), cliente_paginas.get(
+        url, headers=cabecalhos_revalidacao(entrada), timeout=10, stream=True
+    ) as response:
+        if response.status_code == 304 and entrada is not None:
+            metricas.contar("paginas_detalhe", resultado="revalidada")
+            cache.renovar(chave)
+            return entrada.valor
+        if response.status_code == 404:
+            dados_json = None
+        else:
+            response.raise_for_status()
+            try:
+                dados_json = extrair_jsonld_da_resposta(response)
+            except ValueError:
+                # JSON-LD malformado: a página existe mas não tem dados aproveitáveis
+                metricas.contar("paginas_detalhe", resultado="jsonld_invalido")
+                return None
+    # print(f"\nDados puros: {dados_json}")
+    dados_do_remedio = encontrar_no_medicamento(dados_json, url) if dados_json else None
+    metricas.contar("paginas_detalhe", resultado="com_dados" if dados_do_remedio else "sem_dados")
+    cache.gravar(
+        chave,
+        dados_do_remedio,
+        etag=response.headers.get('ETag'),
+        ultima_modificacao=response.headers.get('Last-Modified'),
+    )
+    return dados_do_remedio
+
+def buscar_medicamento(nome_medicamento: str, usar_cache=True):
     """
     Função que envia uma requisição para a API GraphQL e retorna os resultados.
+    Respostas ainda dentro da validade são lidas do cache em disco.
+    Retorna None (e não uma lista vazia) quando a busca falha, para que o nome não
+    seja dado como concluído.
     """
+    chave = f"searchPrefix:{nome_medicamento}"
+    if usar_cache:
+        entrada = cache.obter(chave)
+        if entrada is not None and entrada.fresca:
+            return entrada.valor
+
     # print(f"Buscando por: '{nome_medicamento}'...")
     payload = {
         "operationName": "searchPrefix",
@@ -103,25 +196,115 @@ def buscar_medicamento(nome_medicamento: str):
         "query": GRAPHQL_QUERY
     }
     try:
-        response = requests.post(API_URL, headers=HEADERS, json=payload, timeout=10)
-        response.raise_for_status()
-        dados = response.json().get('data', {}).get('searchPrefix', [])
-        dados_filtrados = []
-        for dado in dados:
-            tem_oferta = dado.get('preco') is not None
-            if tem_oferta:
-                dados_filtrados.append(dado)
+        with metricas.cronometrar("graphql", operacao="searchPrefix"):
+            response = cliente_api.post(API_URL, json=payload, timeout=10)
+            response.raise_for_status()
+            dados = response.json().get('data', {}).get('searchPrefix', [])
+        dados_filtrados = filtrar_com_preco(dados)
+        cache.gravar(chave, dados_filtrados)
         return dados_filtrados
-    except requests.exceptions.RequestException as e:
-        print(f"Ocorreu um erro na requisição: {e}")
-        return []
     except json.JSONDecodeError:
         print("Erro ao decodificar a resposta JSON.")
-        return []
+        return None
+    except requests.exceptions.RequestException as e:
+        print(f"Ocorreu um erro na requisição: {e}")
+        return None
+
+
+def filtrar_com_preco(dados):
+    dados_filtrados = []
+    for dado in dados:
+        tem_oferta = dado.get('preco') is not None
+        if tem_oferta:
+            dados_filtrados.append(dado)
+    metricas.contar("medicamentos", len(dados_filtrados), status="com_preco")
+    metricas.contar("medicamentos", len(dados) - len(dados_filtrados), status="sem_preco")
+    return dados_filtrados
+
+
+def montar_query_lote(quantidade):
+    """Monta um documento GraphQL com `quantidade` buscas searchPrefix apelidadas r0, r1, ..."""
+    variaveis = ", ".join(f"$q{i}: String!" for i in range(quantidade))
+    buscas = "\n".join(f"  r{i}: searchPrefix(q: $q{i}) {{{CAMPOS_SEARCHPREFIX}  }}" for i in range(quantidade))
+    return f"query searchPrefixLote({variaveis}) {{\n{buscas}\n}}"
 
 
-def mostra_medicamentos_encontrados():
-    global i, med
+def buscar_lote_na_api(nomes):
+    """
+    Envia uma única requisição com todas as buscas de `nomes`. Retorna um dicionário
+    nome -> resultados filtrados, só com os nomes que a API respondeu sem erro.
+    Lança LoteRejeitado se a API não aceitar a consulta em lote.
+    """
+    payload = {
+        "operationName": "searchPrefixLote",
+        "variables": {f"q{i}": nome for i, nome in enumerate(nomes)},
+        "query": montar_query_lote(len(nomes))
+    }
+    with metricas.cronometrar("graphql", operacao="searchPrefixLote"):
+        response = cliente_api.post(API_URL, json=payload, timeout=10 + len(nomes))
+    if 400 <= response.status_code < 500:
+        try:
+            erros = response.json().get('errors')
+        except (ValueError, AttributeError):
+            erros = None
+        raise LoteRejeitado(f"HTTP {response.status_code}: {erros}", rejeicao_estrutural(erros))
+    response.raise_for_status()
+
+    corpo = response.json()
+    dados = corpo.get('data')
+    if not dados:
+        erros = corpo.get('errors')
+        raise LoteRejeitado(str(erros), rejeicao_estrutural(erros))
+
+    resultados = {}
+    for i, nome in enumerate(nomes):
+        resposta = dados.get(f"r{i}")
+        if resposta is not None:
+            resultados[nome] = filtrar_com_preco(resposta)
+    return resultados
+
+
+def buscar_medicamentos_em_lote(nomes):
+    """
+    Busca vários nomes de uma vez: lê do cache o que estiver válido e agrupa o resto em
+    uma única consulta GraphQL. Os nomes que a consulta em lote não conseguir responder
+    são buscados individualmente com buscar_medicamento. Retorna nome -> resultados.
+    """
+    global lote_suportado
+
+    resultados = {}
+    faltantes = []
+    for nome in dict.fromkeys(nomes):
+        entrada = cache.obter(f"searchPrefix:{nome}")
+        if entrada is not None and entrada.fresca:
+            resultados[nome] = entrada.valor
+        else:
+            faltantes.append(nome)
+
+    if faltantes and lote_suportado and len(faltantes) > 1:
+        try:
+            respondidos = buscar_lote_na_api(faltantes)
+            for nome, dados_filtrados in respondidos.items():
+                cache.gravar(f"searchPrefix:{nome}", dados_filtrados)
+            resultados.update(respondidos)
+        except LoteRejeitado as e:
+            if e.estrutural:
+                print(f"A API recusou a busca em lote ({e}). Seguindo com buscas individuais.")
+                lote_suportado = False
+            else:
+                # Algum nome do lote foi recusado: só este lote vai por buscas individuais
+                print(f"A API recusou este lote ({e}). Repetindo os nomes individualmente.")
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+            print(f"Falha na busca em lote ({e}). Repetindo os nomes individualmente.")
+
+    for nome in faltantes:
+        if nome not in resultados:
+            # O cache já foi consultado acima
+            resultados[nome] = buscar_medicamento(nome, usar_cache=False)
+    return resultados
+
+
+def mostra_medicamentos_encontrados(medicamentos_encontrados, limite_exibicao):
     print(f"\nForam encontrados {len(medicamentos_encontrados)} resultados. Exibindo os {limite_exibicao} primeiros:\n")
     for i, med in enumerate(medicamentos_encontrados[:limite_exibicao]):
         print(f"--- Opção {i + 1} ---")
@@ -131,129 +314,178 @@ def mostra_medicamentos_encontrados():
         print("-" * 20)
 
 
-def salva_excel():
-    decisao = "s"
-    if decisao.lower().strip().startswith('s'):
-        # --- BLOCO DE FORMATAÇÃO E SALVAMENTO ---
-
-        nome_arquivo = "base_farmaindex.xlsx"
-        nome_aba = "base"
-
-        df_novo_dado = pd.DataFrame([dados_completos])
-
-        if os.path.exists(nome_arquivo):
-            # print(f"\nArquivo '{nome_arquivo}' encontrado. Adicionando dados...")
-            df_existente = pd.read_excel(nome_arquivo)
-            df_final = pd.concat([df_existente, df_novo_dado], ignore_index=True)
-        else:
-            # print(f"\nCriando novo arquivo '{nome_arquivo}'...")
-            df_final = df_novo_dado
-
-        colunas_numericas = ['Preço Referência', 'Maior Preço Encontrado', 'Menor Preço Encontrado', 'Registro MS']
-        for col in colunas_numericas:
-            df_final[col] = pd.to_numeric(df_final[col], errors='coerce')
-
-        # Garante que as colunas de moeda sejam arredondadas para 2 casas decimais
-        colunas_moeda = ['Preço Referência', 'Maior Preço Encontrado', 'Menor Preço Encontrado']
-        for col in colunas_moeda:
-            if col in df_final.columns:
-                df_final[col] = df_final[col].round(2)
-
-        # Usa o ExcelWriter para salvar e formatar
-        with pd.ExcelWriter(nome_arquivo, engine='xlsxwriter') as writer:
-            df_final.to_excel(writer, sheet_name=nome_aba, index=False)
-
-            workbook = writer.book
-            worksheet = writer.sheets[nome_aba]
-
-            # Cria os formatos de célula
-            formato_moeda = workbook.add_format({'num_format': '0.00'})
-            formato_ms = workbook.add_format({'num_format': '0'})
-
-            try:
-                headers = list(df_final.columns)
-                col_preco_ref = headers.index('Preço Referência')
-                col_maior_preco = headers.index('Maior Preço Encontrado')
-                col_menor_preco = headers.index('Menor Preço Encontrado')
-                col_ms = headers.index('Registro MS')
-
-                # Aplica a formatação e define a largura das colunas
-                worksheet.set_column(col_preco_ref, col_preco_ref, 18, formato_moeda)
-                worksheet.set_column(col_maior_preco, col_maior_preco, 22, formato_moeda)
-                worksheet.set_column(col_menor_preco, col_menor_preco, 22, formato_moeda)
-                worksheet.set_column(col_ms, col_ms, 18, formato_ms)
-                # Ajusta a largura das outras colunas para melhor visualização
-                worksheet.set_column(headers.index('Nome'), headers.index('Nome'), 25)
-                worksheet.set_column(headers.index('Apresentação'), headers.index('Apresentação'), 40)
-                worksheet.set_column(headers.index('Laboratório'), headers.index('Laboratório'), 25)
-            except ValueError:
-                print("Aviso: Não foi possível formatar uma ou mais colunas.")
-
-        # print("Dados salvos e formatados com sucesso!")
-
-    else:
-        print("Operação cancelada. Encerrando.")
-
-
-def mostra_detalhes_do_medicamento():
+def mostra_detalhes_do_medicamento(dados_completos):
     print("\n--- Detalhes do Produto Selecionado ---")
     for chave, valor in dados_completos.items():
         print(f"  {chave}: {valor}")
     print("-" * 35)
 
 
-# EXECUÇÃO PRINCIPAL DO SCRIPT
-if __name__ == "__main__":
+def montar_url_medicamento(med_selecionado):
+    nome_para_url = med_selecionado.get('medicamento').lower().replace(' ', '-')
+    id_medicamento = str(med_selecionado.get('medicamentoid'))
+    return f"{SITE_URL}/{nome_para_url}/{id_medicamento}"
+
 
-    for i,med in enumerate(LISTA_MEDICAMENTOS):
-        NOME_DO_MEDICAMENTO_A_BUSCAR = med
-        medicamentos_encontrados = buscar_medicamento(NOME_DO_MEDICAMENTO_A_BUSCAR)
+def montar_dados_completos(med_selecionado, dados_do_remedio):
+    dados_completos = {
+        'Nome': med_selecionado.get('medicamento'),
+        'Apresentação': med_selecionado.get('apresentacao'),
+        'Laboratório': med_selecionado.get('laboratorio'),
+        'Preço Referência': med_selecionado.get('preco'),
+        'Registro MS': 'Não encontrado',
+        'Maior Preço Encontrado': 'N/A',
+        'Menor Preço Encontrado': 'N/A'
+    }
 
-        if medicamentos_encontrados:
+    if dados_do_remedio:
+        identifier = dados_do_remedio.get('identifier', {})
+        registro = identifier.get('value')
+        offers = dados_do_remedio.get('offers', {})
+        maior_preco = offers.get('highPrice')
+        menor_preco = offers.get('lowPrice')
 
-          # limite_exibicao = 10
-          limite_exibicao = len(medicamentos_encontrados)
+        dados_completos['Registro MS'] = registro
+        dados_completos['Maior Preço Encontrado'] = maior_preco
+        dados_completos['Menor Preço Encontrado'] = menor_preco
 
-          # mostra_medicamentos_encontrados()
+    return dados_completos
 
-          try:
-              for med_a_salvar in medicamentos_encontrados:
 
-                  med_selecionado = med_a_salvar
+def descarregar_prontos(pendentes, escritor, diario, falhas, bloquear=False):
+    """
+    Entrega ao escritor os resultados já concluídos, sempre na ordem em que foram
+    submetidos: para no primeiro ainda em andamento, a menos que `bloquear` seja True,
+    e no primeiro cancelado (execução interrompida).
+    Cada linha é anotada no diário antes de ir para o escritor, e cada nome da lista é
+    marcado como concluído quando todas as linhas anteriores a ele já foram entregues.
+    Nomes com alguma página de detalhe que falhou vão para `falhas` e não são marcados
+    como concluídos, para serem refeitos pelo --resume.
+    """
+    while pendentes:
+        tipo, conteudo, futuro, nome = pendentes[0]
+        if tipo == "linha" and (futuro.cancelled() or not (bloquear or futuro.done())):
+            break
+        pendentes.popleft()
+
+        if tipo == "concluido":
+            if nome not in falhas:
+                diario.registrar_concluido(nome)
+            continue
+
+        med_selecionado = conteudo
+        try:
+            dados_do_remedio = futuro.result()
+        except Exception as e:
+            print(f"\nFalha ao buscar os detalhes de '{med_selecionado.get('medicamento')}' ({nome}): {e}")
+            falhas[nome] = str(e)
+            continue
+        dados_completos = montar_dados_completos(med_selecionado, dados_do_remedio)
+        # mostra_detalhes_do_medicamento(dados_completos)
+        diario.registrar_linha(med_selecionado.get('medicamentoid'), dados_completos)
+        escritor.adicionar(dados_completos)
 
-                  nome_para_url = med_selecionado.get('medicamento').lower().replace(' ', '-')
-                  id_medicamento = str(med_selecionado.get('medicamentoid'))
-                  URL_MEDICAMENTO = f"https://farmaindex.com/{nome_para_url}/{id_medicamento}"
 
-                  dados_do_remedio = extrair_dados_medicamento(URL_MEDICAMENTO)
+# EXECUÇÃO PRINCIPAL DO SCRIPT
+def main(arquivo=None, coluna=COLUNA_PADRAO, resume=False):
+    global cache
+
+    filename = arquivo or input("Digite o nome do arquivo (com a extensão): ")
+
+    print(f"Programa iniciado as {datetime.now()}")
+
+    # Os nomes são lidos sob demanda: as buscas começam antes de a planilha ser lida inteira
+    LISTA_MEDICAMENTOS = ler_nomes(filename, coluna)
+
+    cache = CacheDisco(CACHE_ARQUIVO, ttl=CACHE_TTL_HORAS * 3600, tamanho_maximo=CACHE_TAMANHO_MAXIMO_MB * 1024 * 1024)
+    escritor = EscritorPlanilha("base_farmaindex.xlsx", "base", salvar_a_cada=SALVAR_A_CADA)
+    buscador = BuscadorConcorrente(
+        extrair_dados_medicamento,
+        max_concorrencia=MAX_CONCORRENCIA,
+        max_por_host=MAX_POR_HOST,
+        intervalo_por_host=INTERVALO_POR_HOST,
+        # Acertos do cache não passam pelo limite nem pelo intervalo do host
+        consultar_cache=detalhe_em_cache,
+    )
+    # Cada medicamentoid é buscado e gravado uma única vez, mesmo que apareça no
+    # resultado de vários nomes da lista
+    registro = RegistroBuscas(buscador)
+    # Fila na ordem de entrada com ("linha", medicamento, Future, nome) para cada página
+    # de detalhe e ("concluido", None, None, nome) depois das linhas de cada nome; as
+    # páginas de um medicamento continuam sendo baixadas enquanto o próximo é pesquisado
+    pendentes = deque()
+    # Nomes que não puderam ser concluídos -> motivo
+    falhas = {}
+
+    diario = DiarioExecucao(ARQUIVO_DIARIO, retomar=resume)
+    if diario.linhas_existentes is not None:
+        # Reconstrói a saída: descarta o que foi gravado pela execução interrompida e
+        # repõe as linhas a partir do diário, que é a fonte confiável
+        escritor.descartar_apos(diario.linhas_existentes)
+        for linha in diario.linhas:
+            escritor.adicionar(linha)
+        for medicamentoid in diario.medicamentoids:
+            registro.registrar_resultado(medicamentoid, None)
+        print(
+            f"Retomando: {len(diario.concluidos)} nome(s) já concluído(s), "
+            f"{len(diario.linhas)} linha(s) recuperada(s) do diário."
+        )
+    else:
+        diario.registrar_inicio(escritor.linhas_existentes)
 
-                  dados_completos = {
-                      'Nome': med_selecionado.get('medicamento'),
-                      'Apresentação': med_selecionado.get('apresentacao'),
-                      'Laboratório': med_selecionado.get('laboratorio'),
-                      'Preço Referência': med_selecionado.get('preco'),
-                      'Registro MS': 'Não encontrado',
-                      'Maior Preço Encontrado': 'N/A',
-                      'Menor Preço Encontrado': 'N/A'
-                  }
+    LISTA_MEDICAMENTOS = (nome for nome in LISTA_MEDICAMENTOS if nome not in diario.concluidos)
 
-                  if dados_do_remedio:
-                      identifier = dados_do_remedio.get('identifier', {})
-                      registro = identifier.get('value')
-                      offers = dados_do_remedio.get('offers', {})
-                      maior_preco = offers.get('highPrice')
-                      menor_preco = offers.get('lowPrice')
+    try:
+        with buscador:
+            for lote in em_lotes(LISTA_MEDICAMENTOS, TAMANHO_LOTE_GRAPHQL):
+                print(f"\nBuscando: {', '.join(lote)}")
+                resultados_lote = buscar_medicamentos_em_lote(lote)
+
+                for NOME_DO_MEDICAMENTO_A_BUSCAR in lote:
+                    medicamentos_encontrados = resultados_lote[NOME_DO_MEDICAMENTO_A_BUSCAR]
+
+                    if medicamentos_encontrados is None:
+                        falhas[NOME_DO_MEDICAMENTO_A_BUSCAR] = "falha na busca da API"
+                    elif medicamentos_encontrados:
+                      try:
+                          for med_selecionado in medicamentos_encontrados:
+                              URL_MEDICAMENTO = montar_url_medicamento(med_selecionado)
+                              futuro, novo = registro.obter(med_selecionado.get('medicamentoid'), URL_MEDICAMENTO)
+                              if novo:
+                                  pendentes.append(("linha", med_selecionado, futuro, NOME_DO_MEDICAMENTO_A_BUSCAR))
+                      except (ValueError, IndexError) as e:
+                          print(f"\nErro: {e}. Encerrando o programa.")
+                    else:
+                        print(f"\nNão foram encontrados resultados para {NOME_DO_MEDICAMENTO_A_BUSCAR}")
+
+                    pendentes.append(("concluido", None, None, NOME_DO_MEDICAMENTO_A_BUSCAR))
+                    descarregar_prontos(pendentes, escritor, diario, falhas)
+
+            descarregar_prontos(pendentes, escritor, diario, falhas, bloquear=True)
+    finally:
+        # Grava tudo o que foi coletado, mesmo se a execução for interrompida
+        descarregar_prontos(pendentes, escritor, diario, falhas)
+        escritor.salvar()
+        diario.fechar()
+    print(f"\n{registro.buscas_evitadas} busca(s) de detalhe evitada(s) por medicamentoid repetido.")
+    mostra_estatisticas_conexoes(cliente_api, cliente_paginas)
+    mostra_estatisticas_resiliencia(resiliencia)
+    if falhas:
+        print(f"\n⚠️ {len(falhas)} nome(s) não puderam ser concluídos; rode novamente com --resume:")
+        for nome, motivo in falhas.items():
+            print(f"  - {nome}: {motivo}")
+    mostra_estatisticas_cache(cache)
+    cache.fechar()
+    for chave, quantidade in resiliencia.contadores.items():
+        metricas.contar("falhas_rede", quantidade, tipo=chave)
+    mostra_estatisticas_metricas(metricas)
+    metricas.exportar("medicamentos")
+    print(f"\nPrograma finalizado as {datetime.now()}")
 
-                      dados_completos['Registro MS'] = registro
-                      dados_completos['Maior Preço Encontrado'] = maior_preco
-                      dados_completos['Menor Preço Encontrado'] = menor_preco
 
-                  # mostra_detalhes_do_medicamento()
+if __name__ == "__main__":
+    import sys
 
-                  salva_excel()
+    from .__main__ import main as cli
 
-          except (ValueError, IndexError) as e:
-              print(f"\nErro: {e}. Encerrando o programa.")
-        else:
-            print(f"\nNão foram encontrados resultados para {NOME_DO_MEDICAMENTO_A_BUSCAR}")
-    print(f"\nPrograma finalizado as {datetime.now()}")
\ No newline at end of file
+    cli(["medicamentos", *sys.argv[1:]])
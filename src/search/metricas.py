@@ -0,0 +1,239 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Diário das execuções: uma linha JSON por métrica, acrescentada ao fim de cada execução
+ARQUIVO_DIARIO_METRICAS = "metricas_execucao.jsonl"
+# Arquivo no formato texto do Prometheus (para o textfile collector do node_exporter),
+# reescrito a cada execução; um por programa, para um não apagar o do outro
+ARQUIVO_PROMETHEUS = "metricas_{programa}.prom"
+PREFIXO_PROMETHEUS = "vigiafarma"
+
+# Limites superiores (segundos) das faixas dos histogramas de tempo: de 1 ms, para a
+# análise de uma página, até 60 s, acima da espera de 20 s pela grade de resultados
+FAIXAS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+class Histograma:
+    """Contagens por faixa de valor, soma e máximo; os quantis são estimados pelas faixas."""
+
+    __slots__ = ("faixas", "contagens", "soma", "maximo")
+
+    def __init__(self, faixas=FAIXAS_SEGUNDOS):
+        self.faixas = faixas
+        # A última posição conta os valores acima da maior faixa (+Inf)
+        self.contagens = [0] * (len(faixas) + 1)
+        self.soma = 0.0
+        self.maximo = 0.0
+
+    @property
+    def quantidade(self):
+        return sum(self.contagens)
+
+    def observar(self, valor):
+        self.contagens[bisect.bisect_left(self.faixas, valor)] += 1
+        self.soma += valor
+        self.maximo = max(self.maximo, valor)
+
+    def incorporar(self, outro):
+        self.contagens = [a + b for a, b in zip(self.contagens, outro.contagens)]
+        self.soma += outro.soma
+        self.maximo = max(self.maximo, outro.maximo)
+
+    def quantil(self, q):
+        """Estimativa do quantil `q` por interpolação linear dentro da faixa (como o histogram_quantile do Prometheus)."""
+        total = self.quantidade
+        if not total:
+            return None
+        alvo = q * total
+        acumulado = 0
+        for i, contagem in enumerate(self.contagens):
+            if contagem and acumulado + contagem >= alvo:
+                inferior = self.faixas[i - 1] if i else 0.0
+                superior = self.faixas[i] if i < len(self.faixas) else self.maximo
+                return min(inferior + (superior - inferior) * (alvo - acumulado) / contagem, self.maximo)
+            acumulado += contagem
+        return self.maximo
+
+
+def _chave(nome, rotulos):
+    return nome, tuple(sorted((chave, str(valor)) for chave, valor in rotulos.items()))
+
+
+class Metricas:
+    """
+    Tempos por estágio, contadores e medidores de uma execução, guardados em memória
+    e exportados no fim (exportar). Cada métrica é identificada pelo nome e pelos
+    rótulos, como no Prometheus: cronometrar("driver_get") e
+    cronometrar("extracao", motor="lxml") viram linhas do mesmo histograma de estágios.
+
+    Seguro entre threads. Processos filhos (pool_navegadores) mandam o seu
+    instantaneo() ao processo principal, que o junta com incorporar().
+    """
+
+    def __init__(self):
+        self.inicio = time.time()
+        self.histogramas = {}
+        self.contadores = Counter()
+        self.medidores = {}
+        self._trava = threading.Lock()
+
+    @contextmanager
+    def cronometrar(self, estagio, **rotulos):
+        """Mede o bloco no histograma estagio_segundos, mesmo se ele terminar com exceção."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar("estagio_segundos", time.perf_counter() - inicio, estagio=estagio, **rotulos)
+
+    def observar(self, nome, valor, **rotulos):
+        chave = _chave(nome, rotulos)
+        with self._trava:
+            histograma = self.histogramas.get(chave)
+            if histograma is None:
+                histograma = self.histogramas[chave] = Histograma()
+            histograma.observar(valor)
+
+    def contar(self, nome, quantidade=1, **rotulos):
+        with self._trava:
+            self.contadores[_chave(nome, rotulos)] += quantidade
+
+    def medir(self, nome, valor, **rotulos):
+        """Guarda o valor atual de um medidor (o último valor vale)."""
+        with self._trava:
+            self.medidores[_chave(nome, rotulos)] = valor
+
+    def instantaneo(self):
+        """Cópia de todas as métricas, que pode ser mandada a outro processo."""
+        with self._trava:
+            return {
+                "histogramas": {chave: (h.contagens[:], h.soma, h.maximo) for chave, h in self.histogramas.items()},
+                "contadores": dict(self.contadores),
+                "medidores": dict(self.medidores),
+            }
+
+    def incorporar(self, instantaneo):
+        """Soma ao registro as métricas de um instantaneo() de outro processo."""
+        with self._trava:
+            for chave, (contagens, soma, maximo) in instantaneo["histogramas"].items():
+                outro = Histograma()
+                outro.contagens, outro.soma, outro.maximo = contagens, soma, maximo
+                self.histogramas.setdefault(chave, Histograma()).incorporar(outro)
+            self.contadores.update(instantaneo["contadores"])
+            self.medidores.update(instantaneo["medidores"])
+
+    def exportar(self, programa, caminho_diario=ARQUIVO_DIARIO_METRICAS, caminho_prometheus=ARQUIVO_PROMETHEUS):
+        """Acrescenta a execução ao diário JSONL e reescreve o arquivo do Prometheus."""
+        caminho_prometheus = caminho_prometheus.format(programa=programa)
+        self.exportar_jsonl(caminho_diario, programa)
+        self.exportar_prometheus(caminho_prometheus, programa)
+        print(f"\n📈 Métricas da execução em '{caminho_diario}' e '{caminho_prometheus}'")
+
+    def exportar_jsonl(self, caminho, programa):
+        fim = time.time()
+        base = {"programa": programa, "execucao": _data(self.inicio), "duracao": round(fim - self.inicio, 3)}
+        linhas = []
+        with self._trava:
+            for (nome, rotulos), histograma in sorted(self.histogramas.items()):
+                linhas.append({
+                    **base,
+                    "tipo": "histograma",
+                    "nome": nome,
+                    "rotulos": dict(rotulos),
+                    "quantidade": histograma.quantidade,
+                    "soma": round(histograma.soma, 6),
+                    "maximo": round(histograma.maximo, 6),
+                    "p50": _arredondar(histograma.quantil(0.5)),
+                    "p95": _arredondar(histograma.quantil(0.95)),
+                    "p99": _arredondar(histograma.quantil(0.99)),
+                    "faixas": {str(limite): contagem for limite, contagem in zip((*histograma.faixas, "+Inf"), histograma.contagens)},
+                })
+            for tipo, valores in (("contador", self.contadores), ("medidor", self.medidores)):
+                for (nome, rotulos), valor in sorted(valores.items()):
+                    linhas.append({**base, "tipo": tipo, "nome": nome, "rotulos": dict(rotulos), "valor": valor})
+        with open(caminho, "a", encoding="utf-8") as arquivo:
+            for linha in linhas:
+                arquivo.write(json.dumps(linha, ensure_ascii=False) + "\n")
+
+    def exportar_prometheus(self, caminho, programa):
+        texto = []
+        with self._trava:
+            for nome, series in _por_nome(self.histogramas):
+                texto.append(f"# TYPE {nome} histogram")
+                for rotulos, histograma in series:
+                    acumulado = 0
+                    for limite, contagem in zip((*histograma.faixas, "+Inf"), histograma.contagens):
+                        acumulado += contagem
+                        texto.append(f"{nome}_bucket{_rotulos(programa, rotulos, le=limite)} {acumulado}")
+                    texto.append(f"{nome}_sum{_rotulos(programa, rotulos)} {histograma.soma:.6f}")
+                    texto.append(f"{nome}_count{_rotulos(programa, rotulos)} {acumulado}")
+            for nome, series in _por_nome(self.contadores):
+                texto.append(f"# TYPE {nome}_total counter")
+                texto.extend(f"{nome}_total{_rotulos(programa, rotulos)} {valor}" for rotulos, valor in series)
+            for nome, series in _por_nome(self.medidores):
+                texto.append(f"# TYPE {nome} gauge")
+                texto.extend(f"{nome}{_rotulos(programa, rotulos)} {valor}" for rotulos, valor in series)
+        texto.append(f"# TYPE {PREFIXO_PROMETHEUS}_ultima_execucao_timestamp_seconds gauge")
+        texto.append(f"{PREFIXO_PROMETHEUS}_ultima_execucao_timestamp_seconds{_rotulos(programa, ())} {time.time():.0f}")
+
+        # O coletor pode ler o arquivo a qualquer momento: nunca pela metade
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write("\n".join(texto) + "\n")
+        os.replace(temporario, caminho)
+
+
+def _data(instante):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(instante))
+
+
+def _arredondar(valor):
+    return None if valor is None else round(valor, 6)
+
+
+def _por_nome(metricas):
+    """(nome Prometheus, [(rótulos, valor)]) de cada métrica, em ordem de nome."""
+    agrupadas = {}
+    for (nome, rotulos), valor in sorted(metricas.items(), key=lambda item: item[0]):
+        agrupadas.setdefault(f"{PREFIXO_PROMETHEUS}_{nome}", []).append((rotulos, valor))
+    return agrupadas.items()
+
+
+def _escapar(valor):
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _rotulos(programa, rotulos, **extras):
+    pares = [("programa", programa), *rotulos, *((chave, str(valor)) for chave, valor in extras.items())]
+    return "{" + ",".join(f'{chave}="{_escapar(valor)}"' for chave, valor in pares) + "}"
+
+
+def mostra_estatisticas_metricas(metricas):
+    estagios = sorted(
+        ((rotulos, histograma) for (nome, rotulos), histograma in metricas.histogramas.items() if nome == "estagio_segundos"),
+        key=lambda item: (dict(item[0])["estagio"], item[0]),
+    )
+    if not estagios:
+        return
+    print("\n--- Tempo por estágio ---")
+    print(f"  {'estágio':<44}{'vezes':>7}{'total (s)':>11}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    for rotulos, histograma in estagios:
+        rotulos = dict(rotulos)
+        descricao = rotulos.pop("estagio") + "".join(f" {chave}={valor}" for chave, valor in rotulos.items())
+        print(
+            f"  {descricao:<44}{histograma.quantidade:>7}{histograma.soma:>11.2f}"
+            f"{histograma.quantil(0.5) * 1000:>10.1f}{histograma.quantil(0.95) * 1000:>10.1f}"
+        )
+    for (nome, rotulos), quantidade in sorted(metricas.contadores.items()):
+        descricao = nome + "".join(f" {chave}={valor}" for chave, valor in rotulos)
+        print(f"  {descricao}: {quantidade}")
+    print("-" * 82)
+
+
+# Registro da execução atual, compartilhado pelos módulos de busca
+metricas = Metricas()
@@ -0,0 +1,68 @@
+import os
+
+USER_AGENT = (
+    "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36"
+)
+
+# Com "1" o Chrome abre com janela (para acompanhar a busca ou resolver CAPTCHA).
+# É uma variável de ambiente para valer também nos processos do pool de navegadores.
+VARIAVEL_VISIVEL = "VIGIAFARMA_NAVEGADOR_VISIVEL"
+
+# A extração só lê texto e atributos do DOM: imagens, fontes, folhas de estilo e
+# scripts de rastreamento não precisam ser baixados
+URLS_BLOQUEADAS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.css",
+    "*.mp4", "*.webm",
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*googleadservices.com*",
+    "*/gen_204*", "*/client_204*", "*/log?*",
+]
+
+# 2 = bloquear, nas preferências de conteúdo do perfil do Chrome
+PREFERENCIAS_ENXUTAS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+}
+
+
+def navegador_visivel():
+    return os.environ.get(VARIAVEL_VISIVEL) == "1"
+
+
+def criar_driver(visivel=None, enxuto=True):
+    """
+    Abre o Chrome usado nas buscas do Google Shopping. O selenium só é importado aqui.
+
+    Por padrão o navegador roda sem janela (headless) e com perfil enxuto: sem imagens
+    e com as URLs de URLS_BLOQUEADAS recusadas pelo DevTools antes de sair da máquina.
+    `visivel=None` segue a variável de ambiente VIGIAFARMA_NAVEGADOR_VISIVEL.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    if visivel is None:
+        visivel = navegador_visivel()
+
+    service = Service(ChromeDriverManager().install())
+    options = webdriver.ChromeOptions()
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option("useAutomationExtension", False)
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    if not visivel:
+        options.add_argument("--headless=new")  # Executa navegador em segundo plano
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument(USER_AGENT)
+    if enxuto:
+        options.add_experimental_option("prefs", PREFERENCIAS_ENXUTAS)
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--disable-extensions")
+
+    driver = webdriver.Chrome(service=service, options=options)
+    if enxuto:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": URLS_BLOQUEADAS})
+    return driver
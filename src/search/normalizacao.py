@@ -0,0 +1,192 @@
+"""
+Normalização de quantidades/unidades dos títulos e de preços em reais (BRL).
+
+As unidades ficam numa tabela só (UNIDADES) e os padrões são compilados uma vez.
+As funções escalares atendem a análise de cada página; as que recebem pandas.Series
+processam colunas inteiras numa chamada, para as planilhas e os benchmarks.
+"""
+import re
+from functools import lru_cache
+
+# grafia no título -> (unidade normalizada, fator para a unidade normalizada)
+UNIDADES = {
+    "kg": ("g", 1000), "kilo": ("g", 1000), "kilos": ("g", 1000), "quilo": ("g", 1000), "quilos": ("g", 1000),
+    "g": ("g", 1), "gr": ("g", 1), "grama": ("g", 1), "gramas": ("g", 1),
+    "l": ("ml", 1000), "lt": ("ml", 1000), "litro": ("ml", 1000), "litros": ("ml", 1000),
+    "ml": ("ml", 1),
+    "caps": ("caps", 1), "cps": ("caps", 1), "cápsula": ("caps", 1), "cápsulas": ("caps", 1),
+    "capsula": ("caps", 1), "capsulas": ("caps", 1), "comprimido": ("caps", 1), "comprimidos": ("caps", 1),
+    "un": ("u", 1), "und": ("u", 1), "unid": ("u", 1), "unidade": ("u", 1), "unidades": ("u", 1),
+}
+
+# Grafias mais longas primeiro, para "kilos" não parar em "kg"/"g" e "ml" não virar "m"
+_ALTERNATIVAS_UNIDADE = "|".join(sorted(map(re.escape, UNIDADES), key=len, reverse=True))
+
+# "[2 x ]400 g[ x 2]": embalagens antes ou depois, número com vírgula/ponto e unidade
+_NUCLEO_QUANTIDADE = (
+    r"(?:(?P<embalagens>\d{1,3})\s*x\s*)?"
+    rf"(?P<quantidade>\d[\d.,]*)\s?(?P<unidade>{_ALTERNATIVAS_UNIDADE})"
+    r"(?:\s*x\s*(?P<embalagens_depois>\d{1,3}))?"
+)
+# Bordas: não começar no meio de outro número ("00g" em "1.500g") nem terminar no meio
+# de uma palavra ("2 l" em "2 lâmpadas"). Letras fora do ASCII contam como palavra.
+PADRAO_QUANTIDADE = re.compile(rf"(?<![\d.,]){_NUCLEO_QUANTIDADE}(?![a-z0-9_\x80-\U0010ffff])")
+
+# Valor em reais: milhar com ponto e centavos com vírgula ("R$ 1.299,90", "R$ 50", "R$ 7,5")
+PADRAO_PRECO = re.compile(r"(?P<reais>\d{1,3}(?:\.\d{3})+|\d+)(?:,(?P<centavos>\d{1,2}))?")
+
+# Mesmo padrão para o RE2 do pyarrow, que não tem lookbehind/lookahead: as bordas
+# viram caracteres consumidos fora dos grupos
+PADRAO_QUANTIDADE_RE2 = rf"(?:^|[^\d.,]){_NUCLEO_QUANTIDADE}(?:[^a-z0-9_\x{{80}}-\x{{10FFFF}}]|$)"
+
+# Pontos só como separador de milhar no Brasil ("1.000g", "1.000.000"); "1.5" é decimal
+_MILHAR = re.compile(r"\d{1,3}(?:\.\d{3})+")
+_NUMERO_VALIDO = r"^\d+(?:\.\d+)?$"
+
+
+def _numero(texto):
+    """Converte "1,5", "1.5", "1.000" e "1.000,5" para float; None se não for número."""
+    texto = texto.rstrip(".,")
+    if "," in texto or _MILHAR.fullmatch(texto):
+        texto = texto.replace(".", "").replace(",", ".")
+    try:
+        return float(texto)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=65536)
+def analisar_quantidade(texto_produto):
+    """
+    Retorna (quantidade por embalagem, unidade normalizada, embalagens) do primeiro
+    tamanho encontrado no texto, ou (None, None, None). "2x400g" -> (400.0, "g", 2).
+    """
+    if not isinstance(texto_produto, str):
+        return None, None, None
+    match = PADRAO_QUANTIDADE.search(texto_produto.lower())
+    if not match:
+        return None, None, None
+    quantidade = _numero(match["quantidade"])
+    if quantidade is None:
+        return None, None, None
+    unidade, fator = UNIDADES[match["unidade"]]
+    embalagens = int(match["embalagens"] or match["embalagens_depois"] or 1)
+    return quantidade * fator, unidade, embalagens
+
+
+def extrair_unidade_e_quantidade(texto_produto):
+    """Extrai a unidade de medida e a quantidade (por embalagem, como texto) de um texto."""
+    quantidade, unidade, _ = analisar_quantidade(texto_produto)
+    if quantidade is None:
+        return None, None
+    return str(int(quantidade)), unidade
+
+
+def preco_em_centavos(texto_preco):
+    """Primeiro valor em reais do texto, em centavos inteiros; None se não houver."""
+    if not isinstance(texto_preco, str):
+        return None
+    match = PADRAO_PRECO.search(texto_preco)
+    if not match:
+        return None
+    reais = int(match["reais"].replace(".", ""))
+    centavos = int((match["centavos"] or "0").ljust(2, "0"))
+    return reais * 100 + centavos
+
+
+def normalizar_quantidades(titulos):
+    """
+    Versão vetorizada de analisar_quantidade para uma pandas.Series de títulos.
+    Retorna um DataFrame (mesmo índice) com quantidade, unidade, embalagens e
+    quantidade_total (quantidade x embalagens). Com o pyarrow instalado, as
+    expressões rodam nas funções de texto dele, sem laço em Python.
+    """
+    import pandas as pd
+
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        return _normalizar_quantidades_pandas(titulos)
+
+    textos = pc.utf8_lower(pa.array(titulos.astype("string"), type=pa.string(), from_pandas=True))
+    partes = pc.extract_regex(textos, PADRAO_QUANTIDADE_RE2)
+    nulo = pa.scalar(None, pa.string())
+
+    def campo(nome):
+        # Grupos opcionais que não casaram vêm como ""
+        valor = pc.struct_field(partes, nome)
+        return pc.if_else(pc.equal(valor, ""), nulo, valor)
+
+    numero = pc.replace_substring_regex(campo("quantidade"), r"[.,]+$", "")
+    sem_milhar = pc.replace_substring(pc.replace_substring(numero, ".", ""), ",", ".")
+    numero = pc.if_else(
+        pc.or_(pc.match_substring(numero, ","), pc.match_substring_regex(numero, f"^{_MILHAR.pattern}$")),
+        sem_milhar,
+        numero,
+    )
+    numero = pc.cast(pc.if_else(pc.match_substring_regex(numero, _NUMERO_VALIDO), numero, nulo), pa.float64())
+
+    indice = pc.index_in(campo("unidade"), value_set=pa.array(list(UNIDADES)))
+    fator = pc.take(pa.array([fator for _, fator in UNIDADES.values()], pa.float64()), indice)
+    quantidade = pc.multiply(numero, fator)
+    encontrado = pc.is_valid(quantidade)
+    unidade = pc.if_else(encontrado, pc.take(pa.array([unidade for unidade, _ in UNIDADES.values()]), indice), nulo)
+    embalagens = pc.coalesce(campo("embalagens"), campo("embalagens_depois"), pa.scalar("1"))
+    embalagens = pc.if_else(encontrado, pc.cast(embalagens, pa.int64()), pa.scalar(None, pa.int64()))
+
+    resultado = pd.DataFrame(index=titulos.index)
+    resultado["quantidade"] = pd.Series(quantidade.to_pandas(), index=titulos.index).astype("Float64")
+    resultado["unidade"] = pd.Series(unidade.to_pandas(), index=titulos.index).astype("string")
+    resultado["embalagens"] = pd.Series(embalagens.to_pandas(), index=titulos.index).astype("Int64")
+    resultado["quantidade_total"] = resultado["quantidade"] * resultado["embalagens"]
+    return resultado
+
+
+def normalizar_precos(textos):
+    """Versão vetorizada de preco_em_centavos: Series de textos -> Series Int64 de centavos."""
+    import pandas as pd
+
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        return _normalizar_precos_pandas(textos)
+
+    partes = pc.extract_regex(pa.array(textos.astype("string"), type=pa.string(), from_pandas=True), PADRAO_PRECO.pattern)
+    reais = pc.cast(pc.replace_substring(pc.struct_field(partes, "reais"), ".", ""), pa.int64())
+    centavos = pc.cast(pc.utf8_rpad(pc.struct_field(partes, "centavos"), width=2, padding="0"), pa.int64())
+    total = pc.add(pc.multiply(reais, 100), centavos)
+    return pd.Series(total.to_pandas(), index=textos.index, name=textos.name).astype("Int64")
+
+
+def _normalizar_quantidades_pandas(titulos):
+    # Sem pyarrow: o mesmo cálculo com o .str do pandas (um re.search por título)
+    import pandas as pd
+
+    partes = titulos.astype("string").str.lower().str.extract(PADRAO_QUANTIDADE)
+    numero = partes["quantidade"].str.rstrip(".,")
+    sem_milhar = numero.str.contains(",", regex=False, na=False) | numero.str.fullmatch(_MILHAR, na=False)
+    numero = numero.where(~sem_milhar, numero.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    numero = numero.where(numero.str.fullmatch(_NUMERO_VALIDO, na=False))
+
+    tabela = pd.DataFrame.from_dict(UNIDADES, orient="index", columns=["unidade", "fator"])
+    quantidade = (pd.to_numeric(numero) * partes["unidade"].map(tabela["fator"])).astype("Float64")
+    encontrado = quantidade.notna()
+    embalagens = partes["embalagens"].fillna(partes["embalagens_depois"]).fillna("1")
+
+    resultado = pd.DataFrame(index=titulos.index)
+    resultado["quantidade"] = quantidade
+    resultado["unidade"] = partes["unidade"].map(tabela["unidade"]).where(encontrado).astype("string")
+    resultado["embalagens"] = pd.to_numeric(embalagens).astype("Int64").where(encontrado)
+    resultado["quantidade_total"] = resultado["quantidade"] * resultado["embalagens"]
+    return resultado
+
+
+def _normalizar_precos_pandas(textos):
+    import pandas as pd
+
+    partes = textos.astype("string").str.extract(PADRAO_PRECO)
+    reais = pd.to_numeric(partes["reais"].str.replace(".", "", regex=False)).astype("Int64")
+    centavos = pd.to_numeric(partes["centavos"].fillna("0").str.ljust(2, "0")).astype("Int64")
+    return (reais * 100 + centavos).rename(textos.name)
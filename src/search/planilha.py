@@ -0,0 +1,110 @@
+import os
+
+import pandas as pd
+
+COLUNAS_NUMERICAS = ['Preço Referência', 'Maior Preço Encontrado', 'Menor Preço Encontrado', 'Registro MS']
+COLUNAS_MOEDA = ['Preço Referência', 'Maior Preço Encontrado', 'Menor Preço Encontrado']
+
+
+class EscritorPlanilha:
+    """
+    Acumula as linhas da base em memória e grava a aba formatada de uma só vez,
+    no final da execução ou a cada `salvar_a_cada` linhas novas (checkpoint).
+    """
+
+    def __init__(self, nome_arquivo="base_farmaindex.xlsx", nome_aba="base", salvar_a_cada=None):
+        self.nome_arquivo = nome_arquivo
+        self.nome_aba = nome_aba
+        self.salvar_a_cada = salvar_a_cada
+        self.linhas = []
+        self.pendentes = 0
+
+        # O arquivo existente é lido uma única vez; as linhas novas são somadas a ele ao salvar
+        if os.path.exists(nome_arquivo):
+            self.df_existente = pd.read_excel(nome_arquivo)
+        else:
+            self.df_existente = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.salvar()
+
+    @property
+    def linhas_existentes(self):
+        return 0 if self.df_existente is None else len(self.df_existente)
+
+    def descartar_apos(self, quantidade):
+        """Mantém só as `quantidade` primeiras linhas do arquivo existente (usado ao retomar)."""
+        if self.df_existente is not None and len(self.df_existente) > quantidade:
+            self.pendentes += len(self.df_existente) - quantidade
+            self.df_existente = self.df_existente.iloc[:quantidade]
+
+    def adicionar(self, linha: dict):
+        self.linhas.append(linha)
+        self.pendentes += 1
+        if self.salvar_a_cada and self.pendentes >= self.salvar_a_cada:
+            self.salvar()
+
+    def montar_dataframe(self):
+        df_novos = pd.DataFrame(self.linhas)
+        if self.df_existente is not None:
+            df_final = pd.concat([self.df_existente, df_novos], ignore_index=True)
+        else:
+            df_final = df_novos
+
+        for col in COLUNAS_NUMERICAS:
+            if col in df_final.columns:
+                df_final[col] = pd.to_numeric(df_final[col], errors='coerce')
+
+        # Garante que as colunas de moeda sejam arredondadas para 2 casas decimais
+        for col in COLUNAS_MOEDA:
+            if col in df_final.columns:
+                df_final[col] = df_final[col].round(2)
+
+        return df_final
+
+    def salvar(self):
+        """Regrava o arquivo com as linhas existentes mais as acumuladas até agora."""
+        if self.pendentes == 0:
+            return
+
+        df_final = self.montar_dataframe()
+
+        # Grava num arquivo temporário e troca no final, para não corromper a base
+        # caso a execução seja interrompida no meio da escrita
+        raiz, extensao = os.path.splitext(self.nome_arquivo)
+        arquivo_temporario = f"{raiz}.tmp{extensao}"
+
+        with pd.ExcelWriter(arquivo_temporario, engine='xlsxwriter') as writer:
+            df_final.to_excel(writer, sheet_name=self.nome_aba, index=False)
+            formatar_aba(writer.book, writer.sheets[self.nome_aba], list(df_final.columns))
+
+        os.replace(arquivo_temporario, self.nome_arquivo)
+        self.pendentes = 0
+
+
+def formatar_aba(workbook, worksheet, headers):
+    """Aplica os formatos numéricos e as larguras das colunas da aba base."""
+    # Cria os formatos de célula
+    formato_moeda = workbook.add_format({'num_format': '0.00'})
+    formato_ms = workbook.add_format({'num_format': '0'})
+
+    try:
+        col_preco_ref = headers.index('Preço Referência')
+        col_maior_preco = headers.index('Maior Preço Encontrado')
+        col_menor_preco = headers.index('Menor Preço Encontrado')
+        col_ms = headers.index('Registro MS')
+
+        # Aplica a formatação e define a largura das colunas
+        worksheet.set_column(col_preco_ref, col_preco_ref, 18, formato_moeda)
+        worksheet.set_column(col_maior_preco, col_maior_preco, 22, formato_moeda)
+        worksheet.set_column(col_menor_preco, col_menor_preco, 22, formato_moeda)
+        worksheet.set_column(col_ms, col_ms, 18, formato_ms)
+        # Ajusta a largura das outras colunas para melhor visualização
+        worksheet.set_column(headers.index('Nome'), headers.index('Nome'), 25)
+        worksheet.set_column(headers.index('Apresentação'), headers.index('Apresentação'), 40)
+        worksheet.set_column(headers.index('Laboratório'), headers.index('Laboratório'), 25)
+    except ValueError:
+        print("Aviso: Não foi possível formatar uma ou mais colunas.")
@@ -0,0 +1,157 @@
+import json
+import multiprocessing
+import os
+import queue
+import time
+
+from .metricas import metricas
+
+# Latência média (segundos) de cada produto nas execuções anteriores
+ARQUIVO_LATENCIAS = "latencias_produtos.json"
+# Peso da execução atual na média móvel das latências
+PESO_LATENCIA_NOVA = 0.5
+# Intervalo entre as verificações de trabalhadores que morreram sem responder
+INTERVALO_VERIFICACAO = 5.0
+
+
+def carregar_latencias(caminho=ARQUIVO_LATENCIAS):
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def salvar_latencias(latencias, caminho=ARQUIVO_LATENCIAS):
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(latencias, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+
+def ordenar_mais_demorados_primeiro(lista_produtos, latencias):
+    """
+    Retorna os índices dos produtos do mais demorado para o mais rápido (LPT), para que
+    os trabalhadores não terminem com um produto lento sobrando no fim. Produtos sem
+    histórico vão primeiro, como se fossem tão lentos quanto o mais lento conhecido.
+    """
+    pior_caso = max(latencias.values(), default=0.0)
+    return sorted(
+        range(len(lista_produtos)),
+        key=lambda indice: latencias.get(lista_produtos[indice], pior_caso),
+        reverse=True,
+    )
+
+
+def _trabalhador(tarefas, resultados, lista_produtos, caminho_limitador, caminho_catalogo, pasta_paginas):
+    """Processo com um Chrome próprio que atende produtos da fila até receber None."""
+    from .arquivo_paginas import ArquivoPaginas
+    from .catalogo import CatalogoProdutos
+    from .limitador import LimitadorAdaptativo
+    from .navegador import criar_driver
+    from .product4 import buscar_precos
+
+    driver = None
+    # Mesmo arquivo do processo principal: todos os navegadores dividem o ritmo
+    limitador = LimitadorAdaptativo(caminho_limitador)
+    catalogo = None
+    if caminho_catalogo:
+        # O main já cadastrou a lista: aqui só se restringe o catálogo aos produtos dela
+        catalogo = CatalogoProdutos(caminho_catalogo)
+        catalogo.sincronizar_produtos(lista_produtos)
+    arquivo_paginas = ArquivoPaginas(pasta_paginas) if pasta_paginas else None
+    try:
+        driver = criar_driver()
+        while (tarefa := tarefas.get()) is not None:
+            indice, produto = tarefa
+            print(f"\n[{os.getpid()}] Buscando preços para: '{produto}'...")
+            with metricas.cronometrar("limitador"):
+                limitador.aguardar()
+            inicio = time.monotonic()
+            # Sem terminal para resolver CAPTCHA: o produto volta marcado como bloqueado
+            # Os outliers são filtrados pelo main, com os resultados de todos os processos
+            resultado = buscar_precos(
+                driver, produto, interativo=False, catalogo=catalogo, metodo_outliers=None, arquivo_paginas=arquivo_paginas
+            )
+            resultados.put((indice, resultado, time.monotonic() - inicio))
+            limitador.registrar(resultado[0])
+    except Exception as e:
+        print(f"[{os.getpid()}] Trabalhador encerrado por erro: {e}")
+    finally:
+        # As métricas deste processo vão para o principal, que exporta as de todos
+        resultados.put((None, metricas.instantaneo(), None))
+        limitador.fechar()
+        if catalogo:
+            # Grava os títulos decididos por este processo
+            catalogo.fechar()
+        if arquivo_paginas:
+            arquivo_paginas.fechar()
+        if driver:
+            driver.quit()
+
+
+def buscar_em_paralelo(lista_produtos, trabalhadores, caminho_limitador, caminho_catalogo=None, pasta_paginas=None):
+    """
+    Distribui os produtos entre `trabalhadores` processos, cada um com seu navegador,
+    o ritmo dado pelo limitador em `caminho_limitador` e, se houver, o catálogo de
+    produtos em `caminho_catalogo` e o arquivo de páginas capturadas em `pasta_paginas`, e entrega (produto, preco_min, preco_max, itens_analisados) na ordem de entrada,
+    assim que cada resultado e todos os anteriores a ele estiverem prontos.
+    """
+    latencias = carregar_latencias()
+    contexto = multiprocessing.get_context("spawn")
+    tarefas = contexto.Queue()
+    resultados = contexto.Queue()
+
+    for indice in ordenar_mais_demorados_primeiro(lista_produtos, latencias):
+        tarefas.put((indice, lista_produtos[indice]))
+    for _ in range(trabalhadores):
+        tarefas.put(None)
+
+    processos = [contexto.Process(target=_trabalhador, args=(tarefas, resultados, lista_produtos, caminho_limitador, caminho_catalogo, pasta_paginas)) for _ in range(trabalhadores)]
+    for processo in processos:
+        processo.start()
+
+    prontos = {}
+    proximo = 0
+    sem_metricas = trabalhadores
+    try:
+        while proximo < len(lista_produtos):
+            try:
+                indice, resultado, duracao = resultados.get(timeout=INTERVALO_VERIFICACAO)
+            except queue.Empty:
+                if any(processo.is_alive() for processo in processos):
+                    continue
+                # Todos os navegadores morreram: o que faltou é dado como erro
+                for indice in range(proximo, len(lista_produtos)):
+                    prontos.setdefault(indice, ("Erro inesperado", "Erro inesperado", []))
+            else:
+                if indice is None:
+                    # Trabalhador que terminou (ou caiu) mandando as suas métricas
+                    metricas.incorporar(resultado)
+                    sem_metricas -= 1
+                    continue
+                prontos[indice] = resultado
+                produto = lista_produtos[indice]
+                anterior = latencias.get(produto, duracao)
+                latencias[produto] = PESO_LATENCIA_NOVA * duracao + (1 - PESO_LATENCIA_NOVA) * anterior
+
+            while proximo in prontos:
+                yield (lista_produtos[proximo], *prontos.pop(proximo))
+                proximo += 1
+
+        # Depois do último produto, cada trabalhador ainda manda as suas métricas ao sair
+        while sem_metricas:
+            try:
+                indice, resultado, _ = resultados.get(timeout=INTERVALO_VERIFICACAO)
+            except queue.Empty:
+                if not any(processo.is_alive() for processo in processos):
+                    break
+                continue
+            if indice is None:
+                metricas.incorporar(resultado)
+                sem_metricas -= 1
+    finally:
+        for processo in processos:
+            processo.join(timeout=30)
+            if processo.is_alive():
+                processo.terminate()
+        salvar_latencias(latencias)
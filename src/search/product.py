@@ -1,25 +1,21 @@
-import pandas as pd
-import re
 import time
-from bs4 import BeautifulSoup
-import jellyfish
-
-# SELENIUM
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import TimeoutException
-
-# Grafico
+
 import numpy as np
+from bs4 import BeautifulSoup
+
+from .entrada import ARQUIVO_PRODUTOS, ler_nomes
+from .limitador import LimitadorAdaptativo, mostra_estatisticas_limitador
+from .navegador import criar_driver, navegador_visivel
+from .normalizacao import extrair_unidade_e_quantidade, preco_em_centavos
+
+SELETOR_PRECO_ARIA = 'span[aria-label^="Current price:"]'
 
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
 
 def geraGrafico(precos_array):
+    # matplotlib só é carregado quando o gráfico é pedido
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as mticker
+
     # Gera índices para o eixo X, apenas para posicionar os pontos
     x_indices = np.arange(len(precos_array))
 
@@ -72,63 +68,63 @@ def geraGrafico(precos_array):
 
     # Exibe o gráfico em uma janela
     plt.show()
-def extrair_unidade_e_quantidade(texto_produto):
-    """Extrai a unidade de medida e a quantidade de um texto."""
-    texto_produto = texto_produto.lower()
-    # Regex para encontrar números (inteiros ou decimais) seguidos por unidades (com ou sem espaço)
-    # Exemplos: 500g, 1kg, 1 kg, 800 g, 2.5 l
-    match = re.search(r"(\d[\d.,]*)\s?(kg|g|ml|l|caps)\b", texto_produto)
-    if match:
-        quantidade = float(match.group(1).replace(",", "."))
-        unidade = match.group(2)
-        # Normaliza para a menor unidade (g, ml) para facilitar a comparação
-        if unidade == "kg":
-            quantidade *= 1000
-            unidade = "g"
-        elif unidade == "l":
-            quantidade *= 1000
-            unidade = "ml"
-        return str(int(quantidade)), unidade
-    return None, None
-
-def buscar_precos(driver, produto):
+
+
+def extrair_registros(html_content):
+    """Extrai os registros {title, price_label} da página; este layout não tem o título junto do preço."""
+    soup = BeautifulSoup(html_content, 'lxml')
+    return [{"title": None, "price_label": el.get_text(strip=True)} for el in soup.select(SELETOR_PRECO_ARIA)]
+
+
+def selecionar_precos(registros, produto):
+    """Preços dos registros (sem filtro de relevância nesta variante)."""
+    qtd_original, unidade_original = extrair_unidade_e_quantidade(produto)
+    print(
+        f" -> Padrão a ser buscado: Quantidade={qtd_original}, Unidade={unidade_original}"
+    )
+    precos = []
+    for registro in registros:
+        preco_centavos = preco_em_centavos(registro["price_label"])
+        if preco_centavos:
+            precos.append(preco_centavos / 100)
+    return precos
+
+
+def buscar_precos(driver, produto, interativo=True, limitador=None):
     """
     Busca o produto no Google Shopping, extrai os preços, filtra os outliers
     usando desvio padrão e retorna o mínimo e máximo dos preços restantes.
     """
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
     query = produto.replace(' ', '+')
     url = f"https://www.google.com/search?tbm=shop&q={query}"
-    SELETOR_PRECO_ARIA = 'span[aria-label^="Current price:"]'
 
     try:
         driver.get(url)
         if 'sorry/index' in driver.current_url:
             print("\n🚨 CAPTCHA DETECTADO! 🚨")
+            if not interativo:
+                print(f"  -> '{produto}' ficou sem resultado: não há terminal para resolver o CAPTCHA.")
+                return 'CAPTCHA', 'CAPTCHA'
             input("Resolva o CAPTCHA no navegador e, DEPOIS, pressione Enter aqui para continuar...")
             print("Continuando a busca...")
+            if limitador:
+                limitador.registrar_bloqueio()
             time.sleep(2)
 
         wait = WebDriverWait(driver, 20)
         wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, SELETOR_PRECO_ARIA)))
 
-        html_content = driver.page_source
-        soup = BeautifulSoup(html_content, 'lxml')
-        elementos_preco = soup.select(SELETOR_PRECO_ARIA)
+        registros = extrair_registros(driver.page_source)
 
-        if not elementos_preco:
+        if not registros:
             return 'Não encontrado', 'Não encontrado'
 
-        precos = []
-
-        qtd_original, unidade_original = extrair_unidade_e_quantidade(produto)
-        print(
-            f" -> Padrão a ser buscado: Quantidade={qtd_original}, Unidade={unidade_original}"
-        )
-        for el in elementos_preco:
-            preco_texto = el.get_text(strip=True)
-            preco_limpo = re.sub(r'[^\d,]', '', preco_texto).replace(',', '')
-            if preco_limpo:
-                precos.append(float(preco_limpo)/100)
+        precos = selecionar_precos(registros, produto)
 
         if not precos:
             return 'Não encontrado', 'Não encontrado'
@@ -176,39 +172,46 @@ def buscar_precos(driver, produto):
         return 'Erro inesperado', 'Erro inesperado'
 
 
-# --- Início do Script Principal ---
-service = Service(ChromeDriverManager().install())
-options = webdriver.ChromeOptions()
-options.add_experimental_option("excludeSwitches", ["enable-automation"])
-options.add_experimental_option('useAutomationExtension', False)
-options.add_argument("--disable-blink-features=AutomationControlled")
-# options.add_argument("--headless") # Executa navegador em segundo plano
-options.add_argument("--window-size=1920,1080")
-options.add_argument(
-    "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36")
-
-driver = webdriver.Chrome(service=service, options=options)
-
-try:
-    df_entrada = pd.read_excel('../resources/produtos.xlsx')
-    lista_produtos = df_entrada['Produto'].tolist()
-    dados_finais = []
-
-    for produto in lista_produtos:
-        print(f"Buscando preços para: '{produto}'...")
-        preco_min, preco_max = buscar_precos(driver, produto)
-        dados_finais.append({
-            'Produto': produto,
-            'Preco_Minimo': preco_min,
-            'Preco_Maximo': preco_max
-        })
-        print(f"  -> Mínimo: R$ {preco_min:.2f} | Máximo: R$ {preco_max:.2f}")
-        time.sleep(2)
-
-    df_saida = pd.DataFrame(dados_finais)
-    df_saida.to_excel('precos_encontrados.xlsx', index=False)
-    print("\n🎉 Processo concluído! Resultados salvos em 'precos_encontrados.xlsx'")
-
-finally:
-    if driver:
-        driver.quit()
\ No newline at end of file
+def main(arquivo=ARQUIVO_PRODUTOS, coluna="Produto"):
+    import pandas as pd
+
+    driver = criar_driver()
+    # Ritmo das buscas: substitui a pausa fixa de 2s entre produtos
+    limitador = LimitadorAdaptativo(reiniciar=True)
+
+    try:
+        lista_produtos = ler_nomes(arquivo, coluna)
+        dados_finais = []
+
+        for produto in lista_produtos:
+            print(f"Buscando preços para: '{produto}'...")
+            limitador.aguardar()
+            preco_min, preco_max = buscar_precos(driver, produto, interativo=navegador_visivel(), limitador=limitador)
+            limitador.registrar(preco_min)
+            dados_finais.append({
+                'Produto': produto,
+                'Preco_Minimo': preco_min,
+                'Preco_Maximo': preco_max
+            })
+            if isinstance(preco_min, (int, float)) and isinstance(preco_max, (int, float)):
+                print(f"  -> Mínimo: R$ {preco_min:.2f} | Máximo: R$ {preco_max:.2f}")
+            else:
+                print(f"  -> Preços não encontrados para '{produto}' ({preco_min})")
+
+        df_saida = pd.DataFrame(dados_finais)
+        df_saida.to_excel('precos_encontrados.xlsx', index=False)
+        print("\n🎉 Processo concluído! Resultados salvos em 'precos_encontrados.xlsx'")
+
+    finally:
+        mostra_estatisticas_limitador(limitador)
+        limitador.fechar()
+        if driver:
+            driver.quit()
+
+
+if __name__ == "__main__":
+    import sys
+
+    from .__main__ import main as cli
+
+    cli(["produtos", "--variante", "1", *sys.argv[1:]])
@@ -1,25 +1,22 @@
-import pandas as pd
-import re
 import time
-from bs4 import BeautifulSoup
+
 import jellyfish
+import numpy as np
+from bs4 import BeautifulSoup
 
-# SELENIUM
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import TimeoutException
+from .entrada import ARQUIVO_PRODUTOS, ler_nomes
+from .limitador import LimitadorAdaptativo, mostra_estatisticas_limitador
+from .navegador import criar_driver, navegador_visivel
+from .normalizacao import extrair_unidade_e_quantidade, preco_em_centavos
 
-# Grafico
-import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
+SELETOR_PRECO_ARIA = 'div[aria-label^="Current price"]'
 
 
 def geraGrafico(precos_array):
+    # matplotlib só é carregado quando o gráfico é pedido
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as mticker
+
     # Gera índices para o eixo X, apenas para posicionar os pontos
     x_indices = np.arange(len(precos_array))
     # 2. Realizar os mesmos cálculos que o seu script faz
@@ -102,120 +99,121 @@ def geraGrafico(precos_array):
     plt.show()
 
 
-def extrair_unidade_e_quantidade(texto_produto):
-    """Extrai a unidade de medida e a quantidade de um texto."""
-    if not isinstance(texto_produto, str):
-        return None, None
-    texto_produto = texto_produto.lower()
-    match = re.search(r"(\d[\d.,]*)\s?(kg|g|ml|l|caps)\b", texto_produto)
-    if match:
-        quantidade = float(match.group(1).replace(",", "."))
-        unidade = match.group(2)
-        if unidade == "kg":
-            quantidade *= 1000
-            unidade = "g"
-        elif unidade == "l":
-            quantidade *= 1000
-            unidade = "ml"
-        return str(int(quantidade)), unidade
-    return None, None
-
-
-def buscar_precos(driver, produto):
+def extrair_registros(html_content):
+    """Extrai os registros {title, price_label} subindo três níveis a partir de cada preço."""
+    soup = BeautifulSoup(html_content, "lxml")
+    registros = []
+
+    # 1. Encontra todos os elementos de preço pelo aria-label
+    for el_preco in soup.select(SELETOR_PRECO_ARIA):
+        # 2. A partir do preço, sobe na árvore para encontrar o container principal do produto
+        # O 'find_parent' com um nome de classe genérico ('MUWJ8c' no exemplo) ou
+        # simplesmente subindo alguns níveis pode funcionar. Vamos tentar subir 3 níveis.
+        container_produto = el_preco.find_parent().find_parent().find_parent()
+
+        if not container_produto:
+            continue
+
+        # 3. Dentro do container, encontra a div com o título do produto
+        el_titulo = container_produto.find("div", {"title": True})
+        if not el_titulo:
+            continue
+
+        # 4. O preço vem do aria-label do elemento original
+        registros.append({"title": el_titulo["title"], "price_label": el_preco["aria-label"]})
+
+    return registros
+
+
+def selecionar_precos(registros, produto):
+    """Preços dos registros com similaridade >= 0.1 e a mesma quantidade/unidade do produto."""
+    produtos_encontrados = []
+
+    qtd_original, unidade_original = extrair_unidade_e_quantidade(produto)
+    print(
+        f"  -> Padrão a ser buscado: Quantidade={qtd_original}, Unidade={unidade_original}"
+    )
+
+    for registro in registros:
+        nome_produto_encontrado = registro["title"]
+        preco_centavos = preco_em_centavos(registro["price_label"])
+
+        if preco_centavos is None:
+            continue
+
+        preco_float = preco_centavos / 100
+
+        if nome_produto_encontrado and preco_float:
+            similaridade = jellyfish.jaro_winkler_similarity(
+                produto.lower(), nome_produto_encontrado.lower()
+            )
+            limiar = 0.1
+
+            if similaridade >= limiar:
+                qtd_encontrada, unidade_encontrada = extrair_unidade_e_quantidade(nome_produto_encontrado)
+                if (qtd_original is None or (
+                        qtd_original == qtd_encontrada and unidade_original == unidade_encontrada)):
+                    produtos_encontrados.append(
+                        {"nome": nome_produto_encontrado, "preco": preco_float}
+                    )
+                    print(
+                        f"  -> Match: '{nome_produto_encontrado}' (Preço: R${preco_float:.2f}, Similaridade: {similaridade:.2f})"
+                    )
+                else:
+                    print(
+                        f"  -> Ignorado (Qtd/Unid): '{nome_produto_encontrado}' (Encontrado: {qtd_encontrada}{unidade_encontrada})"
+                    )
+            else:
+                print(
+                    f"  -> Ignorado (Nome): '{nome_produto_encontrado}' (Similaridade: {similaridade:.2f})"
+                )
+
+    return [p["preco"] for p in produtos_encontrados]
+
+
+def buscar_precos(driver, produto, interativo=True, limitador=None):
     """
     Busca o produto no Google Shopping, extrai os preços de forma dinâmica e robusta,
     filtra por similaridade e outliers, e retorna o mínimo e máximo.
     """
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
     query = produto.replace(" ", "+")
     url = f"https://www.google.com/search?tbm=shop&q={query}"
-    SELETOR_PRECO_ARIA = 'div[aria-label^="Current price"]'
 
     try:
         driver.get(url)
         if "sorry/index" in driver.current_url:
             print("\n🚨 CAPTCHA DETECTADO! 🚨")
+            if not interativo:
+                print(f"  -> '{produto}' ficou sem resultado: não há terminal para resolver o CAPTCHA.")
+                return "CAPTCHA", "CAPTCHA"
             input(
                 "Resolva o CAPTCHA no navegador e, DEPOIS, pressione Enter aqui para continuar..."
             )
             print("Continuando a busca...")
+            if limitador:
+                limitador.registrar_bloqueio()
             time.sleep(2)
 
         WebDriverWait(driver, 20).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, SELETOR_PRECO_ARIA))
         )
 
-        html_content = driver.page_source
-        soup = BeautifulSoup(html_content, "lxml")
-
-        produtos_encontrados = []
-
-        # 1. Encontra todos os elementos de preço pelo aria-label
-        elementos_preco = soup.select(SELETOR_PRECO_ARIA)
+        registros = extrair_registros(driver.page_source)
 
-        if not elementos_preco:
+        if not registros:
             print("  -> Nenhum elemento de preço encontrado com o seletor aria-label.")
             return "Não encontrado", "Não encontrado"
 
-        qtd_original, unidade_original = extrair_unidade_e_quantidade(produto)
-        print(
-            f"  -> Padrão a ser buscado: Quantidade={qtd_original}, Unidade={unidade_original}"
-        )
-
-        for el_preco in elementos_preco:
-            # 2. A partir do preço, sobe na árvore para encontrar o container principal do produto
-            # O 'find_parent' com um nome de classe genérico ('MUWJ8c' no exemplo) ou
-            # simplesmente subindo alguns níveis pode funcionar. Vamos tentar subir 3 níveis.
-            container_produto = el_preco.find_parent().find_parent().find_parent()
-
-            if not container_produto:
-                continue
-
-            # 3. Dentro do container, encontra a div com o título do produto
-            el_titulo = container_produto.find("div", {"title": True})
-            if not el_titulo:
-                continue
-
-            nome_produto_encontrado = el_titulo["title"]
-
-            # 4. Extrai o preço do aria-label do elemento original
-            preco_texto = el_preco["aria-label"]
-            preco_limpo = re.search(r"[\d.,]+", preco_texto)
-
-            if not preco_limpo:
-                continue
-
-            preco_float = float(preco_limpo.group().replace(".", "").replace(",", "."))
-
-            if nome_produto_encontrado and preco_float:
-                similaridade = jellyfish.jaro_winkler_similarity(
-                    produto.lower(), nome_produto_encontrado.lower()
-                )
-                limiar = 0.1
-
-                if similaridade >= limiar:
-                    qtd_encontrada, unidade_encontrada = extrair_unidade_e_quantidade(nome_produto_encontrado)
-                    if (qtd_original is None or (
-                            qtd_original == qtd_encontrada and unidade_original == unidade_encontrada)):
-                        produtos_encontrados.append(
-                            {"nome": nome_produto_encontrado, "preco": preco_float}
-                        )
-                        print(
-                            f"  -> Match: '{nome_produto_encontrado}' (Preço: R${preco_float:.2f}, Similaridade: {similaridade:.2f})"
-                        )
-                    else:
-                        print(
-                            f"  -> Ignorado (Qtd/Unid): '{nome_produto_encontrado}' (Encontrado: {qtd_encontrada}{unidade_encontrada})"
-                        )
-                else:
-                    print(
-                        f"  -> Ignorado (Nome): '{nome_produto_encontrado}' (Similaridade: {similaridade:.2f})"
-                    )
+        precos = selecionar_precos(registros, produto)
 
-        if not produtos_encontrados:
+        if not precos:
             return "Não encontrado", "Não encontrado"
 
-        precos = [p["preco"] for p in produtos_encontrados]
-
         if len(precos) < 3:
             return min(precos), max(precos)
 
@@ -243,39 +241,42 @@ def buscar_precos(driver, produto):
         return "Erro inesperado", "Erro inesperado"
 
 
-# --- Início do Script Principal ---
-service = Service(ChromeDriverManager().install())
-options = webdriver.ChromeOptions()
-options.add_experimental_option("excludeSwitches", ["enable-automation"])
-options.add_experimental_option("useAutomationExtension", False)
-options.add_argument("--disable-blink-features=AutomationControlled")
-# options.add_argument("--headless")
-options.add_argument("--window-size=1920,1080")
-options.add_argument(
-    "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36"
-)
-
-driver = webdriver.Chrome(service=service, options=options)
-
-try:
-    df_entrada = pd.read_excel("../resources/produtos.xlsx")
-    lista_produtos = df_entrada["Produto"].tolist()
-    dados_finais = []
-
-    for produto in lista_produtos:
-        print(f"\nBuscando preços para: '{produto}'...")
-        preco_min, preco_max = buscar_precos(driver, produto)
-        dados_finais.append({"Produto": produto, "Preco_Minimo": preco_min, "Preco_Maximo": preco_max})
-        if isinstance(preco_min, float) and isinstance(preco_max, float):
-            print(f"  -> Resultado Final: Mínimo: R$ {preco_min:.2f} | Máximo: R$ {preco_max:.2f}")
-        else:
-            print(f"  -> Resultado Final: Preços não encontrados para '{produto}'")
-        time.sleep(2)
-
-    df_saida = pd.DataFrame(dados_finais)
-    df_saida.to_excel("precos_encontrados.xlsx", index=False)
-    print("\n🎉 Processo concluído! Resultados salvos em 'precos_encontrados.xlsx'")
-
-finally:
-    if driver:
-        driver.quit()
\ No newline at end of file
+def main(arquivo=ARQUIVO_PRODUTOS, coluna="Produto"):
+    import pandas as pd
+
+    driver = criar_driver()
+    # Ritmo das buscas: substitui a pausa fixa de 2s entre produtos
+    limitador = LimitadorAdaptativo(reiniciar=True)
+
+    try:
+        lista_produtos = ler_nomes(arquivo, coluna)
+        dados_finais = []
+
+        for produto in lista_produtos:
+            print(f"\nBuscando preços para: '{produto}'...")
+            limitador.aguardar()
+            preco_min, preco_max = buscar_precos(driver, produto, interativo=navegador_visivel(), limitador=limitador)
+            limitador.registrar(preco_min)
+            dados_finais.append({"Produto": produto, "Preco_Minimo": preco_min, "Preco_Maximo": preco_max})
+            if isinstance(preco_min, float) and isinstance(preco_max, float):
+                print(f"  -> Resultado Final: Mínimo: R$ {preco_min:.2f} | Máximo: R$ {preco_max:.2f}")
+            else:
+                print(f"  -> Resultado Final: Preços não encontrados para '{produto}'")
+
+        df_saida = pd.DataFrame(dados_finais)
+        df_saida.to_excel("precos_encontrados.xlsx", index=False)
+        print("\n🎉 Processo concluído! Resultados salvos em 'precos_encontrados.xlsx'")
+
+    finally:
+        mostra_estatisticas_limitador(limitador)
+        limitador.fechar()
+        if driver:
+            driver.quit()
+
+
+if __name__ == "__main__":
+    import sys
+
+    from .__main__ import main as cli
+
+    cli(["produtos", "--variante", "3", *sys.argv[1:]])
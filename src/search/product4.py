@@ -1,27 +1,45 @@
+import time
 import urllib.parse
 
-import pandas as pd
-import re
-import time
-from bs4 import BeautifulSoup
-import jellyfish
-
-# SELENIUM
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import TimeoutException
-
-# Grafico
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
+from bs4 import BeautifulSoup
+
+from .arquivo_paginas import PASTA_PAGINAS, ArquivoPaginas
+from .catalogo import ARQUIVO_CATALOGO, CatalogoProdutos, mostra_estatisticas_catalogo
+from .entrada import ARQUIVO_PRODUTOS, ler_nomes
+from .estatistica import (
+    MINIMO_AMOSTRAS,
+    STATUS_INCLUIDO,
+    STATUS_OUTLIER,
+    filtrar_outliers,
+    limites_outlier,
+    motivo_outlier,
+    resumir,
+)
+from .extracao_lxml import extrair_registros_lxml
+from .limitador import LimitadorAdaptativo, mostra_estatisticas_limitador
+from .metricas import metricas, mostra_estatisticas_metricas
+from .navegador import criar_driver, navegador_visivel
+from .normalizacao import extrair_unidade_e_quantidade, preco_em_centavos
+from .saida_detalhes import ESQUEMA_DETALHES, LINHAS_POR_LOTE, EscritorDetalhes, exportar_excel
+from .similaridade import Consulta, pontuar
+
+SELETOR_PRECO_ARIA = 'div[aria-label^="Current price"]'
+# Origem das buscas e dos links relativos dos resultados (trocada pelos testes de carga)
+URL_GOOGLE = "https://www.google.com"
+# Segundos de espera pela grade de resultados antes de dar "Timeout"
+ESPERA_RESULTADOS = 20
+# Nota mínima de similaridade (métrica padrão: Jaro-Winkler) para o item entrar no cálculo
+LIMIAR_SIMILARIDADE = 0.1
+# Colunas do estágio estatístico levadas para precos_encontrados.xlsx
+COLUNAS_RESUMO = ["Preco_Minimo", "Preco_Maximo", "Preco_Mediano", "Preco_P10", "Preco_P90"]
 
 
 def geraGrafico(precos_array):
+    # matplotlib só é carregado quando o gráfico é pedido
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as mticker
+
     # Gera índices para o eixo X, apenas para posicionar os pontos
     x_indices = np.arange(len(precos_array))
     # 2. Realizar os mesmos cálculos que o seu script faz
@@ -104,289 +122,520 @@ def geraGrafico(precos_array):
     plt.show()
 
 
-def extrair_unidade_e_quantidade(texto_produto):
-    """Extrai a unidade de medida e a quantidade de um texto."""
-    if not isinstance(texto_produto, str):
-        return None, None
-    texto_produto = texto_produto.lower()
-    match = re.search(r"(\d[\d.,]*)\s?(kg|kilos|kilo|g|gr|grama|gramas|ml|l|litros|litro|caps|cápsulas|cápsula|capsula|capsulas|comprimidos|comprimido)\b", texto_produto)
-    if match:
-        quantidade = float(match.group(1).replace(",", "."))
-        unidade = match.group(2)
-        match unidade:
-            case "kg":
-                quantidade *= 1000
-                unidade = "g"
-            case "kilo":
-                quantidade *= 1000
-                unidade = "g"
-            case "gramas":
-                unidade = "g"
-            case "grama":
-                unidade = "g"
-            case "gr":
-                unidade = "g"
-            case "g":
-                unidade = "g"
-            case "l":
-                quantidade *= 1000
-                unidade = "ml"
-            case "ml":
-                unidade = "ml"
-            case "litro":
-                quantidade *= 1000
-                unidade = "ml"
-            case "caps":
-                unidade = "caps"
-            case "cps":
-                unidade = "caps"
-            case "cápsulas":
-                unidade = "caps"
-            case "cápsula":
-                unidade = "caps"
-            case "capsulas":
-                unidade = "caps"
-            case "capsula":
-                unidade = "caps"
-            case "comprimidos":
-                unidade = "caps"
-            case "comprimido":
-                unidade = "caps"
-            case _:
-                unidade = "u"
-        return str(int(quantidade)), unidade
-    return None, None
-
-
-def buscar_precos(driver, produto):
+# Roda na página e devolve só o que a análise usa, em vez de serializar o DOM inteiro.
+# Segue a mesma navegação do BeautifulSoup em extrair_registros_soup: pai do preço,
+# primeiro div[title] dentro dele e o <a> mais próximo acima do pai.
+EXTRACAO_JS = """
+const registros = [];
+for (const elPreco of document.querySelectorAll(arguments[0])) {
+    const container = elPreco.parentElement;
+    if (!container) continue;
+    const elTitulo = container.querySelector('div[title]');
+    if (!elTitulo) continue;
+    const elLink = container.parentElement ? container.parentElement.closest('a') : null;
+    registros.push({
+        title: elTitulo.getAttribute('title'),
+        price_label: elPreco.getAttribute('aria-label'),
+        href: elLink ? elLink.getAttribute('href') : null,
+    });
+}
+return registros;
+"""
+
+
+def buscar_precos(
+    driver, produto, interativo=True, limitador=None, catalogo=None, metodo_outliers="sigma", arquivo_paginas=None
+):
     """
     Busca o produto no Google Shopping, extrai os preços de forma dinâmica,
     filtra os resultados e retorna os preços min/max, além de uma lista detalhada
-    de todos os itens encontrados para análise.
+    de todos os itens encontrados para análise. Com `interativo=False` (processos
+    sem terminal), um CAPTCHA não é esperado: o produto volta marcado como "CAPTCHA".
+    Com `metodo_outliers=None` os outliers ficam para o estágio estatístico do main.
+    Com um `arquivo_paginas` (ArquivoPaginas), a página carregada é guardada para
+    ser reprocessada depois sem o navegador (reprocessar).
     """
-    query = produto.replace(" ", "+")
-    url = f"https://www.google.com/search?tbm=shop&q={query}"
-    SELETOR_PRECO_ARIA = 'div[aria-label^="Current price"]'
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
 
-    todos_os_itens_analisados = []
+    query = produto.replace(" ", "+")
+    url = f"{URL_GOOGLE}/search?tbm=shop&q={query}"
 
     try:
-        driver.get(url)
+        with metricas.cronometrar("driver_get"):
+            driver.get(url)
         if "sorry/index" in driver.current_url:
             print("\n🚨 CAPTCHA DETECTADO! 🚨")
+            if not interativo:
+                print(f"  -> '{produto}' ficou sem resultado: não há terminal para resolver o CAPTCHA.")
+                return "CAPTCHA", "CAPTCHA", []
             input(
                 "Resolva o CAPTCHA no navegador e, DEPOIS, pressione Enter aqui para continuar..."
             )
             print("Continuando a busca...")
+            if limitador:
+                limitador.registrar_bloqueio()
             time.sleep(2)
 
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, SELETOR_PRECO_ARIA))
+        with metricas.cronometrar("espera_resultados"):
+            WebDriverWait(driver, ESPERA_RESULTADOS).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, SELETOR_PRECO_ARIA))
+            )
+
+        if arquivo_paginas:
+            with metricas.cronometrar("page_source"):
+                html_content = driver.page_source
+            with metricas.cronometrar("captura_pagina"):
+                arquivo_paginas.guardar(produto, html_content, url)
+
+        return analisar_registros(
+            extrair_registros_navegador(driver), produto, catalogo=catalogo, metodo_outliers=metodo_outliers
         )
+    except TimeoutException:
+        print(f"Tempo esgotado para '{produto}'. O seletor '{SELETOR_PRECO_ARIA}' não foi encontrado.")
+        return "Timeout", "Timeout", []
+    except Exception as e:
+        print(f"Ocorreu um erro inesperado ao buscar '{produto}': {e}")
+        return "Erro inesperado", "Erro inesperado", []
+
+
+def extrair_registros_navegador(driver):
+    """
+    Extrai os registros {title, price_label, href} com um único execute_script.
+    Se o script falhar, cai para page_source + lxml.
+    """
+    from selenium.common.exceptions import JavascriptException
 
+    try:
+        with metricas.cronometrar("extracao", motor="js"):
+            registros = driver.execute_script(EXTRACAO_JS, SELETOR_PRECO_ARIA)
+    except JavascriptException as e:
+        print(f"  -> Extração no navegador falhou ({e.msg}); usando o HTML da página.")
+        registros = None
+    if isinstance(registros, list):
+        return registros
+    with metricas.cronometrar("page_source"):
         html_content = driver.page_source
-        soup = BeautifulSoup(html_content, "lxml")
+    with metricas.cronometrar("extracao", motor="lxml"):
+        return extrair_registros_lxml(html_content)
 
-        elementos_preco = soup.select(SELETOR_PRECO_ARIA)
 
-        if not elementos_preco:
-            print("  -> Nenhum elemento de preço encontrado com o seletor aria-label.")
-            return "Não encontrado", "Não encontrado", todos_os_itens_analisados
+def extrair_registros_soup(html_content):
+    """Extrai os registros {title, price_label, href} do HTML com o BeautifulSoup."""
+    registros = []
+    soup = BeautifulSoup(html_content, "lxml")
 
-        qtd_original, unidade_original = extrair_unidade_e_quantidade(produto)
-        print(
-            f"  -> Padrão a ser buscado: Quantidade={qtd_original}, Unidade={unidade_original}"
-        )
+    for el_preco in soup.select(SELETOR_PRECO_ARIA):
+        container_produto = el_preco.find_parent()
+        if not container_produto:
+            continue
 
-        for el_preco in elementos_preco:
-            container_produto = el_preco.find_parent()
-            if not container_produto:
-                continue
+        el_titulo = container_produto.find("div", {"title": True})
+        if not el_titulo:
+            continue
 
-            el_titulo = container_produto.find("div", {"title": True})
-            if not el_titulo:
-                continue
+        el_link = container_produto.find_parent("a")
+        registros.append({
+            "title": el_titulo["title"],
+            "price_label": el_preco["aria-label"],
+            "href": el_link.get("href") if el_link else None,
+        })
 
-            nome_produto_encontrado = el_titulo["title"]
-            preco_texto = el_preco["aria-label"]
-            preco_limpo = re.search(r"[\d.,]+", preco_texto)
-
-            # --- MODIFICAÇÃO: LÓGICA DE EXTRAÇÃO DE LINK MELHORADA ---
-            link_produto = ""
-            el_link = container_produto.find_parent("a")
-
-            if el_link and "href" in el_link.attrs:
-                href_bruto = el_link["href"]
-
-                # 1. Checa se é um link de redirecionamento do Google
-                if href_bruto.startswith("/url?q="):
-                    try:
-                        # Parseia a URL bruta
-                        parsed_url = urllib.parse.urlparse(href_bruto)
-                        # Extrai os parâmetros da query (ex: 'q', 'sa', 'ved')
-                        query_params = urllib.parse.parse_qs(parsed_url.query)
-
-                        # Se o parâmetro 'q' existir, esse é o nosso link!
-                        if 'q' in query_params:
-                            # query_params['q'] é uma lista, pegamos o primeiro item
-                            link_produto = query_params['q'][0]
-                        else:
-                            # Se falhar, salva o link de redirecionamento mesmo
-                            link_produto = "https://www.google.com" + href_bruto
-                    except Exception as e:
-                        print(f"  -> Erro ao parsear link: {e}")
-                        link_produto = "https://www.google.com" + href_bruto
-
-                # 2. Se for um link interno do Google (ex: /shopping/product/...)
-                elif href_bruto.startswith("/"):
-                    link_produto = "https://www.google.com" + href_bruto
-
-                # 3. Se for um link absoluto (improvável, mas garante)
-                elif href_bruto.startswith("http"):
-                    link_produto = href_bruto
-            # --- FIM DA MODIFICAÇÃO ---
-
-            if not preco_limpo:
-                continue
+    return registros
 
-            preco_float = float(preco_limpo.group().replace(".", "").replace(",", "")) / 100
-
-            if nome_produto_encontrado and preco_float:
-                similaridade = jellyfish.jaro_winkler_similarity(
-                    produto.lower(), nome_produto_encontrado.lower()
-                )
-                limiar = 0.1
-
-                qtd_encontrada, unidade_encontrada = extrair_unidade_e_quantidade(nome_produto_encontrado)
-
-                status_calculo = "Incluído"
-                motivo_rejeicao = ""
-
-                match_similaridade = (similaridade >= limiar)
-                match_unidade = (qtd_original is None or (
-                        qtd_original == qtd_encontrada and unidade_original == unidade_encontrada))
-
-                if not match_similaridade:
-                    status_calculo = "Rejeitado (Relevância)"
-                    motivo_rejeicao = f"Baixa similaridade com o termo '{produto}' ({similaridade:.2%})"
-                elif not match_unidade:
-                    status_calculo = "Rejeitado (Relevância)"
-                    unidade_esp = f"{qtd_original}{unidade_original}" if qtd_original else "N/A"
-                    unidade_enc = f"{qtd_encontrada}{unidade_encontrada}" if qtd_encontrada else "N/A"
-                    motivo_rejeicao = f"Unidade/Qtd. divergente (Esperado: {unidade_esp}, Encontrado: {unidade_enc})"
-
-                todos_os_itens_analisados.append({
-                    "Produto_Pesquisado": produto,
-                    "Nome_Encontrado": nome_produto_encontrado,
-                    "Preco": preco_float,
-                    "Similaridade": f"{similaridade:.2%}",
-                    "Link": link_produto,  # Agora contém o link limpo
-                    "Status_Calculo": status_calculo,
-                    "Motivo_Rejeicao": motivo_rejeicao
-                })
-
-        # --- Lógica de Filtro de Outlier (Filtro 2) ---
-        # (O restante da função permanece exatamente igual)
-        produtos_para_calculo = [p for p in todos_os_itens_analisados if p["Status_Calculo"] == "Incluído"]
-
-        if not produtos_para_calculo:
-            return "Não encontrado", "Não encontrado", todos_os_itens_analisados
-
-        precos = [p["Preco"] for p in produtos_para_calculo]
-
-        if len(precos) < 3:
-            return min(precos), max(precos), todos_os_itens_analisados
-
-        precos_array = np.array(precos)
-        media = np.mean(precos_array)
-        desvio_padrao = np.std(precos_array)
-        print(f"  -> Análise Estatística: Média=R${media:.2f}, Desvio Padrão=R${desvio_padrao:.2f}")
-
-        limite_inferior = media - (desvio_padrao * 1)
-        limite_superior = media + (desvio_padrao * 1)
-
-        precos_filtrados_final = []
-        outliers_removidos_count = 0
-
-        for item in produtos_para_calculo:
-            preco_item = item["Preco"]
-            if limite_inferior <= preco_item <= limite_superior:
-                precos_filtrados_final.append(preco_item)
-            else:
-                item["Status_Calculo"] = "Rejeitado (Outlier)"
-                item["Motivo_Rejeicao"] = (
-                    f"Preço (R${preco_item:.2f}) fora do desvio padrão "
-                    f"(Faixa aceitável: R${limite_inferior:.2f} - R${limite_superior:.2f})"
-                )
-                outliers_removidos_count += 1
 
-        print(f"  -> {outliers_removidos_count} preço(s) removido(s) como outlier(s).")
+# Os dois extratores devolvem os mesmos registros; o "soup" fica como referência
+MOTORES_EXTRACAO = {"lxml": extrair_registros_lxml, "soup": extrair_registros_soup}
 
-        if not precos_filtrados_final:
-            print(
-                "  -> Aviso: Todos os preços 'incluídos' foram removidos como outliers. Retornando min/max da faixa de relevância.")
-            return min(precos), max(precos), todos_os_itens_analisados
 
-        return min(precos_filtrados_final), max(precos_filtrados_final), todos_os_itens_analisados
+def resolver_link(href_bruto):
+    """Transforma o href do resultado no link da loja (ou numa URL absoluta do Google)."""
+    link_produto = ""
+    if not href_bruto:
+        return link_produto
 
-    except TimeoutException:
-        print(f"Tempo esgotado para '{produto}'. O seletor '{SELETOR_PRECO_ARIA}' não foi encontrado.")
-        return "Timeout", "Timeout", todos_os_itens_analisados
-    except Exception as e:
-        print(f"Ocorreu um erro inesperado ao buscar '{produto}': {e}")
-        return "Erro inesperado", "Erro inesperado", todos_os_itens_analisados
-
-# --- Início do Script Principal ---
-service = Service(ChromeDriverManager().install())
-options = webdriver.ChromeOptions()
-options.add_experimental_option("excludeSwitches", ["enable-automation"])
-options.add_experimental_option("useAutomationExtension", False)
-options.add_argument("--disable-blink-features=AutomationControlled")
-# options.add_argument("--headless")
-options.add_argument("--window-size=1920,1080")
-options.add_argument(
-    "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36"
-)
+    # 1. Checa se é um link de redirecionamento do Google
+    if href_bruto.startswith("/url?q="):
+        try:
+            # Parseia a URL bruta
+            parsed_url = urllib.parse.urlparse(href_bruto)
+            # Extrai os parâmetros da query (ex: 'q', 'sa', 'ved')
+            query_params = urllib.parse.parse_qs(parsed_url.query)
 
-driver = webdriver.Chrome(service=service, options=options)
+            # Se o parâmetro 'q' existir, esse é o nosso link!
+            if 'q' in query_params:
+                # query_params['q'] é uma lista, pegamos o primeiro item
+                link_produto = query_params['q'][0]
+            else:
+                # Se falhar, salva o link de redirecionamento mesmo
+                link_produto = URL_GOOGLE + href_bruto
+        except Exception as e:
+            print(f"  -> Erro ao parsear link: {e}")
+            link_produto = URL_GOOGLE + href_bruto
 
-try:
-    df_entrada = pd.read_excel("../resources/produtos.xlsx")
-    lista_produtos = df_entrada["Produto"].tolist()
-    dados_resumo = []
+    # 2. Se for um link interno do Google (ex: /shopping/product/...)
+    elif href_bruto.startswith("/"):
+        link_produto = URL_GOOGLE + href_bruto
+
+    # 3. Se for um link absoluto (improvável, mas garante)
+    elif href_bruto.startswith("http"):
+        link_produto = href_bruto
 
-    # NOVA LISTA para o arquivo de detalhes
-    todos_os_dados_detalhados = []
+    return link_produto
 
-    for produto in lista_produtos:
-        print(f"\nBuscando preços para: '{produto}'...")
-        # MODIFICAÇÃO: Captura a lista de itens analisados
-        preco_min, preco_max, itens_analisados = buscar_precos(driver, produto)
 
-        dados_resumo.append({"Produto": produto, "Preco_Minimo": preco_min, "Preco_Maximo": preco_max})
+def analisar_html(
+    html_content, produto, motor="lxml", metrica="jaro_winkler", metodo_outliers="sigma", limiar=LIMIAR_SIMILARIDADE
+):
+    """
+    Extrai os preços de uma página de resultados do Google Shopping já carregada,
+    filtra por relevância e outliers e retorna min/max e a lista detalhada dos itens.
+    Não depende do navegador, então também serve para páginas salvas em disco.
+    `motor` escolhe o extrator em MOTORES_EXTRACAO ("lxml" ou "soup"), `metrica`,
+    a similaridade usada na relevância (com nota mínima `limiar`) e `metodo_outliers`,
+    o filtro de estatistica.METODOS.
+    """
+    with metricas.cronometrar("extracao", motor=motor):
+        registros = MOTORES_EXTRACAO[motor](html_content)
+    return analisar_registros(registros, produto, metrica, metodo_outliers=metodo_outliers, limiar=limiar)
 
-        # Adiciona os detalhes da busca atual à lista geral
-        todos_os_dados_detalhados.extend(itens_analisados)
 
-        if isinstance(preco_min, float) and isinstance(preco_max, float):
-            print(f"  -> Resultado Final: Mínimo: R$ {preco_min:.2f} | Máximo: R$ {preco_max:.2f}")
+def analisar_registros(
+    registros, produto, metrica="jaro_winkler", catalogo=None, metodo_outliers="sigma", limiar=LIMIAR_SIMILARIDADE
+):
+    """
+    Filtra por relevância e outliers os registros {title, price_label, href} extraídos
+    da página e retorna min/max e a lista detalhada dos itens. `metrica` é uma das
+    métricas de similaridade.METRICAS. Com um `catalogo` (CatalogoProdutos), anúncios
+    que ele liga a outro produto da lista são rejeitados e os ligados a este produto
+    entram sem depender do limiar de similaridade. `metodo_outliers` é um dos métodos
+    de estatistica.METODOS; com None, os outliers não são filtrados aqui e min/max
+    vêm só da relevância.
+    """
+    todos_os_itens_analisados = []
+
+    if not registros:
+        print("  -> Nenhum elemento de preço encontrado com o seletor aria-label.")
+        return "Não encontrado", "Não encontrado", todos_os_itens_analisados
+
+    qtd_original, unidade_original = extrair_unidade_e_quantidade(produto)
+    print(
+        f"  -> Padrão a ser buscado: Quantidade={qtd_original}, Unidade={unidade_original}"
+    )
+
+    candidatos = []
+    for registro in registros:
+        nome_produto_encontrado = registro["title"]
+        preco_centavos = preco_em_centavos(registro["price_label"])
+
+        if preco_centavos is None:
+            continue
+
+        preco_float = preco_centavos / 100
+
+        if nome_produto_encontrado and preco_float:
+            candidatos.append((nome_produto_encontrado, preco_float, resolver_link(registro["href"])))
+
+    nomes = [nome for nome, _, _ in candidatos]
+    # Títulos já ligados a um produto da lista são decididos pelo catálogo
+    if catalogo:
+        with metricas.cronometrar("catalogo"):
+            canonicos = [catalogo.resolver(nome) for nome in nomes]
+    else:
+        canonicos = [None] * len(nomes)
+
+    # Uma chamada para os títulos que o catálogo não decidiu; os de unidade/quantidade
+    # diferente nem passam pela métrica e voltam com NaN
+    a_pontuar = [nome for nome, canonico in zip(nomes, canonicos) if canonico is None]
+    with metricas.cronometrar("similaridade", metrica=metrica):
+        notas = iter(pontuar(Consulta(produto), a_pontuar, metrica=metrica))
+    similaridades = [next(notas) if canonico is None else np.nan for canonico in canonicos]
+
+    for (nome_produto_encontrado, preco_float, link_produto), similaridade, canonico in zip(
+        candidatos, similaridades, canonicos
+    ):
+        status_calculo = STATUS_INCLUIDO
+        motivo_rejeicao = ""
+
+        if canonico is not None and canonico != produto:
+            status_calculo = "Rejeitado (Relevância)"
+            motivo_rejeicao = f"Anúncio de outro produto da lista ('{canonico}')"
+        elif canonico == produto:
+            pass
+        elif np.isnan(similaridade):
+            status_calculo = "Rejeitado (Relevância)"
+            qtd_encontrada, unidade_encontrada = extrair_unidade_e_quantidade(nome_produto_encontrado)
+            unidade_esp = f"{qtd_original}{unidade_original}" if qtd_original else "N/A"
+            unidade_enc = f"{qtd_encontrada}{unidade_encontrada}" if qtd_encontrada else "N/A"
+            motivo_rejeicao = f"Unidade/Qtd. divergente (Esperado: {unidade_esp}, Encontrado: {unidade_enc})"
+        elif similaridade < limiar:
+            status_calculo = "Rejeitado (Relevância)"
+            motivo_rejeicao = f"Baixa similaridade com o termo '{produto}' ({similaridade:.2%})"
+
+        todos_os_itens_analisados.append({
+            "Produto_Pesquisado": produto,
+            "Nome_Encontrado": nome_produto_encontrado,
+            "Preco": preco_float,
+            "Similaridade": "Catálogo" if canonico == produto else "N/A" if np.isnan(similaridade) else f"{similaridade:.2%}",
+            "Link": link_produto,  # Agora contém o link limpo
+            "Status_Calculo": status_calculo,
+            "Motivo_Rejeicao": motivo_rejeicao
+        })
+
+    # --- Lógica de Filtro de Outlier (Filtro 2) ---
+    produtos_para_calculo = [p for p in todos_os_itens_analisados if p["Status_Calculo"] == STATUS_INCLUIDO]
+
+    if not produtos_para_calculo:
+        return "Não encontrado", "Não encontrado", todos_os_itens_analisados
+
+    precos = [p["Preco"] for p in produtos_para_calculo]
+
+    # Sem método, o filtro fica para o estágio estatístico depois da coleta (main)
+    if metodo_outliers is None or len(precos) < MINIMO_AMOSTRAS:
+        return min(precos), max(precos), todos_os_itens_analisados
+
+    with metricas.cronometrar("outliers", metodo=metodo_outliers):
+        limite_inferior, limite_superior = limites_outlier(precos, metodo_outliers)
+    print(f"  -> Análise Estatística ({metodo_outliers}): Faixa aceitável R${limite_inferior:.2f} - R${limite_superior:.2f}")
+
+    precos_filtrados_final = []
+    outliers_removidos_count = 0
+
+    for item in produtos_para_calculo:
+        preco_item = item["Preco"]
+        if limite_inferior <= preco_item <= limite_superior:
+            precos_filtrados_final.append(preco_item)
         else:
-            print(f"  -> Resultado Final: Preços não encontrados para '{produto}'")
-        time.sleep(2)
+            item["Status_Calculo"] = STATUS_OUTLIER
+            item["Motivo_Rejeicao"] = motivo_outlier(metodo_outliers, preco_item, limite_inferior, limite_superior)
+            outliers_removidos_count += 1
+
+    print(f"  -> {outliers_removidos_count} preço(s) removido(s) como outlier(s).")
+
+    if not precos_filtrados_final:
+        print(
+            "  -> Aviso: Todos os preços 'incluídos' foram removidos como outliers. Retornando min/max da faixa de relevância.")
+        return min(precos), max(precos), todos_os_itens_analisados
 
-    # --- SALVANDO OS DOIS ARQUIVOS EXCEL ---
+    return min(precos_filtrados_final), max(precos_filtrados_final), todos_os_itens_analisados
+
+
+def buscar_em_serie(lista_produtos, limitador, catalogo=None, arquivo_paginas=None):
+    """
+    Busca os produtos um a um no mesmo navegador, entregando (produto, min, max, itens).
+    Os outliers não são filtrados aqui: o consolidar filtra os produtos em lotes.
+    """
+    driver = criar_driver()
+
+    try:
+        for produto in lista_produtos:
+            print(f"\nBuscando preços para: '{produto}'...")
+            with metricas.cronometrar("limitador"):
+                limitador.aguardar()
+            # MODIFICAÇÃO: Captura a lista de itens analisados
+            # Sem janela não há como resolver o CAPTCHA à mão
+            preco_min, preco_max, itens_analisados = buscar_precos(
+                driver,
+                produto,
+                interativo=navegador_visivel(),
+                limitador=limitador,
+                catalogo=catalogo,
+                metodo_outliers=None,
+                arquivo_paginas=arquivo_paginas,
+            )
+            limitador.registrar(preco_min)
+            metricas.medir("limitador_taxa_buscas_por_segundo", limitador.taxa_atual)
+            yield produto, preco_min, preco_max, itens_analisados
+    finally:
+        if driver:
+            driver.quit()
+
+
+def consolidar(resultados, metodo_outliers="sigma", formato_detalhes="csv", excel_detalhes=False):
+    """
+    Junta os (produto, min, max, itens) de todos os produtos e grava as planilhas.
+    Os itens seguem em lotes de produtos inteiros (até LINHAS_POR_LOTE linhas): cada
+    lote passa pelo estágio estatístico (outliers e resumo) e vai direto para o arquivo
+    de detalhes (`formato_detalhes`: "csv" ou "parquet"), então a memória não cresce
+    com o tamanho da lista. Com `excel_detalhes`, o arquivo de detalhes também é
+    convertido para itens_procurados.xlsx no fim.
+    """
+    import pandas as pd
+
+    dados_resumo = []
+    # Resumos e itens dos produtos do lote atual
+    resumos_lote = []
+    itens_lote = []
+    outliers_removidos = 0
+
+    def processar_lote():
+        nonlocal outliers_removidos
+        if itens_lote:
+            df_lote = pd.DataFrame(itens_lote, columns=list(ESQUEMA_DETALHES))
+            with metricas.cronometrar("estatistica", metodo=metodo_outliers):
+                outliers_removidos += int(filtrar_outliers(df_lote, metodo_outliers).sum())
+                estatisticas = resumir(df_lote)
+            # Produtos sem nenhum preço relevante mantêm a marca da busca ("Timeout", "Não encontrado"...)
+            for resumo in resumos_lote:
+                if resumo["Produto"] in estatisticas.index:
+                    resumo.update(estatisticas.loc[resumo["Produto"], COLUNAS_RESUMO].to_dict())
+            # Incluídos, rejeitados por relevância e outliers
+            for status, quantidade in df_lote["Status_Calculo"].value_counts().items():
+                metricas.contar("itens", int(quantidade), status=status)
+            with metricas.cronometrar("detalhes", formato=formato_detalhes):
+                escritor.adicionar(df_lote)
+        resumos_lote.clear()
+        itens_lote.clear()
+
+    escritor = EscritorDetalhes(formato_detalhes)
+    try:
+        for produto, preco_min, preco_max, itens_analisados in resultados:
+            resumo = {"Produto": produto, "Preco_Minimo": preco_min, "Preco_Maximo": preco_max}
+            dados_resumo.append(resumo)
+            resumos_lote.append(resumo)
+            itens_lote.extend(itens_analisados)
+            # "Timeout", "CAPTCHA", "Não encontrado"... ou "ok" quando a busca trouxe preços
+            metricas.contar("produtos", resultado=preco_min if isinstance(preco_min, str) else "ok")
+
+            relevantes = sum(item["Status_Calculo"] == STATUS_INCLUIDO for item in itens_analisados)
+            print(f"  -> '{produto}': {relevantes} preço(s) relevante(s) de {len(itens_analisados)} encontrado(s)")
+
+            if len(itens_lote) >= LINHAS_POR_LOTE:
+                processar_lote()
+        processar_lote()
+    finally:
+        # O que já foi processado fica gravado mesmo se a coleta for interrompida
+        escritor.fechar()
+
+    if escritor.linhas:
+        print(f"\nFiltro de outliers ({metodo_outliers}): {outliers_removidos} preço(s) removido(s).")
 
-    # Salva o arquivo de resumo como antes
     df_resumo = pd.DataFrame(dados_resumo)
-    df_resumo.to_excel("precos_encontrados.xlsx", index=False)
+    for linha in df_resumo.itertuples(index=False):
+        if isinstance(linha.Preco_Minimo, float) and isinstance(linha.Preco_Maximo, float):
+            print(f"  -> Resultado Final ('{linha.Produto}'): Mínimo: R$ {linha.Preco_Minimo:.2f} | Máximo: R$ {linha.Preco_Maximo:.2f}")
+        else:
+            print(f"  -> Resultado Final: Preços não encontrados para '{linha.Produto}'")
+
+    # --- SALVANDO OS ARQUIVOS ---
+
+    # Salva o arquivo de resumo como antes, agora com mediana e percentis
+    with metricas.cronometrar("planilha", arquivo="precos_encontrados.xlsx"):
+        df_resumo.to_excel("precos_encontrados.xlsx", index=False)
     print("\n🎉 Processo concluído! Resultados salvos em 'precos_encontrados.xlsx'")
 
-    # Salva o novo arquivo com todos os detalhes
-    if todos_os_dados_detalhados:
-        df_detalhes = pd.DataFrame(todos_os_dados_detalhados)
-        df_detalhes.to_excel("itens_procurados.xlsx", index=False)
-        print("🔍 Detalhes da busca salvos em 'itens_procurados.xlsx'")
+    if escritor.linhas:
+        print(f"🔍 Detalhes da busca ({escritor.linhas} itens) salvos em '{escritor.caminho}'")
+        if excel_detalhes:
+            with metricas.cronometrar("planilha", arquivo="itens_procurados.xlsx"):
+                exportar_excel(escritor.caminho)
+            print("🔍 Detalhes da busca também salvos em 'itens_procurados.xlsx'")
+
+
+def main(
+    arquivo=ARQUIVO_PRODUTOS,
+    coluna="Produto",
+    trabalhadores=1,
+    metodo_outliers="sigma",
+    capturar=False,
+    formato_detalhes="csv",
+    excel_detalhes=False,
+):
+    # Ritmo das buscas, dividido por todos os navegadores: substitui a pausa fixa de 2s
+    limitador = LimitadorAdaptativo(reiniciar=True)
+    lista_produtos = list(ler_nomes(arquivo, coluna))
+
+    # Os produtos da lista são os canônicos do catálogo de anúncios
+    catalogo = CatalogoProdutos()
+    novos = catalogo.sincronizar_produtos(lista_produtos)
+    print(f"Catálogo: {len(catalogo.produtos)} produto(s), {novos} novo(s) nesta execução.")
+
+    # Páginas guardadas para o reprocessar, sem precisar voltar ao Google
+    arquivo_paginas = ArquivoPaginas() if capturar else None
+
+    if trabalhadores > 1:
+        from .pool_navegadores import buscar_em_paralelo
+
+        # Cada processo abre o próprio Chrome e o próprio acesso ao catálogo e ao
+        # arquivo de páginas; os resultados voltam na ordem da lista
+        catalogo.fechar()
+        catalogo = None
+        resultados = buscar_em_paralelo(
+            lista_produtos, trabalhadores, limitador.caminho, ARQUIVO_CATALOGO, PASTA_PAGINAS if capturar else None
+        )
+    else:
+        resultados = buscar_em_serie(lista_produtos, limitador, catalogo, arquivo_paginas)
+
+    consolidar(resultados, metodo_outliers, formato_detalhes, excel_detalhes)
+
+    mostra_estatisticas_limitador(limitador)
+    estatisticas_limitador = limitador.estatisticas()
+    metricas.medir("limitador_taxa_buscas_por_segundo", estatisticas_limitador["taxa"])
+    metricas.medir("limitador_bloqueios", estatisticas_limitador["bloqueios"])
+    limitador.fechar()
+    if arquivo_paginas:
+        arquivo_paginas.fechar()
+    if catalogo:
+        catalogo.fechar()
+        mostra_estatisticas_catalogo(catalogo)
+    mostra_estatisticas_metricas(metricas)
+    metricas.exportar("produtos")
+
+
+def reprocessar(
+    pasta=PASTA_PAGINAS,
+    arquivo=None,
+    coluna="Produto",
+    motor="lxml",
+    metrica="jaro_winkler",
+    metodo_outliers="sigma",
+    limiar=LIMIAR_SIMILARIDADE,
+    formato_detalhes="csv",
+    excel_detalhes=False,
+):
+    """
+    Refaz extração, relevância, outliers e planilhas a partir das páginas capturadas
+    (main com capturar=True), sem navegador. Sem `arquivo`, reprocessa todos os
+    produtos capturados; com ele, só os da lista, na ordem dela.
+    """
+    arquivo_paginas = ArquivoPaginas(pasta)
+    capturas = arquivo_paginas.capturas()
+    lista_produtos = list(ler_nomes(arquivo, coluna)) if arquivo else list(capturas)
+    print(f"Reprocessando {len(lista_produtos)} produto(s) de {len(arquivo_paginas)} página(s) em '{pasta}'.")
+
+    catalogo = CatalogoProdutos()
+    catalogo.sincronizar_produtos(lista_produtos)
+
+    def resultados():
+        for produto in lista_produtos:
+            print(f"\nReprocessando: '{produto}'...")
+            if produto not in capturas:
+                print("  -> Página não capturada.")
+                yield produto, "Não capturado", "Não capturado", []
+                continue
+            with metricas.cronometrar("leitura_captura"):
+                html_content = arquivo_paginas.ler(capturas[produto])
+            with metricas.cronometrar("extracao", motor=motor):
+                registros = MOTORES_EXTRACAO[motor](html_content)
+            yield produto, *analisar_registros(
+                registros, produto, metrica, catalogo=catalogo, metodo_outliers=None, limiar=limiar
+            )
+
+    try:
+        consolidar(resultados(), metodo_outliers, formato_detalhes, excel_detalhes)
+    finally:
+        arquivo_paginas.fechar()
+        catalogo.fechar()
+    mostra_estatisticas_catalogo(catalogo)
+    mostra_estatisticas_metricas(metricas)
+    metricas.exportar("reprocessar")
+
+
+if __name__ == "__main__":
+    import sys
+
+    from .__main__ import main as cli
 
-finally:
-    if driver:
-        driver.quit()
\ No newline at end of file
+    cli(["produtos", "--variante", "4", *sys.argv[1:]])
@@ -0,0 +1,174 @@
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+# Respostas que indicam sobrecarga ou falha passageira do servidor e valem nova tentativa
+STATUS_RETENTAVEIS = {429, 500, 502, 503, 504}
+
+
+class Disjuntor:
+    """
+    Disjuntor (circuit breaker) de um host: depois de `limite_falhas` falhas seguidas
+    ele abre e todas as threads esperam `pausa` segundos; depois disso uma única
+    requisição de teste é liberada, e as demais só seguem se ela der certo.
+    """
+
+    def __init__(self, limite_falhas=5, pausa=30.0):
+        self.limite_falhas = limite_falhas
+        self.pausa = pausa
+        self.falhas_seguidas = 0
+        self.aberturas = 0
+        self._reabre_em = 0.0
+        self._em_teste = False
+        self._teste_iniciado_em = 0.0
+        self._condicao = threading.Condition()
+
+    def aguardar_liberacao(self):
+        with self._condicao:
+            while True:
+                if self.falhas_seguidas < self.limite_falhas:
+                    return
+                agora = time.monotonic()
+                if agora < self._reabre_em:
+                    self._condicao.wait(self._reabre_em - agora)
+                elif not self._em_teste or agora - self._teste_iniciado_em > self.pausa:
+                    # Um teste que passou da pausa sem resposta é dado como perdido
+                    self._em_teste = True
+                    self._teste_iniciado_em = agora
+                    return
+                else:
+                    self._condicao.wait(self.pausa)
+
+    def registrar_sucesso(self):
+        with self._condicao:
+            self.falhas_seguidas = 0
+            self._em_teste = False
+            self._condicao.notify_all()
+
+    def registrar_falha(self):
+        with self._condicao:
+            self.falhas_seguidas += 1
+            if self.falhas_seguidas >= self.limite_falhas and (self._em_teste or self.falhas_seguidas == self.limite_falhas):
+                self._reabre_em = time.monotonic() + self.pausa
+                self.aberturas += 1
+            self._em_teste = False
+            self._condicao.notify_all()
+
+
+class Resiliencia:
+    """
+    Executa requisições com retentativas limitadas, espera exponencial com jitter que
+    respeita o Retry-After do servidor e um disjuntor por host. Conta as falhas por
+    classe de erro em `contadores`.
+    """
+
+    def __init__(self, tentativas=4, espera_base=0.5, espera_maxima=60.0, limite_falhas=5, pausa_disjuntor=30.0):
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.limite_falhas = limite_falhas
+        self.pausa_disjuntor = pausa_disjuntor
+        self.contadores = Counter()
+        self._disjuntores = {}
+        self._trava = threading.Lock()
+
+    def disjuntor(self, host):
+        with self._trava:
+            if host not in self._disjuntores:
+                self._disjuntores[host] = Disjuntor(self.limite_falhas, self.pausa_disjuntor)
+            return self._disjuntores[host]
+
+    def executar(self, requisitar, url):
+        """
+        Chama `requisitar()` (que deve devolver um requests.Response) até obter uma
+        resposta que não seja de sobrecarga/falha passageira. Se as tentativas acabarem,
+        ou se o Retry-After pedir mais que `espera_maxima`, lança o último erro em vez
+        de devolver uma resposta ruim.
+        """
+        disjuntor = self.disjuntor(urlparse(url).netloc)
+
+        for tentativa in range(1, self.tentativas + 1):
+            disjuntor.aguardar_liberacao()
+            espera = self._espera_exponencial(tentativa)
+            try:
+                response = requisitar()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self._registrar(type(e).__name__)
+                erro = e
+            except BaseException as e:
+                # Os demais erros (ChunkedEncodingError, TooManyRedirects...) não são
+                # retentados, mas contam como falha: a requisição pode ser o teste do
+                # disjuntor, e as outras threads esperam por ele
+                self._registrar(type(e).__name__)
+                disjuntor.registrar_falha()
+                raise
+            else:
+                if response.status_code not in STATUS_RETENTAVEIS:
+                    disjuntor.registrar_sucesso()
+                    return response
+                self._registrar(f"HTTP {response.status_code}")
+                pedida = tempo_retry_after(response) or 0
+                erro = requests.exceptions.HTTPError(
+                    f"{response.status_code} Server Error for url: {url}", response=response
+                )
+                response.close()
+                if pedida > self.espera_maxima:
+                    # Não vale segurar a thread por horas: a tentativa falha de vez
+                    self._registrar("Retry-After acima da espera máxima")
+                    disjuntor.registrar_falha()
+                    raise erro
+                espera = max(espera, pedida)
+
+            disjuntor.registrar_falha()
+            if tentativa < self.tentativas:
+                self._registrar("retentativas")
+                time.sleep(espera)
+
+        self._registrar("esgotadas")
+        raise erro
+
+    def _espera_exponencial(self, tentativa):
+        # "Full jitter": sorteia entre zero e o teto exponencial para as threads não
+        # voltarem todas ao mesmo tempo
+        teto = min(self.espera_maxima, self.espera_base * 2 ** (tentativa - 1))
+        return random.uniform(0, teto)
+
+    def _registrar(self, chave):
+        with self._trava:
+            self.contadores[chave] += 1
+
+
+def tempo_retry_after(response):
+    """Segundos pedidos pelo cabeçalho Retry-After (número ou data HTTP), ou None."""
+    valor = response.headers.get("Retry-After")
+    if not valor:
+        return None
+    try:
+        return max(float(valor), 0.0)
+    except ValueError:
+        pass
+    try:
+        data = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return max((data - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def mostra_estatisticas_resiliencia(resiliencia):
+    print("\n--- Falhas de rede e retentativas ---")
+    if not resiliencia.contadores:
+        print("  Nenhuma falha registrada.")
+    for chave, quantidade in sorted(resiliencia.contadores.items()):
+        print(f"  {chave}: {quantidade}")
+    for host, disjuntor in resiliencia._disjuntores.items():
+        if disjuntor.aberturas:
+            print(f"  Disjuntor de {host} abriu {disjuntor.aberturas} vez(es)")
+    print("-" * 35)
@@ -0,0 +1,139 @@
+import csv
+import os
+
+# Arquivo com todos os itens analisados (a extensão vem do formato)
+ARQUIVO_DETALHES = "itens_procurados"
+FORMATOS_DETALHES = ("csv", "parquet")
+
+# Colunas dos itens analisados por product4, na ordem do arquivo, com o tipo de cada uma
+# (Similaridade fica como texto: "87.50%" ou "N/A" para unidade/quantidade divergente)
+ESQUEMA_DETALHES = {
+    "Produto_Pesquisado": "string",
+    "Nome_Encontrado": "string",
+    "Preco": "float64",
+    "Similaridade": "string",
+    "Link": "string",
+    "Status_Calculo": "string",
+    "Motivo_Rejeicao": "string",
+}
+
+# Linhas acumuladas antes de cada gravação; cada lote leva só produtos inteiros
+LINHAS_POR_LOTE = 50_000
+# Limite de linhas de uma aba do Excel, descontado o cabeçalho
+LINHAS_POR_ABA = 1_048_575
+
+
+def _esquema_arrow():
+    import pyarrow as pa
+
+    tipos = {"string": pa.string(), "float64": pa.float64()}
+    return pa.schema([(coluna, tipos[tipo]) for coluna, tipo in ESQUEMA_DETALHES.items()])
+
+
+class EscritorDetalhes:
+    """
+    Grava os itens analisados em lotes (DataFrames com as colunas de ESQUEMA_DETALHES)
+    num CSV ou num Parquet (um row group por lote), à medida que os produtos terminam,
+    em vez de montar a execução inteira na memória. O arquivo é escrito num temporário
+    e só troca o anterior em fechar().
+    """
+
+    def __init__(self, formato="csv", caminho=None):
+        if formato not in FORMATOS_DETALHES:
+            raise ValueError(f"Formato de detalhes não suportado: '{formato}'")
+        self.formato = formato
+        self.caminho = caminho or f"{ARQUIVO_DETALHES}.{formato}"
+        self.linhas = 0
+        self._temporario = f"{self.caminho}.tmp"
+
+        if formato == "parquet":
+            import pyarrow.parquet as pq
+
+            self._esquema = _esquema_arrow()
+            self._escritor = pq.ParquetWriter(self._temporario, self._esquema)
+        else:
+            self._arquivo = open(self._temporario, "w", newline="", encoding="utf-8")
+            csv.writer(self._arquivo).writerow(ESQUEMA_DETALHES)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.fechar()
+
+    def adicionar(self, df_lote):
+        if df_lote.empty:
+            return
+        df_lote = df_lote[list(ESQUEMA_DETALHES)]
+        if self.formato == "parquet":
+            import pyarrow as pa
+
+            self._escritor.write_table(pa.Table.from_pandas(df_lote, schema=self._esquema, preserve_index=False))
+        else:
+            df_lote.to_csv(self._arquivo, header=False, index=False)
+        self.linhas += len(df_lote)
+
+    def fechar(self):
+        if self.formato == "parquet":
+            self._escritor.close()
+        else:
+            self._arquivo.close()
+        os.replace(self._temporario, self.caminho)
+
+
+def ler_detalhes(caminho, tamanho_lote=LINHAS_POR_LOTE):
+    """Entrega as linhas (tuplas na ordem de ESQUEMA_DETALHES) de um arquivo de detalhes, lote a lote."""
+    if caminho.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        arquivo = pq.ParquetFile(caminho)
+        for lote in arquivo.iter_batches(batch_size=tamanho_lote, columns=list(ESQUEMA_DETALHES)):
+            yield from zip(*(coluna.to_pylist() for coluna in lote.columns))
+        return
+
+    indice_preco = list(ESQUEMA_DETALHES).index("Preco")
+    with open(caminho, newline="", encoding="utf-8") as arquivo:
+        linhas = csv.reader(arquivo)
+        next(linhas, None)
+        for linha in linhas:
+            linha[indice_preco] = float(linha[indice_preco])
+            yield tuple(valor if valor != "" else None for valor in linha)
+
+
+def exportar_excel(caminho_detalhes, caminho_xlsx=f"{ARQUIVO_DETALHES}.xlsx"):
+    """
+    Converte o arquivo de detalhes em planilha com o xlsxwriter em modo de memória
+    constante (cada linha vai para o disco assim que é escrita). Acima do limite de
+    linhas do Excel, os itens continuam em novas abas. Retorna quantas linhas gravou.
+    """
+    import xlsxwriter
+
+    temporario = f"{caminho_xlsx}.tmp.xlsx"
+    workbook = xlsxwriter.Workbook(temporario, {"constant_memory": True, "strings_to_urls": False})
+    formato_moeda = workbook.add_format({"num_format": "0.00"})
+    colunas = list(ESQUEMA_DETALHES)
+
+    def nova_aba(numero):
+        worksheet = workbook.add_worksheet("itens" if numero == 1 else f"itens_{numero}")
+        worksheet.write_row(0, 0, colunas)
+        worksheet.set_column(colunas.index("Preco"), colunas.index("Preco"), 12, formato_moeda)
+        worksheet.set_column(colunas.index("Nome_Encontrado"), colunas.index("Nome_Encontrado"), 60)
+        return worksheet
+
+    abas = 1
+    worksheet = nova_aba(abas)
+    linha_aba = 0
+    total = 0
+    try:
+        for linha in ler_detalhes(caminho_detalhes):
+            if linha_aba == LINHAS_POR_ABA:
+                abas += 1
+                worksheet = nova_aba(abas)
+                linha_aba = 0
+            linha_aba += 1
+            worksheet.write_row(linha_aba, 0, linha)
+            total += 1
+    finally:
+        workbook.close()
+    os.replace(temporario, caminho_xlsx)
+    return total
@@ -0,0 +1,128 @@
+"""
+Pontuação em lote da similaridade entre o produto pesquisado e os títulos encontrados.
+
+A consulta é preparada uma vez (Consulta); os candidatos com quantidade/unidade
+diferentes da consulta são podados antes da métrica de texto e ficam com nota NaN.
+As métricas ficam em METRICAS e recebem a consulta e os títulos já preparados.
+"""
+import unicodedata
+
+import jellyfish
+import numpy as np
+
+from .normalizacao import extrair_unidade_e_quantidade
+
+# Palavras que distinguem variantes do mesmo produto e por isso pesam mais
+SABORES = {
+    "baunilha", "chocolate", "morango", "natural", "cookies", "coco", "limao", "laranja", "uva",
+    "banana", "maracuja", "menta", "caramelo", "doce de leite", "cafe", "frutas vermelhas",
+}
+PESO_MARCA = 3.0
+PESO_SABOR = 3.0
+
+
+def sem_acentos(texto):
+    return "".join(c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c))
+
+
+def tokens(texto):
+    return sem_acentos(texto.lower()).split()
+
+
+class Consulta:
+    """Produto pesquisado com o texto, os tokens, os pesos e a unidade já calculados."""
+
+    def __init__(self, produto, marcas=None):
+        self.produto = produto
+        self.texto = produto.lower()
+        self.tokens = tokens(produto)
+        self.conjunto = frozenset(self.tokens)
+        self.quantidade_unidade = extrair_unidade_e_quantidade(produto)
+
+        # Sem lista de marcas, a primeira palavra do nome costuma ser a marca
+        marcas = {sem_acentos(m.lower()) for m in marcas} if marcas else set(self.tokens[:1])
+        texto_sem_acentos = " ".join(self.tokens)
+        sabores = {token for sabor in SABORES if sabor in texto_sem_acentos for token in sabor.split()}
+        self.pesos = {}
+        for token in self.tokens:
+            peso = 1.0
+            if token in marcas:
+                peso = max(peso, PESO_MARCA)
+            if token in sabores:
+                peso = max(peso, PESO_SABOR)
+            self.pesos[token] = peso
+        self.peso_total = sum(self.pesos.values())
+
+    def compativel(self, titulo):
+        """Mesma quantidade e unidade da consulta (ou consulta sem quantidade)."""
+        return self.quantidade_unidade[0] is None or extrair_unidade_e_quantidade(titulo) == self.quantidade_unidade
+
+
+def _jaro_winkler(consulta, titulos):
+    return np.fromiter(
+        (jellyfish.jaro_winkler_similarity(consulta.texto, titulo.lower()) for titulo in titulos),
+        dtype=float,
+        count=len(titulos),
+    )
+
+
+def _razao(a, b):
+    # Levenshtein normalizado pelo maior texto, de 0 a 1
+    if not a and not b:
+        return 1.0
+    return 1.0 - jellyfish.levenshtein_distance(a, b) / max(len(a), len(b))
+
+
+def _token_set(consulta, titulos):
+    """
+    "Token set ratio": compara a interseção dos tokens com cada lado acrescido do que
+    sobrou, de modo que palavras a mais no título (loja, sabor, brinde) pesem pouco.
+    """
+    notas = np.empty(len(titulos))
+    for i, titulo in enumerate(titulos):
+        conjunto = set(tokens(titulo))
+        comum = " ".join(sorted(consulta.conjunto & conjunto))
+        so_consulta = " ".join(filter(None, [comum, " ".join(sorted(consulta.conjunto - conjunto))]))
+        so_titulo = " ".join(filter(None, [comum, " ".join(sorted(conjunto - consulta.conjunto))]))
+        notas[i] = max(_razao(comum, so_consulta) if comum else 0.0,
+                       _razao(comum, so_titulo) if comum else 0.0,
+                       _razao(so_consulta, so_titulo))
+    return notas
+
+
+def _marcas_sabores(consulta, titulos):
+    """Fração ponderada dos tokens da consulta presentes no título (marca e sabor pesam mais)."""
+    if not consulta.peso_total:
+        return np.zeros(len(titulos))
+    notas = np.empty(len(titulos))
+    for i, titulo in enumerate(titulos):
+        conjunto = set(tokens(titulo))
+        notas[i] = sum(peso for token, peso in consulta.pesos.items() if token in conjunto) / consulta.peso_total
+    return notas
+
+
+METRICAS = {
+    "jaro_winkler": _jaro_winkler,
+    "token_set": _token_set,
+    "marcas_sabores": _marcas_sabores,
+}
+
+
+def pontuar(consulta, titulos, metrica="jaro_winkler", podar_unidades=True):
+    """
+    Notas de 0 a 1 de cada título em relação à consulta (um Consulta ou o nome do
+    produto), na ordem de `titulos`. Com `podar_unidades`, os títulos de quantidade/
+    unidade incompatível não passam pela métrica e ficam com NaN.
+    """
+    if not isinstance(consulta, Consulta):
+        consulta = Consulta(consulta)
+    funcao = METRICAS[metrica] if isinstance(metrica, str) else metrica
+
+    notas = np.full(len(titulos), np.nan)
+    if podar_unidades and consulta.quantidade_unidade[0] is not None:
+        indices = [i for i, titulo in enumerate(titulos) if consulta.compativel(titulo)]
+    else:
+        indices = list(range(len(titulos)))
+    if indices:
+        notas[indices] = funcao(consulta, [titulos[i] for i in indices])
+    return notas